@@ -0,0 +1,10 @@
+# backend/__init__.py
+# Load backend/.env before anything under backend is imported: the shared
+# services (response cache, admission, job queue, profile store, ...) read
+# their settings from the environment at import time. Variables already
+# set in the environment win over the file.
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".env"))
@@ -1,5 +1,4 @@
 # backend/app.py
-from backend.routes.ai_resume import ai_resume_bp
 from flask import Flask
 from flask_cors import CORS
 
@@ -8,15 +7,44 @@ from backend.routes.projects import projects_bp
 from backend.routes.resume import resume_bp
 from backend.routes.skills import skills_bp
 from backend.routes.ai_resume import ai_resume_bp
+from backend.routes.ai_jobs import ai_jobs_bp
+from backend.routes.profiles import profiles_bp
+from backend.routes.metrics import init_request_metrics, metrics_bp
+
+
+def create_app(config: dict = None) -> Flask:
+    """Build the Flask app.
+
+    Heavy services (the Gemini SDK, the template catalog) are not touched
+    here; they load on the first request that needs them. backend/.env is
+    loaded when the backend package is imported (see backend/__init__.py).
+    """
+    app = Flask(__name__)
+    app.config["CORS_ENABLED"] = True
+    # Background job workers (JOB_WORKERS threads) start with the first
+    # request. Off by default so tests and scripts that build an app do
+    # not claim jobs from the shared queue.
+    app.config["START_JOB_WORKERS"] = False
+    if config:
+        app.config.update(config)
+    if app.config["CORS_ENABLED"]:
+        # Off when mounted under backend.asgi, which adds CORS for every route
+        CORS(app)
+
+    app.register_blueprint(health_bp)
+    app.register_blueprint(projects_bp)
+    app.register_blueprint(resume_bp)
+    app.register_blueprint(skills_bp)
+    app.register_blueprint(ai_resume_bp)
+    app.register_blueprint(ai_jobs_bp)
+    app.register_blueprint(profiles_bp)
+    app.register_blueprint(metrics_bp)
+    init_request_metrics(app)
+    return app
 
-app = Flask(__name__)
-CORS(app)
 
-app.register_blueprint(health_bp)
-app.register_blueprint(projects_bp)
-app.register_blueprint(resume_bp)
-app.register_blueprint(skills_bp)
-app.register_blueprint(ai_resume_bp)
+# For `flask --app backend.app run` and `gunicorn backend.app:app`
+app = create_app({"START_JOB_WORKERS": True})
 
 
 if __name__ == "__main__":
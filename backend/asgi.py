@@ -0,0 +1,152 @@
+# backend/asgi.py
+"""Production ASGI entry point.
+
+    uvicorn backend.asgi:create_asgi_app --factory --host 0.0.0.0 --port 5000 --workers 4
+    python -m backend.asgi          # same, configured from ASGI_* env vars
+
+The tailoring endpoints (POST /api/ai/resume and /api/ai/resume.tex) are
+async views here, so a request waiting on Gemini holds a coroutine, not a
+thread, and one process can keep as many tailoring calls in flight as
+GEMINI_MAX_IN_FLIGHT_ASYNC allows (the admission cap, AI_MAX_CONCURRENT,
+defaults to it here). Everything else is the unchanged Flask app from
+create_app(), mounted through a2wsgi and run on a thread pool of
+ASGI_WSGI_THREADS: the cheap CPU routes (projects, skills, resume),
+health, and the streaming, batch and stats AI endpoints. See "Running in
+production" in the README for the worker model.
+"""
+import os
+import time
+from contextlib import asynccontextmanager
+
+from a2wsgi import WSGIMiddleware
+from fastapi import FastAPI, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
+from werkzeug.datastructures import MIMEAccept
+from werkzeug.http import parse_accept_header, parse_etags
+
+from backend.app import create_app
+from backend.routes.ai_resume import (
+    RATE_LIMIT_ERROR,
+    negotiate_format,
+    not_modified_etag,
+    rate_limit_retry_after,
+    resume_body,
+    resume_headers,
+)
+from backend.services.admission import ai_admission
+from backend.services.job_queue import resume_jobs
+from backend.services.latex_render import resume_json_to_latex
+from backend.services.metrics import http_request_seconds
+from backend.services.profile_store import UnknownProfile
+from backend.services.resume_pipeline import (
+    MISSING_FIELDS_ERROR,
+    latency_slo,
+    parse_resume_request,
+    run_resume_pipeline_async,
+)
+from backend.utils import env_int
+
+
+async def _resume_response(request: Request, output_format: str = None):
+    """Async twin of routes.ai_resume._resume_response."""
+    retry_after = rate_limit_retry_after(request.headers, request.client.host if request.client else None)
+    if retry_after:
+        return JSONResponse(
+            {"success": False, "error": RATE_LIMIT_ERROR, "retry_after": retry_after},
+            status_code=429, headers={"Retry-After": str(retry_after)},
+        )
+
+    try:
+        data = await request.json()
+    except ValueError:
+        data = {}
+    try:
+        inputs = parse_resume_request(data if isinstance(data, dict) else {})
+    except UnknownProfile as e:
+        return JSONResponse({"success": False, "error": str(e)}, status_code=404)
+    if inputs is None:
+        return JSONResponse({"success": False, "error": MISSING_FIELDS_ERROR}, status_code=400)
+
+    negotiated = output_format is None
+    if negotiated:
+        accept = parse_accept_header(request.headers.get("accept"), MIMEAccept)
+        output_format = negotiate_format(accept)
+    vary = {"Vary": "Accept"} if negotiated else {}
+
+    etag = not_modified_etag(parse_etags(request.headers.get("if-none-match")), inputs, output_format)
+    if etag:
+        return Response(status_code=304, headers={"ETag": f'"{etag}"', **vary})
+
+    try:
+        result = await run_resume_pipeline_async(*inputs, slo=latency_slo(data))
+        latex = resume_json_to_latex(result.resume_json)
+    except Exception as e:
+        return JSONResponse({"success": False, "used_ai": False, "error": str(e)}, status_code=500)
+
+    headers = {**resume_headers(result, output_format), **vary}
+    if output_format == "tex":
+        return Response(latex.encode("utf-8"), headers=headers, media_type=headers.pop("Content-Type"))
+    return JSONResponse(resume_body(result, latex), headers=headers)
+
+
+async def _observed(request: Request, output_format: str = None):
+    # Same histogram the Flask routes feed through init_request_metrics
+    started = time.perf_counter()
+    response = await _resume_response(request, output_format)
+    http_request_seconds.observe(
+        time.perf_counter() - started,
+        endpoint=request.url.path, method=request.method, status=response.status_code,
+    )
+    return response
+
+
+def create_asgi_app(config: dict = None) -> FastAPI:
+    """FastAPI app with the async AI views in front of the mounted Flask app."""
+    flask_app = create_app({"CORS_ENABLED": False, **(config or {})})
+    # Waiting async views hold no thread, so admit as many as the async client allows
+    ai_admission.resize(env_int("AI_MAX_CONCURRENT", env_int("GEMINI_MAX_IN_FLIGHT_ASYNC", 64)))
+
+    @asynccontextmanager
+    async def lifespan(_):
+        # Job workers run in the serving process only, not on import
+        resume_jobs.start()
+        yield
+
+    api = FastAPI(title="Intersync", docs_url=None, redoc_url=None, openapi_url=None, lifespan=lifespan)
+    api.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=["ETag", "X-Used-AI", "X-Fallback-Warning", "X-Prompt-Tokens-Saved"],
+    )
+
+    @api.post("/api/ai/resume")
+    async def ai_resume(request: Request):
+        return await _observed(request)
+
+    @api.post("/api/ai/resume.tex")
+    async def ai_resume_tex(request: Request):
+        return await _observed(request, "tex")
+
+    # Routes above win; every other path falls through to Flask
+    api.mount("/", WSGIMiddleware(flask_app, workers=env_int("ASGI_WSGI_THREADS", 16)))
+    return api
+
+
+def main():
+    import uvicorn
+
+    uvicorn.run(
+        "backend.asgi:create_asgi_app",
+        factory=True,
+        host=os.getenv("ASGI_HOST", "0.0.0.0"),
+        port=env_int("PORT", 5000),
+        workers=env_int("ASGI_WORKERS", 1),
+        log_level=os.getenv("ASGI_LOG_LEVEL", "info"),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+# backend/benchmarks/asgi_load.py
+"""How many concurrent tailoring requests one process can hold.
+
+Fires N simultaneous POST /api/ai/resume requests (distinct payloads, cache
+off) at one process, for increasing N, in two serving modes:
+
+  wsgi   Flask on a pool of --threads worker threads (gunicorn gthread style)
+  asgi   backend.asgi: async views, one event loop
+
+Gemini is replaced inside the SDK client by a stand-in that sleeps for
+--latency seconds, so the GeminiClient deadline, semaphores and router
+all run as in production; only the network call is simulated. Reported:
+wall time, throughput, p50/p95 latency, peak upstream calls in flight,
+and how many requests fell back to the demo resume.
+
+Usage: python -m backend.benchmarks.asgi_load [--latency 1.0] [--threads 16]
+           [--concurrency 16,64,256,1024] [--max-in-flight 1024]
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import statistics
+import threading
+import time
+import types
+from concurrent.futures import ThreadPoolExecutor
+
+RESUME = {
+    "header": {"name": "Ada", "email": "ada@example.com", "links": []},
+    "headline": "Backend Developer",
+    "summary": ["Builds reliable services."],
+    "skills": {"Languages": ["Python", "SQL"]},
+    "projects": [{"name": "API server", "bullets": ["Served 1k rps"]}],
+    "experience": [],
+}
+
+
+class _Upstream:
+    """Counts concurrent calls into the fake SDK."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.in_flight = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def enter(self):
+        with self._lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+
+    def leave(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def response(self):
+        return types.SimpleNamespace(text=json.dumps(RESUME))
+
+
+class _SyncModels:
+    def __init__(self, upstream):
+        self.upstream = upstream
+
+    def generate_content(self, model, contents, config=None):
+        self.upstream.enter()
+        try:
+            time.sleep(self.upstream.latency)
+            return self.upstream.response()
+        finally:
+            self.upstream.leave()
+
+
+class _AsyncModels:
+    def __init__(self, upstream):
+        self.upstream = upstream
+
+    async def generate_content(self, model, contents, config=None):
+        self.upstream.enter()
+        try:
+            await asyncio.sleep(self.upstream.latency)
+            return self.upstream.response()
+        finally:
+            self.upstream.leave()
+
+
+class FakeGenaiClient:
+    """Stands in for google.genai.Client: .models and .aio.models."""
+
+    def __init__(self, upstream):
+        self.models = _SyncModels(upstream)
+        self.aio = types.SimpleNamespace(models=_AsyncModels(upstream))
+
+
+def install_fake_gemini(latency: float, max_in_flight: int, max_in_flight_async: int) -> _Upstream:
+    from backend.services import ai_tailor_gemini
+    from backend.services.gemini_client import GeminiClient
+
+    upstream = _Upstream(latency)
+    client = GeminiClient(
+        api_key="bench", model=ai_tailor_gemini.gemini_model(), timeout=max(30.0, latency * 10),
+        max_in_flight=max_in_flight, max_in_flight_async=max_in_flight_async,
+    )
+    client._client = FakeGenaiClient(upstream)
+    ai_tailor_gemini._gemini = client
+    ai_tailor_gemini._router = None
+    return upstream
+
+
+def body(i: int) -> dict:
+    return {
+        "target_role": "Backend Developer",
+        "job_description": f"Python and SQL backend role #{i}: build APIs and data pipelines.",
+        "candidate": {"name": "Ada", "skills": ["Python", "SQL"],
+                      "projects": [{"name": "API server", "bullets": ["Built a REST API"]}]},
+    }
+
+
+def _summary(mode: str, n: int, wall: float, latencies: list, used_ai: list, upstream) -> dict:
+    latencies = sorted(latencies)
+    return {
+        "mode": mode,
+        "concurrency": n,
+        "wall_s": round(wall, 2),
+        "rps": round(n / wall, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000),
+        "p95_ms": round(latencies[min(n - 1, int(0.95 * n))] * 1000),
+        "peak_upstream": upstream.peak,
+        "fallbacks": used_ai.count(False),
+    }
+
+
+def run_wsgi(n: int, threads: int, latency: float) -> dict:
+    from backend.app import create_app
+
+    from backend.services.admission import ai_admission
+
+    upstream = install_fake_gemini(latency, max_in_flight=threads, max_in_flight_async=threads)
+    ai_admission.resize(threads)
+    client = create_app().test_client()
+
+    def one(i):
+        started = time.perf_counter()
+        resp = client.post("/api/ai/resume", json=body(i))
+        return time.perf_counter() - started, resp.get_json()["used_ai"]
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(one, range(n)))
+    wall = time.perf_counter() - started
+    return _summary("wsgi", n, wall, [r[0] for r in results], [r[1] for r in results], upstream)
+
+
+def run_asgi(n: int, max_in_flight: int, latency: float) -> dict:
+    import httpx
+
+    from backend.asgi import create_asgi_app
+
+    upstream = install_fake_gemini(latency, max_in_flight=8, max_in_flight_async=max_in_flight)
+    os.environ["AI_MAX_CONCURRENT"] = str(max_in_flight)
+    app = create_asgi_app()
+
+    async def main():
+        limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench",
+                                     limits=limits, timeout=None) as client:
+            async def one(i):
+                started = time.perf_counter()
+                resp = await client.post("/api/ai/resume", json=body(i))
+                return time.perf_counter() - started, resp.json()["used_ai"]
+
+            started = time.perf_counter()
+            results = await asyncio.gather(*(one(i) for i in range(n)))
+            return time.perf_counter() - started, results
+
+    wall, results = asyncio.run(main())
+    return _summary("asgi", n, wall, [r[0] for r in results], [r[1] for r in results], upstream)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=1.0, help="simulated Gemini latency (s)")
+    parser.add_argument("--threads", type=int, default=16, help="worker threads in wsgi mode")
+    parser.add_argument("--concurrency", default="16,64,256,1024")
+    parser.add_argument("--max-in-flight", type=int, default=1024,
+                        help="GEMINI_MAX_IN_FLIGHT_ASYNC and AI_MAX_CONCURRENT in asgi mode")
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args(argv)
+
+    os.environ.update(AI_ENABLED="true", GEMINI_API_KEY="bench", RESUME_CACHE_ENABLED="false")
+    levels = [int(n) for n in args.concurrency.split(",")]
+
+    rows = []
+    for n in levels:
+        rows.append(run_wsgi(n, args.threads, args.latency))
+        rows.append(run_asgi(n, args.max_in_flight, args.latency))
+    rss_mb = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+    if args.json:
+        print(json.dumps({"rows": rows, "max_rss_mb": rss_mb}, indent=2))
+        return
+
+    print(f"simulated Gemini latency {args.latency}s, wsgi threads {args.threads}, "
+          f"async in-flight limit {args.max_in_flight}")
+    columns = ["mode", "concurrency", "wall_s", "rps", "p50_ms", "p95_ms", "peak_upstream", "fallbacks"]
+    print("".join(f"{c:>14}" for c in columns))
+    for row in rows:
+        print("".join(f"{row[c]:>14}" for c in columns))
+    print(f"max RSS {rss_mb} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# backend/benchmarks/ats_keywords.py
+"""Benchmark the ATS keyword matcher on long job descriptions.
+
+Compares one Aho-Corasick pass against the naive approach of running a
+word-boundary regex per lexicon term, on generated job descriptions of
+1k, 10k and 50k words. The lexicon is the real one (catalog + role
+keywords + common tools), optionally padded with synthetic terms.
+
+Usage: python -m backend.benchmarks.ats_keywords [--words 10000] [--extra-terms 0]
+"""
+import argparse
+import random
+import re
+import timeit
+
+from backend.data.catalog import get_catalog
+from backend.services.ats_keywords import KeywordMatcher, lexicon
+
+FILLER = (
+    "we are looking for a motivated engineer to join our team and help build "
+    "reliable systems that scale you will collaborate with product design and "
+    "data partners to ship features our customers love"
+).split()
+
+
+def make_job_description(words: int, terms: list, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    out = []
+    while len(out) < words:
+        if rng.random() < 0.05:
+            out.extend(rng.choice(terms).split())
+        else:
+            out.append(rng.choice(FILLER))
+    return " ".join(out[:words])
+
+
+def naive_find(patterns, text: str) -> list:
+    return [term for term, pattern in patterns if pattern.search(text)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--words", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--extra-terms", type=int, default=0, help="synthetic terms added to the lexicon")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    terms = lexicon(get_catalog())
+    terms += [f"tool{i}x" for i in range(args.extra_terms)]
+
+    build = min(timeit.repeat(lambda: KeywordMatcher(terms), number=1, repeat=args.repeat))
+    matcher = KeywordMatcher(terms)
+    patterns = [
+        (t, re.compile(r"(?<![0-9A-Za-z])" + re.escape(t) + r"(?![0-9A-Za-z])", re.IGNORECASE))
+        for t in matcher.terms
+    ]
+    print(f"lexicon: {len(matcher.terms)} terms, automaton build {build * 1000:.2f} ms")
+
+    print(f"{'words':>8}{'aho-corasick ms':>18}{'regex/term ms':>16}{'found':>8}")
+    for n in args.words:
+        text = make_job_description(n, matcher.terms)
+        ac = min(timeit.repeat(lambda: matcher.find(text), number=1, repeat=args.repeat))
+        naive = min(timeit.repeat(lambda: naive_find(patterns, text), number=1, repeat=args.repeat))
+        print(f"{n:>8}{ac * 1000:>18.2f}{naive * 1000:>16.2f}{len(matcher.find(text)):>8}")
+
+
+if __name__ == "__main__":
+    main()
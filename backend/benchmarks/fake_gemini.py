@@ -0,0 +1,277 @@
+# backend/benchmarks/fake_gemini.py
+"""Local stand-in for the Gemini REST API, for benchmarks and load tests.
+
+Answers generateContent and streamGenerateContent (?alt=sse) for any
+model, after a latency drawn from a configurable distribution plus an
+optional per-output-token cost. The answer is a schema-valid resume. When
+the request carries a responseJsonSchema for something smaller (a
+per-section call), the answer is a sample object matching that schema.
+A share of calls fails with an HTTP error instead, so retries, circuit
+breakers and fallbacks are exercised too.
+Point the backend at it with GEMINI_BASE_URL.
+
+Latency specs (seconds):
+  fixed:0.8               always 0.8
+  uniform:0.2:1.5         uniform between 0.2 and 1.5
+  normal:0.8:0.2          mean 0.8, standard deviation 0.2
+  lognormal:0.8:0.5       median 0.8, sigma 0.5 (long tail, closest to the real API)
+  exp:0.8                 exponential with mean 0.8
+
+Usage: python -m backend.benchmarks.fake_gemini [--port 8765] [--latency lognormal:0.8:0.5]
+           [--ms-per-token 0] [--error-rate 0.02] [--error-status 503] [--response-kb 4] [--seed 1]
+"""
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+STREAM_CHUNK_CHARS = 256
+CHARS_PER_TOKEN = 4
+
+# Sample values by property name for schema-shaped answers
+_SAMPLES = {
+    "name": "Project 1",
+    "email": "ada@example.com",
+    "headline": "Backend Developer",
+    "title": "Software Intern",
+    "company": "Acme",
+    "summary": ["Backend developer focused on reliable Python services and data pipelines."],
+    "bullets": [
+        "Built a service handling batch and streaming workloads in Python",
+        "Designed the SQL schema and indexes; added caching for hot reads",
+        "Wrote load tests and dashboards used to gate releases",
+    ],
+    "skills": {"Languages": ["Python", "SQL", "Go"], "Tools": ["Docker", "PostgreSQL", "Redis"]},
+}
+
+
+def parse_latency(spec: str):
+    """Sampler `f(rng) -> seconds` for a latency spec like "lognormal:0.8:0.5"."""
+    kind, _, rest = spec.partition(":")
+    args = [float(a) for a in rest.split(":") if a]
+    samplers = {
+        "fixed": (1, lambda rng, v: v),
+        "uniform": (2, lambda rng, lo, hi: rng.uniform(lo, hi)),
+        "normal": (2, lambda rng, mean, sd: rng.gauss(mean, sd)),
+        "lognormal": (2, lambda rng, median, sigma: rng.lognormvariate(math.log(median), sigma)),
+        "exp": (1, lambda rng, mean: rng.expovariate(1 / mean) if mean > 0 else 0.0),
+    }
+    if kind not in samplers or len(args) != samplers[kind][0]:
+        raise ValueError(f"Bad latency spec {spec!r}; see --help")
+    arity, sample = samplers[kind]
+    return lambda rng: max(0.0, sample(rng, *args))
+
+
+def build_resume_text(response_kb: float) -> str:
+    """Resume JSON matching output_schema, padded with projects to ~response_kb."""
+    resume = {
+        "header": {"name": "Ada Lovelace", "email": "ada@example.com", "links": ["https://example.com"]},
+        "headline": "Backend Developer",
+        "summary": ["Backend developer focused on reliable Python services and data pipelines."],
+        "skills": {"Languages": ["Python", "SQL", "Go"], "Tools": ["Docker", "PostgreSQL", "Redis"]},
+        "projects": [],
+        "experience": [{"title": "Software Intern", "company": "Acme", "bullets": ["Cut p95 latency by 40%"]}],
+    }
+    target = int(response_kb * 1024)
+    i = 0
+    while i == 0 or len(json.dumps(resume)) < target:
+        resume["projects"].append({
+            "name": f"Project {i + 1}",
+            "bullets": [
+                f"Built service {i + 1} handling batch and streaming workloads in Python",
+                "Designed the SQL schema and indexes; added caching for hot reads",
+                "Wrote load tests and dashboards used to gate releases",
+            ],
+        })
+        i += 1
+    return json.dumps(resume)
+
+
+def sample_for_schema(schema: dict, key: str = ""):
+    """A value matching a JSON Schema, using _SAMPLES where the property name has one."""
+    if key in _SAMPLES:
+        return _SAMPLES[key]
+    kind = schema.get("type")
+    if kind == "object":
+        if "properties" in schema:
+            return {k: sample_for_schema(v, k) for k, v in schema["properties"].items()}
+        return {"Skills": [sample_for_schema(schema.get("additionalProperties") or {})]}
+    if kind == "array":
+        return [sample_for_schema(schema.get("items") or {}, key) for _ in range(2)]
+    if kind in ("number", "integer"):
+        return 1
+    if kind == "boolean":
+        return True
+    return f"Generated {key or 'text'} tailored to the job description"
+
+
+class FakeGemini:
+    """Threaded HTTP server speaking enough of the Gemini API for the SDK."""
+
+    def __init__(self, latency: str = "fixed:0.5", error_rate: float = 0.0, error_status: int = 503,
+                 response_kb: float = 4.0, seed: int = None, ms_per_token: float = 0.0):
+        self.sample_latency = parse_latency(latency)
+        self.latency = latency
+        self.ms_per_token = ms_per_token
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.text = build_resume_text(response_kb)
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._counters = {"requests": 0, "streams": 0, "errors": 0, "in_flight": 0, "peak_in_flight": 0}
+        self._server = None
+
+    def answer_for(self, body: bytes) -> str:
+        """The full resume, unless the request's schema asks for something else."""
+        try:
+            schema = json.loads(body or b"{}").get("generationConfig", {}).get("responseJsonSchema")
+        except (ValueError, AttributeError):
+            schema = None
+        if not isinstance(schema, dict) or "projects" in schema.get("properties", {}):
+            return self.text
+        return json.dumps(sample_for_schema(schema))
+
+    def output_seconds(self, text: str) -> float:
+        return len(text) / CHARS_PER_TOKEN * self.ms_per_token / 1000
+
+    def _draw(self):
+        """(latency seconds, fail?) for one call."""
+        with self._lock:
+            return self.sample_latency(self._rng), self._rng.random() < self.error_rate
+
+    def _count(self, name: str, amount: int = 1):
+        with self._lock:
+            self._counters[name] += amount
+            if name == "in_flight":
+                self._counters["peak_in_flight"] = max(self._counters["peak_in_flight"],
+                                                       self._counters["in_flight"])
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._counters)
+
+    def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Serve on a daemon thread; returns the base URL for GEMINI_BASE_URL."""
+        self._server = ThreadingHTTPServer((host, port), _handler(self))
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return f"http://{host}:{self._server.server_address[1]}"
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+def _candidate(text: str, finished: bool) -> dict:
+    candidate = {"content": {"role": "model", "parts": [{"text": text}]}, "index": 0}
+    if finished:
+        candidate["finishReason"] = "STOP"
+    return {"candidates": [candidate]}
+
+
+def _handler(fake: FakeGemini):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _send_json(self, status: int, body: dict):
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path.rstrip("/") == "/stats":
+                self._send_json(200, fake.stats())
+            else:
+                self._send_json(404, {"error": {"code": 404, "message": "Not found", "status": "NOT_FOUND"}})
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            path = self.path.split("?", 1)[0]
+            if not path.endswith((":generateContent", ":streamGenerateContent")):
+                self._send_json(404, {"error": {"code": 404, "message": "Not found", "status": "NOT_FOUND"}})
+                return
+
+            streaming = path.endswith(":streamGenerateContent")
+            fake._count("requests")
+            if streaming:
+                fake._count("streams")
+            fake._count("in_flight")
+            try:
+                latency, fail = fake._draw()
+                if fail:
+                    time.sleep(latency / 4)
+                    fake._count("errors")
+                    self._send_json(fake.error_status, {"error": {
+                        "code": fake.error_status, "message": "Injected failure", "status": "UNAVAILABLE",
+                    }})
+                elif streaming:
+                    self._stream(latency, fake.answer_for(body))
+                else:
+                    text = fake.answer_for(body)
+                    time.sleep(latency + fake.output_seconds(text))
+                    self._send_json(200, {
+                        **_candidate(text, True),
+                        "usageMetadata": {"promptTokenCount": 500, "candidatesTokenCount": len(text) // 4},
+                    })
+            finally:
+                fake._count("in_flight", -1)
+
+        def _stream(self, latency: float, text: str):
+            chunks = [text[i:i + STREAM_CHUNK_CHARS] for i in range(0, len(text), STREAM_CHUNK_CHARS)]
+            # Half the latency before the first token, the rest (plus the
+            # per-token cost) spread over the chunks
+            time.sleep(latency / 2)
+            latency += 2 * fake.output_seconds(text)
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            for i, chunk in enumerate(chunks):
+                if i:
+                    time.sleep(latency / 2 / len(chunks))
+                event = json.dumps(_candidate(chunk, i == len(chunks) - 1))
+                self.wfile.write(f"data: {event}\r\n\r\n".encode("utf-8"))
+                self.wfile.flush()
+            self.close_connection = True
+
+    return Handler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", default="lognormal:0.8:0.5", help="latency distribution (see above)")
+    parser.add_argument("--ms-per-token", type=float, default=0.0,
+                        help="extra latency per output token (~4 characters)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of calls that fail (0-1)")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--response-kb", type=float, default=4.0, help="approximate response size")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    fake = FakeGemini(args.latency, args.error_rate, args.error_status, args.response_kb, args.seed,
+                      args.ms_per_token)
+    url = fake.start(args.host, args.port)
+    print(f"fake Gemini on {url} (latency {args.latency}, error rate {args.error_rate}); "
+          f"export GEMINI_BASE_URL={url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        fake.stop()
+
+
+if __name__ == "__main__":
+    main()
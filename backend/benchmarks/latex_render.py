@@ -0,0 +1,191 @@
+# backend/benchmarks/latex_render.py
+"""Micro-benchmark for resume_json_to_latex on large resumes.
+
+Compares the current renderer against a condensed copy of the previous
+implementation (ten chained str.replace passes per field, += string
+building), kept below as the baseline. "cold" is a one-shot render,
+which skips the fragment cache; "edit" renders with the cache and changes
+one bullet between renders, which is what the editor's live preview does.
+
+The "escape" table times escaping every string of the resume three ways:
+the old ten-pass chain, the current escape_latex, and a single-pass
+re.sub with a dict lookup (the alternative the renderer does not use).
+
+Usage: python -m backend.benchmarks.latex_render [--bullets 400] [--repeat 50]
+"""
+import argparse
+import random
+import re
+import string
+import timeit
+
+from backend.services.latex_render import clear_fragment_cache, escape_latex, resume_json_to_latex
+
+
+def _legacy_escape_latex(s) -> str:
+    if s is None:
+        return ""
+    s = str(s)
+    s = s.replace("\\", "\\textbackslash{}")
+    s = s.replace("&", "\\&")
+    s = s.replace("%", "\\%")
+    s = s.replace("$", "\\$")
+    s = s.replace("#", "\\#")
+    s = s.replace("_", "\\_")
+    s = s.replace("{", "\\{")
+    s = s.replace("}", "\\}")
+    s = s.replace("~", "\\textasciitilde{}")
+    s = s.replace("^", "\\textasciicircum{}")
+    return s
+
+
+_SPECIALS = {
+    "\\": "\\textbackslash{}", "&": "\\&", "%": "\\%", "$": "\\$", "#": "\\#", "_": "\\_",
+    "{": "\\{", "}": "\\}", "~": "\\textasciitilde{}", "^": "\\textasciicircum{}",
+}
+_SPECIAL_RE = re.compile(r"[\\&%$#_{}~^]")
+
+
+def _single_pass_escape(s) -> str:
+    return _SPECIAL_RE.sub(lambda m: _SPECIALS[m.group()], str(s))
+
+
+def _strings(value) -> list:
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, dict):
+        value = [*value, *value.values()]
+    return [s for item in (value if isinstance(value, list) else []) for s in _strings(item)]
+
+
+def _legacy_itemize(lines) -> str:
+    lines = [l for l in (_legacy_escape_latex(l).strip() for l in (lines or [])) if l]
+    if not lines:
+        return ""
+    out = "\\begin{itemize}\\itemsep 0pt\n"
+    for l in lines:
+        out += f"  \\item {l}\n"
+    out += "\\end{itemize}\n"
+    return out
+
+
+def legacy_resume_json_to_latex(resume: dict) -> str:
+    header = resume.get("header") or {}
+    name = _legacy_escape_latex(header.get("name") or "Your Name")
+    email = _legacy_escape_latex(header.get("email") or "")
+    links = [_legacy_escape_latex(x) for x in header.get("links") or [] if x]
+    headline = _legacy_escape_latex(resume.get("headline") or "")
+    contact_line = " | ".join(p for p in [email] + links if p)
+
+    skill_lines = ""
+    for section, items in (resume.get("skills") or {}).items():
+        items = [_legacy_escape_latex(i) for i in items if i]
+        if items:
+            skill_lines += f"\\textbf{{{_legacy_escape_latex(section)}:}} " + ", ".join(items) + r"\\"
+            skill_lines += "\n"
+
+    latex = r"""\documentclass[letterpaper,11pt]{article}
+\usepackage[margin=0.75in]{geometry}
+\usepackage{enumitem}
+\usepackage[hidelinks]{hyperref}
+\setlist[itemize]{leftmargin=*,nosep}
+
+\begin{document}
+
+\begin{center}
+{\LARGE \textbf{""" + name + r"""}}\\
+""" + _legacy_escape_latex(contact_line) + r"""\\
+\textit{""" + headline + r"""}
+\end{center}
+
+\section*{Summary}
+""" + (_legacy_itemize(resume.get("summary")) or " ") + r"""
+\section*{Skills}
+""" + (skill_lines or " ") + r"""
+
+\section*{Experience}
+"""
+    for x in resume.get("experience") or []:
+        header_line = "\\textbf{" + _legacy_escape_latex(x.get("title")) + "}"
+        header_line += " --- " + _legacy_escape_latex(x.get("company"))
+        header_line += " \\hfill " + _legacy_escape_latex(x.get("dates"))
+        latex += header_line + "\n\n"
+        latex += _legacy_itemize(x.get("bullets"))
+        latex += "\\vspace{2mm}\n"
+
+    latex += "\\section*{Projects}\n"
+    for p in resume.get("projects") or []:
+        latex += f"\\textbf{{{_legacy_escape_latex(p.get('name'))}}}\n\n"
+        latex += _legacy_itemize(p.get("bullets"))
+        latex += "\\vspace{2mm}\n"
+
+    latex += r"\end{document}"
+    return latex
+
+
+def make_resume(bullets: int, seed: int = 0) -> dict:
+    """A resume with `bullets` bullets spread over experience and projects."""
+    rng = random.Random(seed)
+    alphabet = string.ascii_letters + "      &%$#_{}~^"
+
+    def text(n):
+        return "".join(rng.choice(alphabet) for _ in range(n))
+
+    entries = max(1, bullets // 10)
+    per_entry = max(1, bullets // (2 * entries))
+    return {
+        "header": {"name": "Ada Lovelace", "email": "ada@example.com",
+                   "links": ["https://github.com/ada_l", "https://ada.dev/#cv"]},
+        "headline": "Senior Backend Engineer & Data Wrangler",
+        "summary": [text(120) for _ in range(4)],
+        "skills": {f"Group {i}": [text(12) for _ in range(12)] for i in range(6)},
+        "experience": [
+            {"title": text(20), "company": text(15), "dates": "2020 -- 2024",
+             "bullets": [text(110) for _ in range(per_entry)]}
+            for _ in range(entries)
+        ],
+        "projects": [
+            {"name": text(18), "bullets": [text(100) for _ in range(per_entry)]}
+            for _ in range(entries)
+        ],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bullets", type=int, nargs="+", default=[50, 400, 2000])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    print(f"{'bullets':>8}{'legacy ms':>12}{'cold ms':>10}{'edit ms':>10}{'cold x':>8}{'edit x':>8}")
+    for n in args.bullets:
+        resume = make_resume(n)
+        bullets = resume["experience"][0]["bullets"]
+
+        def cold():
+            resume_json_to_latex(resume)
+
+        def edit():
+            bullets[0] += "!"
+            resume_json_to_latex(resume, cached=True)
+
+        legacy = min(timeit.repeat(lambda: legacy_resume_json_to_latex(resume), number=1, repeat=args.repeat))
+        cold_t = min(timeit.repeat(cold, number=1, repeat=args.repeat))
+        clear_fragment_cache()
+        resume_json_to_latex(resume, cached=True)
+        edit_t = min(timeit.repeat(edit, number=1, repeat=args.repeat))
+        print(f"{n:>8}{legacy * 1000:>12.3f}{cold_t * 1000:>10.3f}{edit_t * 1000:>10.3f}"
+              f"{legacy / cold_t:>7.2f}x{legacy / edit_t:>7.2f}x")
+
+    print(f"\nescape\n{'bullets':>8}{'legacy ms':>12}{'current ms':>12}{'1-pass ms':>12}")
+    for n in args.bullets:
+        strings = _strings(make_resume(n))
+        assert [escape_latex(t) for t in strings] == [_single_pass_escape(t) for t in strings]
+        times = [
+            min(timeit.repeat(lambda: [fn(t) for t in strings], number=1, repeat=args.repeat))
+            for fn in (_legacy_escape_latex, escape_latex, _single_pass_escape)
+        ]
+        print(f"{n:>8}" + "".join(f"{t * 1000:>12.3f}" for t in times))
+
+if __name__ == "__main__":
+    main()
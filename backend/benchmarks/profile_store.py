@@ -0,0 +1,141 @@
+# backend/benchmarks/profile_store.py
+"""Inline candidates vs stored profile references on /api/ai/resume.
+
+Clients re-send the same large profile with cosmetic differences (stray
+whitespace, a skill repeated in another case), as form-backed frontends
+do. Inline, each variant is a different payload and so a response cache
+miss and a Gemini call. By reference ("candidate_ref": "<id>@<version>")
+the profile is stored once, normalized, and every request for the same
+job hits the cache. Reports request body size, upstream calls and
+p50/p95 per mode against the fake Gemini server.
+
+Usage: python -m backend.benchmarks.profile_store [--requests 200] [--jobs 5] [--projects 20]
+           [--latency fixed:0.2] [--json]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from backend.benchmarks.fake_gemini import FakeGemini
+
+
+def _profile(projects: int) -> dict:
+    return {
+        "name": "Ada Lovelace",
+        "email": "ada@example.com",
+        "links": ["https://github.com/ada"],
+        "skills": ["Python", "SQL", "Flask", "Docker", "PostgreSQL", "React", "Go", "Kubernetes"],
+        "projects": [
+            {"name": f"Project {i + 1}", "bullets": [
+                f"Built service {i + 1} with Python and Flask behind a REST API",
+                "Designed the PostgreSQL schema and added Redis caching for hot reads",
+                "Wrote load tests and dashboards used to gate releases",
+            ]}
+            for i in range(projects)
+        ],
+        "experience": [
+            {"title": "Software Intern", "company": f"Company {i + 1}",
+             "bullets": ["Shipped Python services", "Cut p95 latency by 40%"]}
+            for i in range(3)
+        ],
+    }
+
+
+def _variant(profile: dict, rng: random.Random) -> dict:
+    """The same profile as a client might re-send it."""
+    variant = json.loads(json.dumps(profile))
+    project = rng.choice(variant["projects"])
+    project["bullets"][0] += " " * rng.randint(1, 3)
+    if rng.random() < 0.5:
+        variant["skills"].append(rng.choice(variant["skills"]).lower())
+    return variant
+
+
+def _percentile(values, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def run_mode(client, bodies: list, fake: FakeGemini) -> dict:
+    calls_before = fake.stats()["requests"]
+    times, sizes = [], []
+    for body in bodies:
+        data = json.dumps(body)
+        sizes.append(len(data))
+        started = time.perf_counter()
+        response = client.post("/api/ai/resume", data=data, content_type="application/json")
+        times.append(time.perf_counter() - started)
+        if response.status_code != 200:
+            raise RuntimeError(response.get_data(as_text=True))
+    return {
+        "body_bytes": round(statistics.mean(sizes)),
+        "upstream_calls": fake.stats()["requests"] - calls_before,
+        "p50_ms": round(statistics.median(times) * 1000, 2),
+        "p95_ms": round(_percentile(times, 0.95) * 1000, 2),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--jobs", type=int, default=5, help="distinct job descriptions")
+    parser.add_argument("--projects", type=int, default=20)
+    parser.add_argument("--latency", default="fixed:0.2")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args(argv)
+
+    fake = FakeGemini(args.latency, seed=args.seed)
+    workdir = tempfile.mkdtemp(prefix="intersync_bench_")
+    os.environ.update(
+        AI_ENABLED="true",
+        GEMINI_API_KEY="bench",
+        GEMINI_BASE_URL=fake.start(),
+        GEMINI_MODEL_CHAIN="models/gemini-2.5-flash",
+        JOB_WORKERS="0",
+        RESUME_CACHE_PATH=os.path.join(workdir, "cache.sqlite3"),
+        PROFILE_STORE_PATH=os.path.join(workdir, "profiles.sqlite3"),
+        SINGLE_FLIGHT_DIR=os.path.join(workdir, "single_flight"),
+    )
+    from backend.app import create_app
+
+    client = create_app().test_client()
+    rng = random.Random(args.seed)
+    profile = _profile(args.projects)
+    jobs = [f"Backend Developer #{j}: Python, Flask, PostgreSQL, REST APIs" for j in range(args.jobs)]
+    picks = [rng.randrange(args.jobs) for _ in range(args.requests)]
+
+    try:
+        inline = run_mode(client, [
+            {"target_role": "Backend Developer", "job_description": jobs[j], "candidate": _variant(profile, rng)}
+            for j in picks
+        ], fake)
+        ref = client.post("/api/profiles", json={"candidate": profile}).get_json()["ref"]
+        stored = run_mode(client, [
+            {"target_role": "Backend Developer", "job_description": jobs[j], "candidate_ref": ref}
+            for j in picks
+        ], fake)
+    finally:
+        fake.stop()
+
+    report = {
+        "config": {"requests": args.requests, "jobs": args.jobs, "projects": args.projects, "latency": args.latency},
+        "inline": inline,
+        "reference": stored,
+    }
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    columns = ["body_bytes", "upstream_calls", "p50_ms", "p95_ms"]
+    print(f"{'mode':<12}" + "".join(f"{c:>16}" for c in columns))
+    for mode in ("inline", "reference"):
+        print(f"{mode:<12}" + "".join(f"{report[mode][c]:>16}" for c in columns))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# backend/benchmarks/resume_export.py
+"""Cohort LaTeX export: one /export-latex call per student vs the bulk zip.
+
+The per-student baseline is what advisors do today: a POST to
+/api/resume/export-latex for every student. The bulk path is one POST
+to /api/resume/export-latex/bulk, with the zip consumed chunk by chunk.
+Peak traced memory (tracemalloc) of the bulk export is reported for the
+cohort and for ten times the cohort. It grows with the request body and
+the zip central directory (about 1 KB per file), not with the archive.
+
+Usage: python -m backend.benchmarks.resume_export [--students 500] [--json]
+"""
+import argparse
+import json
+import os
+import random
+import time
+import tracemalloc
+
+
+def _entries(students: int, project_ids: list, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    return [
+        {
+            "user_data": {
+                "name": f"Student {i} & Co.",
+                "targetRole": "Backend Developer",
+                "skills": ["Python", "SQL", "C#", "Docker"][:rng.randint(1, 4)],
+                "interests": rng.sample(project_ids, 2),
+            },
+            "project_ids": rng.sample(project_ids, 3),
+        }
+        for i in range(students)
+    ]
+
+
+def per_student(client, entries: list) -> dict:
+    started = time.perf_counter()
+    total = 0
+    for entry in entries:
+        total += len(client.post("/api/resume/export-latex", json=entry).get_data())
+    return {"seconds": round(time.perf_counter() - started, 3), "requests": len(entries), "bytes": total}
+
+
+def bulk(client, entries: list) -> dict:
+    tracemalloc.start()
+    started = time.perf_counter()
+    response = client.post("/api/resume/export-latex/bulk", json={"entries": entries}, buffered=False)
+    total, chunks = 0, 0
+    for chunk in response.response:
+        total += len(chunk)
+        chunks += 1
+    seconds = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": round(seconds, 3), "requests": 1, "bytes": total, "chunks": chunks,
+            "peak_mb": round(peak / 2 ** 20, 2)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=500)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("JOB_WORKERS", "0")
+    os.environ["RESUME_EXPORT_MAX_ENTRIES"] = str(args.students * 10)
+    from backend.app import create_app
+    from backend.data.catalog import get_project_templates
+
+    client = create_app().test_client()
+    project_ids = list(get_project_templates())
+    entries = _entries(args.students, project_ids)
+
+    report = {
+        "students": args.students,
+        "per_student": per_student(client, entries),
+        "bulk": bulk(client, entries),
+        "bulk_10x": bulk(client, _entries(args.students * 10, project_ids, seed=1)),
+    }
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"{'mode':<14}{'students':>10}{'seconds':>10}{'requests':>10}{'bytes':>12}{'peak_mb':>10}")
+    for mode, students in (("per_student", args.students), ("bulk", args.students),
+                           ("bulk_10x", args.students * 10)):
+        row = report[mode]
+        print(f"{mode:<14}{students:>10}{row['seconds']:>10}{row['requests']:>10}{row['bytes']:>12}"
+              f"{row.get('peak_mb', '-'):>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+# backend/benchmarks/section_tailor.py
+"""Wall time of one tailored resume: monolithic call vs concurrent section calls.
+
+Runs the AI pipeline (run_resume_pipeline, cache off) against the fake
+Gemini server. The server's latency is a per-call base (--latency) plus
+a cost per output token (--ms-per-token), so a long answer takes longer,
+as with the real API. The monolithic answer is sized to match the resume
+the section calls put together, so both modes produce the same amount of
+output. Reports p50/p95/p99 wall time per mode, upstream calls, and
+sections that fell back to the demo resume.
+
+Usage: python -m backend.benchmarks.section_tailor [--requests 30] [--projects 4] [--experience 2]
+           [--latency lognormal:0.4:0.4] [--ms-per-token 4] [--error-rate 0] [--json]
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+
+from backend.benchmarks.fake_gemini import FakeGemini, build_resume_text
+
+
+def _candidate(projects: int, experience: int) -> dict:
+    return {
+        "name": "Ada Lovelace",
+        "email": "ada@example.com",
+        "skills": ["Python", "SQL", "Flask", "Docker", "PostgreSQL"],
+        "projects": [
+            {"name": f"Project {i + 1}", "bullets": [f"Built a Python API {i + 1} with Flask and PostgreSQL"]}
+            for i in range(projects)
+        ],
+        "experience": [
+            {"title": "Software Intern", "company": f"Company {i + 1}", "bullets": ["Shipped Python services"]}
+            for i in range(experience)
+        ],
+    }
+
+
+def _percentile(values, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _section_fallbacks() -> float:
+    from backend.services.metrics import ai_sections
+
+    return sum(value for _, labels, value in ai_sections.samples() if 'outcome="ok"' not in labels)
+
+
+def run_mode(mode: str, requests: int, candidate: dict, fake: FakeGemini) -> dict:
+    from backend.services.resume_pipeline import run_resume_pipeline
+
+    os.environ["GEMINI_SECTION_MODE"] = "true" if mode == "sections" else "false"
+    calls_before = fake.stats()["requests"]
+    fallbacks_before = _section_fallbacks()
+    times, used_ai, size = [], 0, 0
+    for i in range(requests):
+        started = time.perf_counter()
+        # A distinct job description per request keeps every call a miss
+        result = run_resume_pipeline("Backend Developer", f"Python Flask SQL role #{i}", candidate)
+        times.append(time.perf_counter() - started)
+        used_ai += result.used_ai
+        size = max(size, len(json.dumps(result.resume_json)))
+    return {
+        "p50_ms": round(statistics.median(times) * 1000, 1),
+        "p95_ms": round(_percentile(times, 0.95) * 1000, 1),
+        "p99_ms": round(_percentile(times, 0.99) * 1000, 1),
+        "used_ai_rate": round(used_ai / requests, 3),
+        "upstream_calls": fake.stats()["requests"] - calls_before,
+        "sections_from_demo": int(_section_fallbacks() - fallbacks_before),
+        "resume_bytes": size,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=30)
+    parser.add_argument("--projects", type=int, default=4)
+    parser.add_argument("--experience", type=int, default=2)
+    parser.add_argument("--latency", default="lognormal:0.4:0.4", help="per-call base latency (see fake_gemini)")
+    parser.add_argument("--ms-per-token", type=float, default=4.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--deadline", type=float, default=None, help="GEMINI_SECTION_DEADLINE_SECONDS")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args(argv)
+
+    fake = FakeGemini(args.latency, args.error_rate, seed=args.seed, ms_per_token=args.ms_per_token)
+    workdir = tempfile.mkdtemp(prefix="intersync_bench_")
+    os.environ.update(
+        AI_ENABLED="true",
+        GEMINI_API_KEY="bench",
+        GEMINI_BASE_URL=fake.start(),
+        GEMINI_MODEL_CHAIN="models/gemini-2.5-flash",
+        RESUME_CACHE_ENABLED="false",
+        SINGLE_FLIGHT_DIR=os.path.join(workdir, "single_flight"),
+    )
+    if args.deadline:
+        os.environ["GEMINI_SECTION_DEADLINE_SECONDS"] = str(args.deadline)
+
+    candidate = _candidate(args.projects, args.experience)
+    try:
+        # Sections first: its output size sets the monolithic answer's size
+        sections = run_mode("sections", args.requests, candidate, fake)
+        fake.text = build_resume_text(sections["resume_bytes"] / 1024)
+        monolithic = run_mode("monolithic", args.requests, candidate, fake)
+    finally:
+        fake.stop()
+
+    report = {
+        "config": {"latency": args.latency, "ms_per_token": args.ms_per_token, "error_rate": args.error_rate,
+                   "projects": args.projects, "experience": args.experience, "requests": args.requests},
+        "monolithic": monolithic,
+        "sections": sections,
+    }
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    columns = ["p50_ms", "p95_ms", "p99_ms", "used_ai_rate", "upstream_calls", "sections_from_demo"]
+    print(f"{'mode':<12}" + "".join(f"{c:>20}" for c in columns))
+    for mode in ("monolithic", "sections"):
+        print(f"{mode:<12}" + "".join(f"{report[mode][c]:>20}" for c in columns))
+    print(f"p95 speedup: {monolithic['p95_ms'] / sections['p95_ms']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+# backend/benchmarks/semantic_match.py
+"""Benchmark batched semantic project matching against the per-template loop.
+
+The catalog is the real one padded with synthetic templates (variants of
+the real ones with shuffled tags), and users draw interests from the tag
+vocabulary. The baseline is the current route logic: call
+calculate_project_relevance for every (user, template) pair and sort.
+The batched path is SemanticIndex.top_k: two matrix multiplies plus
+argpartition per chunk of users.
+
+Usage: python -m backend.benchmarks.semantic_match [--templates 2000] [--users 5000] [--json]
+"""
+import argparse
+import json
+import random
+import time
+
+from backend.data.catalog import InMemoryCatalog, get_catalog
+from backend.services.resume_utils import calculate_project_relevance
+from backend.services.semantic_match import SemanticIndex
+
+SKILLS = ["python", "javascript", "c++", "java", "sql", "go", "rust", "typescript"]
+
+
+def synthetic_catalog(size: int, seed: int = 0) -> InMemoryCatalog:
+    rng = random.Random(seed)
+    base = dict(get_catalog().items())
+    templates = dict(base)
+    keys = list(base)
+    i = 0
+    while len(templates) < size:
+        source = base[keys[i % len(keys)]]
+        tags = list(source.get("tags", []))
+        rng.shuffle(tags)
+        templates[f"{keys[i % len(keys)]}_v{i}"] = {
+            **source,
+            "name": f"{source['name']} #{i}",
+            "tags": tags[:rng.randint(2, len(tags))] if tags else [],
+            "languages": rng.sample(SKILLS, 2),
+        }
+        i += 1
+    return InMemoryCatalog(templates)
+
+
+def synthetic_users(count: int, catalog, seed: int = 1) -> list:
+    rng = random.Random(seed)
+    vocabulary = sorted({t for pid in catalog for t in catalog[pid].get("tags", [])} | set(catalog))
+    return [
+        {
+            "id": n,
+            "interests": rng.sample(vocabulary, rng.randint(1, 3)),
+            "skills": rng.sample(SKILLS, rng.randint(1, 3)),
+        }
+        for n in range(count)
+    ]
+
+
+def loop_top_k(users, catalog, k: int) -> list:
+    items = list(catalog.items())
+    out = []
+    for user in users:
+        scored = [(pid, calculate_project_relevance(user, pid, info)) for pid, info in items]
+        scored.sort(key=lambda item: -item[1])
+        out.append(scored[:k])
+    return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--templates", type=int, default=2000)
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--chunk", type=int, default=2048, help="users per matrix multiply")
+    parser.add_argument("--loop-users", type=int, default=500,
+                        help="users timed through the per-template loop (extrapolated to --users)")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args(argv)
+
+    catalog = synthetic_catalog(args.templates)
+    users = synthetic_users(args.users, catalog)
+
+    started = time.perf_counter()
+    index = SemanticIndex(catalog)
+    build_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    for start in range(0, len(users), args.chunk):
+        index.top_k(users[start:start + args.chunk], args.k)
+    batch_s = time.perf_counter() - started
+
+    single = []
+    for user in users[:200]:
+        started = time.perf_counter()
+        index.top_k([user], args.k)
+        single.append(time.perf_counter() - started)
+    single.sort()
+
+    # The /api/projects/generate path: posting lists, no dense matrices
+    query = []
+    for user in users[:200]:
+        started = time.perf_counter()
+        index.interest_bonuses(user["interests"])
+        query.append(time.perf_counter() - started)
+    query.sort()
+
+    sample = users[:min(args.loop_users, len(users))]
+    started = time.perf_counter()
+    loop_top_k(sample, catalog, args.k)
+    loop_s = (time.perf_counter() - started) * len(users) / max(1, len(sample))
+
+    probes = {q: index.top_k([{"interests": [q]}], 3)[0] for q in ("guitar", "stock trading", "drones")}
+    result = {
+        "templates": len(catalog),
+        "users": len(users),
+        "dim": index.dim,
+        "index_build_ms": round(build_ms, 1),
+        "batch_seconds": round(batch_s, 3),
+        "batch_users_per_second": round(len(users) / batch_s),
+        "single_user_p50_ms": round(single[len(single) // 2] * 1000, 3),
+        "request_path_p50_ms": round(query[len(query) // 2] * 1000, 3),
+        "loop_seconds_estimated": round(loop_s, 3),
+        "speedup": round(loop_s / batch_s, 1),
+        "probes": {q: [pid for pid, _, _ in top] for q, top in probes.items()},
+    }
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+
+    print(f"{result['templates']} templates x {result['users']} users, dim {result['dim']}, "
+          f"index build {result['index_build_ms']} ms")
+    print(f"  batched top-{args.k}:  {result['batch_seconds']:.3f} s "
+          f"({result['batch_users_per_second']} users/s)")
+    print(f"  per-template loop: {result['loop_seconds_estimated']:.3f} s "
+          f"(timed on {len(sample)} users)")
+    print(f"  speedup: {result['speedup']}x, single user p50 {result['single_user_p50_ms']} ms, "
+          f"request path (interest_bonuses) p50 {result['request_path_p50_ms']} ms")
+    for q, ids in result["probes"].items():
+        print(f"  {q!r:>16} -> {', '.join(ids)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# backend/benchmarks/startup.py
+"""Cold-start benchmark.
+
+Each run is a fresh interpreter, so module caches are cold the way they
+are on a newly scheduled pod or serverless instance. Reported per phase:
+
+  import         `import backend.app`
+  create_app     building the Flask app
+  first_health   first GET /api/health
+  first_catalog  first POST /api/projects/generate (loads the catalog)
+  first_ai       first POST /api/ai/resume (loads the AI service; demo path)
+
+Usage: python -m backend.benchmarks.startup [--runs 10] [--json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_PROBE = r"""
+import json, os, time
+os.environ["AI_ENABLED"] = "false"
+t0 = time.perf_counter()
+import backend.app
+t1 = time.perf_counter()
+app = backend.app.create_app()
+t2 = time.perf_counter()
+client = app.test_client()
+client.get("/api/health")
+t3 = time.perf_counter()
+client.post("/api/projects/generate", json={"interests": ["music"], "skills": ["python"]})
+t4 = time.perf_counter()
+client.post("/api/ai/resume", json={
+    "target_role": "Backend Developer",
+    "job_description": "Python, SQL",
+    "candidate": {"name": "Ada", "skills": ["Python"]},
+})
+t5 = time.perf_counter()
+print(json.dumps({
+    "import": t1 - t0,
+    "create_app": t2 - t1,
+    "first_health": t3 - t2,
+    "first_catalog": t4 - t3,
+    "first_ai": t5 - t4,
+    "total": t5 - t0,
+}))
+"""
+
+
+def run_once() -> dict:
+    env = dict(os.environ, PYTHONPATH=ROOT, PYTHONDONTWRITEBYTECODE="0")
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE], cwd=ROOT, env=env,
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args(argv)
+
+    run_once()  # warm the bytecode cache so we measure imports, not compilation
+    runs = [run_once() for _ in range(args.runs)]
+
+    report = {}
+    for phase in runs[0]:
+        samples = sorted(r[phase] * 1000 for r in runs)
+        report[phase] = {
+            "median_ms": round(statistics.median(samples), 2),
+            "min_ms": round(samples[0], 2),
+            "max_ms": round(samples[-1], 2),
+        }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"{'phase':<15}{'median ms':>12}{'min ms':>10}{'max ms':>10}")
+    for phase, r in report.items():
+        print(f"{phase:<15}{r['median_ms']:>12}{r['min_ms']:>10}{r['max_ms']:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+# backend/benchmarks/suite.py
+"""End-to-end benchmark of every endpoint, with Gemini faked locally.
+
+Starts backend.benchmarks.fake_gemini on a free port, points the app at
+it (GEMINI_BASE_URL), then drives each endpoint of every blueprint
+(health, projects, skills, resume, ai_resume, metrics) from --concurrency threads
+through the WSGI stack. AI requests use a distinct job description each,
+so they miss the response cache and reach the fake upstream, except in
+the ai_resume_cached scenario. Reported per endpoint: p50/p95/p99
+latency, throughput, error and fallback rates, and process RSS after the
+run (with the growth during it).
+
+--save-baseline writes the results to a JSON file; --baseline compares
+against one and exits with status 1 on a regression (p95 or throughput
+worse than --tolerance, with --min-delta-ms of slack per request for
+sub-millisecond endpoints, a higher error rate, or a fallback rate more
+than --fallback-tolerance above the baseline's, since a broken AI path
+answers every request with the faster demo resume), so a deploy can be
+gated on it:
+
+    python -m backend.benchmarks.suite --save-baseline bench-baseline.json   # on main
+    python -m backend.benchmarks.suite --baseline bench-baseline.json        # on the change
+
+Usage: python -m backend.benchmarks.suite [--requests 200] [--ai-requests 40]
+           [--concurrency 8] [--latency lognormal:0.2:0.3] [--error-rate 0.0]
+           [--response-kb 4] [--only health,ai_resume] [--gemini-url URL]
+           [--baseline FILE] [--save-baseline FILE] [--tolerance 0.25]
+           [--fallback-tolerance 0.05] [--json]
+"""
+import argparse
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+CANDIDATE = {
+    "name": "Ada Lovelace",
+    "email": "ada@example.com",
+    "skills": ["Python", "SQL", "Docker"],
+    "projects": [
+        {"name": "API server", "bullets": ["Built a REST API in Flask", "Added caching with Redis"]},
+        {"name": "Music recommender", "bullets": ["Trained a collaborative filtering model"]},
+    ],
+    "experience": [{"title": "Intern", "company": "Acme", "bullets": ["Automated reports with SQL"]}],
+}
+
+
+def _ai_body(i: int) -> dict:
+    return {
+        "target_role": "Backend Developer",
+        "job_description": f"Backend role #{i}: Python, SQL, Docker, REST APIs and caching.",
+        "candidate": CANDIDATE,
+    }
+
+
+def _render_body(i: int) -> dict:
+    # The live-preview loop: the same resume with one bullet edited each time
+    first, *rest = CANDIDATE["projects"]
+    return {"resume_json": {
+        "header": {"name": CANDIDATE["name"], "email": CANDIDATE["email"]},
+        "headline": "Backend Developer",
+        "summary": ["Backend developer focused on Python APIs and caching."],
+        "skills": {"Languages": ["Python", "SQL"], "Tools": ["Docker", "Redis"]},
+        "experience": [{**x, "dates": "2023"} for x in CANDIDATE["experience"]],
+        "projects": [
+            {**first, "bullets": first["bullets"] + [f"Edit #{i % 10}"]},
+            *rest,
+        ],
+    }}
+
+
+# name -> (method, path, body(i) or None, options)
+SCENARIOS = {
+    "health": ("GET", "/api/health", None, {}),
+    "health_ready": ("GET", "/api/health/ready", None, {}),
+    "projects": ("POST", "/api/projects/generate",
+                 lambda i: {"interests": ["music", "gaming"], "skills": ["python", "javascript"],
+                            "page": 1 + i % 2}, {}),
+    "skills": ("POST", "/api/skills/graph",
+               lambda i: {"skills": ["python", "sql"], "target_skill": "machine learning",
+                          "max_projects": 3}, {}),
+    "resume": ("POST", "/api/resume/generate", lambda i: {"project_id": "music"}, {}),
+    "resume_latex": ("POST", "/api/resume/export-latex",
+                     lambda i: {"user_data": {"name": "Ada", "email": "ada@example.com"},
+                                "project_ids": ["music", "gaming", "robotics"]}, {}),
+    "ai_resume": ("POST", "/api/ai/resume", _ai_body, {"ai": True}),
+    "ai_resume_cached": ("POST", "/api/ai/resume", lambda i: _ai_body(0),
+                         {"ai": True, "env": {"RESUME_CACHE_ENABLED": "true"}}),
+    "ai_resume_tex": ("POST", "/api/ai/resume.tex", _ai_body, {"ai": True}),
+    "ai_resume_stream": ("POST", "/api/ai/resume/stream", _ai_body, {"ai": True}),
+    "ai_resume_batch": ("POST", "/api/ai/resume/batch",
+                        lambda i: {"items": [_ai_body(i * 4 + k) for k in range(4)], "concurrency": 4},
+                        {"ai": True}),
+    "ai_resume_render": ("POST", "/api/ai/resume/render", _render_body, {}),
+    "ai_cache_stats": ("GET", "/api/ai/cache/stats", None, {}),
+    "ai_router_stats": ("GET", "/api/ai/router/stats", None, {}),
+    "ai_admission_stats": ("GET", "/api/ai/admission/stats", None, {}),
+    "metrics": ("GET", "/api/metrics", None, {}),
+}
+
+WARMUP = 3
+
+
+def current_rss_mb() -> float:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # No procfs (macOS): peak RSS is the best available
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def percentile(sorted_values: list, q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = q * (len(sorted_values) - 1)
+    lo = int(rank)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (rank - lo)
+
+
+def _fell_back(resp) -> bool:
+    """Whether an AI response was served (even partly) from the demo fallback."""
+    if "X-Used-AI" in resp.headers:
+        return resp.headers["X-Used-AI"] == "false"
+    if resp.mimetype == "text/event-stream":
+        return "event: fallback" in resp.get_data(as_text=True)
+    if resp.mimetype == "application/x-ndjson":
+        return '"status": "fallback"' in resp.get_data(as_text=True)
+    return (resp.get_json(silent=True) or {}).get("used_ai") is False
+
+
+def run_scenario(client, name: str, requests: int, concurrency: int) -> dict:
+    method, path, body, options = SCENARIOS[name]
+    saved_env = {k: os.environ.get(k) for k in options.get("env", {})}
+    os.environ.update(options.get("env", {}))
+
+    def one(i):
+        started = time.perf_counter()
+        resp = client.open(path, method=method, json=body(i) if body else None)
+        resp.get_data()  # drain streamed bodies
+        return time.perf_counter() - started, resp.status_code, options.get("ai") and _fell_back(resp)
+
+    try:
+        for i in range(WARMUP):
+            one(-1 - i)
+        rss_before = current_rss_mb()
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(one, range(requests)))
+        wall = time.perf_counter() - started
+    finally:
+        for k, v in saved_env.items():
+            if v is None:
+                os.environ.pop(k, None)
+            else:
+                os.environ[k] = v
+
+    latencies = sorted(r[0] * 1000 for r in results)
+    rss_after = current_rss_mb()
+    return {
+        "requests": requests,
+        "p50_ms": round(percentile(latencies, 0.50), 2),
+        "p95_ms": round(percentile(latencies, 0.95), 2),
+        "p99_ms": round(percentile(latencies, 0.99), 2),
+        "rps": round(requests / wall, 1),
+        "error_rate": round(sum(r[1] >= 500 for r in results) / requests, 4),
+        "fallback_rate": round(sum(bool(r[2]) for r in results) / requests, 4),
+        "rss_mb": round(rss_after, 1),
+        "rss_delta_mb": round(rss_after - rss_before, 1),
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float, min_delta_ms: float, concurrency: int,
+            fallback_tolerance: float = 0.05) -> list:
+    """Human-readable regressions of `results` against `baseline`."""
+
+    def slot_ms(rps):
+        # Time each of the `concurrency` clients spent per request
+        return concurrency * 1000 / rps if rps else float("inf")
+
+    regressions = []
+    for name, cur in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if cur["p95_ms"] > base["p95_ms"] * (1 + tolerance) and cur["p95_ms"] - base["p95_ms"] > min_delta_ms:
+            regressions.append(f"{name}: p95 {base['p95_ms']} -> {cur['p95_ms']} ms")
+        if cur["rps"] < base["rps"] * (1 - tolerance) and slot_ms(cur["rps"]) - slot_ms(base["rps"]) > min_delta_ms:
+            regressions.append(f"{name}: throughput {base['rps']} -> {cur['rps']} req/s")
+        if cur["error_rate"] > base["error_rate"] + 0.01:
+            regressions.append(f"{name}: error rate {base['error_rate']} -> {cur['error_rate']}")
+        if cur["fallback_rate"] > base.get("fallback_rate", 0.0) + fallback_tolerance:
+            regressions.append(f"{name}: fallback rate {base.get('fallback_rate', 0.0)} -> {cur['fallback_rate']}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200, help="requests per non-AI endpoint")
+    parser.add_argument("--ai-requests", type=int, default=40, help="requests per AI endpoint")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", default="lognormal:0.2:0.3", help="fake Gemini latency distribution")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fake Gemini failure rate (0-1)")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--response-kb", type=float, default=4.0, help="fake Gemini response size")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--only", default="", help="comma separated scenario names")
+    parser.add_argument("--gemini-url", default="", help="use this Gemini endpoint instead of a local fake")
+    parser.add_argument("--baseline", default="", help="compare against this results file")
+    parser.add_argument("--save-baseline", default="", help="write results to this file")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative regression")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0, help="ignore p95 changes smaller than this")
+    parser.add_argument("--fallback-tolerance", type=float, default=0.05,
+                        help="allowed absolute rise in fallback rate")
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args(argv)
+
+    names = [n for n in args.only.split(",") if n] or list(SCENARIOS)
+    unknown = sorted(set(names) - set(SCENARIOS))
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)} (choose from {', '.join(SCENARIOS)})")
+
+    fake = None
+    gemini_url = args.gemini_url
+    if not gemini_url:
+        from backend.benchmarks.fake_gemini import FakeGemini
+
+        fake = FakeGemini(args.latency, args.error_rate, args.error_status, args.response_kb, args.seed)
+        gemini_url = fake.start()
+
+    workdir = tempfile.mkdtemp(prefix="intersync_bench_")
+    os.environ.update(
+        AI_ENABLED="true",
+        GEMINI_API_KEY=os.getenv("GEMINI_API_KEY") if args.gemini_url else "bench",
+        GEMINI_BASE_URL=gemini_url,
+        RESUME_CACHE_ENABLED="false",
+        RESUME_CACHE_PATH=os.path.join(workdir, "resume_cache.sqlite3"),
+        SINGLE_FLIGHT_DIR=os.path.join(workdir, "single_flight"),
+    )
+
+    from backend.app import create_app
+
+    client = create_app().test_client()
+    config = {
+        "latency": args.latency, "error_rate": args.error_rate, "response_kb": args.response_kb,
+        "concurrency": args.concurrency, "gemini_url": args.gemini_url or "fake",
+    }
+    results = {}
+    try:
+        for name in names:
+            requests = args.ai_requests if SCENARIOS[name][3].get("ai") else args.requests
+            results[name] = run_scenario(client, name, requests, args.concurrency)
+    finally:
+        if fake is not None:
+            fake.stop()
+
+    report = {"config": config, "results": results}
+    if fake is not None:
+        report["upstream"] = fake.stats()
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(report, f, indent=2)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("config") != config:
+            print(f"warning: baseline was recorded with {baseline.get('config')}", file=sys.stderr)
+        regressions = compare(results, baseline.get("results", {}), args.tolerance, args.min_delta_ms,
+                              args.concurrency, args.fallback_tolerance)
+        report["regressions"] = regressions
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        columns = ["p50_ms", "p95_ms", "p99_ms", "rps", "error_rate", "fallback_rate", "rss_mb", "rss_delta_mb"]
+        print(f"{'endpoint':<18}" + "".join(f"{c:>14}" for c in columns))
+        for name, r in results.items():
+            print(f"{name:<18}" + "".join(f"{r[c]:>14}" for c in columns))
+        if fake is not None:
+            print(f"fake Gemini: {report['upstream']}")
+        if args.baseline:
+            print("\n".join(["REGRESSIONS:"] + regressions) if regressions else "no regressions vs baseline")
+
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+# backend/data/catalog.py
+"""Project template catalog backends.
+
+Every backend is a read-only ``Mapping`` of template ID -> template dict,
+so code that used to index ``PROJECT_TEMPLATES`` works unchanged, plus:
+
+  version        content hash of the snapshot; derived indexes key on it
+  bullets(id)    precomputed generate_resume_bullets output
+  index_rows()   (id, languages, difficulty) without loading full templates
+  search_rows()  (id, search_text, languages) for the semantic matcher, also
+                 without loading full templates
+
+``memory`` (default) serves the in-module PROJECT_TEMPLATES dict.
+``sqlite`` serves a snapshot file built with
+
+    python -m backend.data.catalog build [--source templates.json] [--out path]
+
+Templates are loaded per ID on demand. Snapshots are written to a temp
+file and renamed into place, and each worker notices the new file (at most
+every CATALOG_RELOAD_SECONDS) and swaps to it without a restart.
+"""
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections.abc import Mapping
+from functools import lru_cache
+
+from backend.utils import env_float, env_int
+
+DEFAULT_SQLITE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "catalog.sqlite3")
+
+
+def search_text(project_id: str, project: dict) -> str:
+    """Text the semantic matcher indexes: key, name, description, skills_gained and tags."""
+    parts = [project_id.replace("_", " "), project.get("name", ""), project.get("description", "")]
+    parts.extend(project.get("skills_gained", []))
+    parts.extend(project.get("tags", []))
+    return " ".join(str(p) for p in parts)
+
+
+def _content_version(templates: dict) -> str:
+    canonical = json.dumps(templates, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+class InMemoryCatalog(Mapping):
+    def __init__(self, templates: dict):
+        self._templates = templates
+        self._version = None
+        self._bullets = {}
+
+    def __getitem__(self, project_id):
+        return self._templates[project_id]
+
+    def __iter__(self):
+        return iter(self._templates)
+
+    def __len__(self):
+        return len(self._templates)
+
+    def __contains__(self, project_id):
+        return project_id in self._templates
+
+    @property
+    def version(self) -> str:
+        if self._version is None:
+            self._version = _content_version(self._templates)
+        return self._version
+
+    def bullets(self, project_id) -> list:
+        if project_id not in self._bullets:
+            from backend.services.resume_utils import generate_resume_bullets
+
+            self._bullets[project_id] = generate_resume_bullets(self._templates[project_id])
+        return self._bullets[project_id]
+
+    def index_rows(self):
+        for pid, project in self._templates.items():
+            yield pid, list(project.get("languages", [])), project.get("difficulty") or ""
+
+    def search_rows(self):
+        for pid, project in self._templates.items():
+            yield pid, search_text(pid, project), list(project.get("languages", []))
+
+
+class SQLiteCatalog(Mapping):
+    """One immutable snapshot file; rows are decoded lazily and LRU-cached."""
+
+    def __init__(self, path: str, cache_size: int = 1024):
+        self.path = path
+        self._local = threading.local()
+
+        conn = self._conn()
+        self.version = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()[0]
+        self._ids = [row[0] for row in conn.execute("SELECT id FROM templates ORDER BY position")]
+        self._id_set = frozenset(self._ids)
+        self._load = lru_cache(maxsize=cache_size)(self._load_row)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _load_row(self, project_id):
+        row = self._conn().execute(
+            "SELECT data, bullets FROM templates WHERE id = ?", (project_id,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(project_id)
+        return json.loads(row[0]), json.loads(row[1])
+
+    def __getitem__(self, project_id):
+        if project_id not in self._id_set:
+            raise KeyError(project_id)
+        return self._load(project_id)[0]
+
+    def __iter__(self):
+        return iter(self._ids)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, project_id):
+        return project_id in self._id_set
+
+    def bullets(self, project_id) -> list:
+        if project_id not in self._id_set:
+            raise KeyError(project_id)
+        return self._load(project_id)[1]
+
+    def index_rows(self):
+        rows = self._conn().execute(
+            "SELECT id, languages, difficulty FROM templates ORDER BY position"
+        )
+        for pid, languages, difficulty in rows:
+            yield pid, json.loads(languages), difficulty
+
+    def search_rows(self):
+        try:
+            rows = self._conn().execute(
+                "SELECT id, search_text, languages FROM templates ORDER BY position"
+            ).fetchall()
+        except sqlite3.OperationalError:
+            # Snapshot built before the search_text column existed
+            rows = [
+                (pid, search_text(pid, json.loads(data)), languages)
+                for pid, data, languages in self._conn().execute(
+                    "SELECT id, data, languages FROM templates ORDER BY position"
+                )
+            ]
+        for pid, text, languages in rows:
+            yield pid, text, json.loads(languages)
+
+
+def build_sqlite_catalog(templates: dict, path: str = DEFAULT_SQLITE_PATH) -> str:
+    """Write a snapshot of `templates` to `path` atomically; returns its version."""
+    from backend.services.resume_utils import generate_resume_bullets
+
+    version = _content_version(templates)
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=".catalog-", suffix=".sqlite3", dir=directory)
+    os.close(fd)
+
+    try:
+        conn = sqlite3.connect(tmp_path)
+        with conn:
+            conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            conn.execute(
+                "CREATE TABLE templates ("
+                " id TEXT PRIMARY KEY,"
+                " position INTEGER NOT NULL,"
+                " data TEXT NOT NULL,"
+                " bullets TEXT NOT NULL,"
+                " languages TEXT NOT NULL,"
+                " difficulty TEXT NOT NULL,"
+                " search_text TEXT NOT NULL)"
+            )
+            conn.executemany(
+                "INSERT INTO templates VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (
+                        pid,
+                        position,
+                        json.dumps(project, ensure_ascii=False),
+                        json.dumps(generate_resume_bullets(project), ensure_ascii=False),
+                        json.dumps(project.get("languages", [])),
+                        project.get("difficulty") or "",
+                        search_text(pid, project),
+                    )
+                    for position, (pid, project) in enumerate(templates.items())
+                ),
+            )
+            conn.execute("INSERT INTO meta VALUES ('version', ?)", (version,))
+            conn.execute("INSERT INTO meta VALUES ('built_at', ?)", (str(time.time()),))
+        conn.close()
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return version
+
+
+class _CatalogHolder:
+    """Current catalog snapshot for this process, hot-swapped on file change."""
+
+    def __init__(self):
+        self._catalog = None
+        self._stamp = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _open(self):
+        backend = os.getenv("CATALOG_BACKEND", "memory").lower()
+        if backend == "sqlite":
+            path = os.getenv("CATALOG_PATH", DEFAULT_SQLITE_PATH)
+            st = os.stat(path)
+            catalog = SQLiteCatalog(path, cache_size=env_int("CATALOG_CACHE_SIZE", 1024))
+            return catalog, (path, st.st_ino, st.st_mtime_ns)
+
+        from backend.data.templates import PROJECT_TEMPLATES
+
+        return InMemoryCatalog(PROJECT_TEMPLATES), None
+
+    def get(self):
+        catalog = self._catalog
+        if catalog is None:
+            with self._lock:
+                if self._catalog is None:
+                    self._catalog, self._stamp = self._open()
+                    self._checked_at = time.monotonic()
+                return self._catalog
+
+        if self._stamp is not None:
+            now = time.monotonic()
+            if now - self._checked_at >= env_float("CATALOG_RELOAD_SECONDS", 5.0):
+                self._maybe_swap(now)
+        return self._catalog
+
+    def _maybe_swap(self, now: float):
+        with self._lock:
+            self._checked_at = now
+            path = self._stamp[0]
+            try:
+                st = os.stat(path)
+            except OSError:
+                return
+            if (path, st.st_ino, st.st_mtime_ns) != self._stamp:
+                self._catalog, self._stamp = self._open()
+
+    def reset(self):
+        with self._lock:
+            self._catalog = None
+            self._stamp = None
+
+
+_holder = _CatalogHolder()
+
+
+def get_catalog():
+    """Current catalog snapshot (loaded on first use)."""
+    return _holder.get()
+
+
+def reload_catalog():
+    """Drop the current snapshot; the next get_catalog() reopens the backend."""
+    _holder.reset()
+
+
+def get_project_templates():
+    """Project template catalog, loaded on first use rather than at app import."""
+    return get_catalog()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build a SQLite catalog snapshot.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build")
+    build.add_argument("--source", help="JSON file of templates (default: backend.data.templates)")
+    build.add_argument("--out", default=os.getenv("CATALOG_PATH", DEFAULT_SQLITE_PATH))
+    args = parser.parse_args(argv)
+
+    if args.source:
+        with open(args.source, encoding="utf-8-sig") as f:
+            templates = json.load(f)
+    else:
+        from backend.data.templates import PROJECT_TEMPLATES as templates
+
+    version = build_sqlite_catalog(templates, args.out)
+    print(f"Wrote {len(templates)} templates to {args.out} (version {version})")
+
+
+if __name__ == "__main__":
+    main()
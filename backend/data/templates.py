@@ -6,6 +6,7 @@ PROJECT_TEMPLATES = {
         'description': 'Interactive visualization of audio data with ML-based genre analysis',
         'languages': ['Python', 'JavaScript'],
         'skills_gained': ['Audio Analysis', 'Data Visualization', 'ML Fundamentals'],
+        'tags': ['guitar', 'piano', 'songs', 'singing', 'band', 'concerts', 'audio', 'spotify', 'playlists', 'music production'],
         'difficulty': 'Intermediate',
         'steps': [
             {
@@ -40,6 +41,7 @@ PROJECT_TEMPLATES = {
         'description': 'Real-time performance analytics dashboard for competitive gaming',
         'languages': ['JavaScript', 'Python'],
         'skills_gained': ['API Integration', 'Real-time Data', 'Dashboard Design'],
+        'tags': ['video games', 'esports', 'streaming', 'twitch', 'league of legends', 'fortnite', 'steam', 'leaderboards', 'game stats'],
         'difficulty': 'Intermediate',
         'steps': [
             {
@@ -74,6 +76,7 @@ PROJECT_TEMPLATES = {
         'description': 'Physics-based robot control and path planning simulator',
         'languages': ['Python', 'C++'],
         'skills_gained': ['Physics Simulation', 'Control Systems', '3D Graphics'],
+        'tags': ['robots', 'drones', 'arduino', 'raspberry pi', 'electronics', 'autonomous vehicles', 'self-driving', 'engineering', 'physics'],
         'difficulty': 'Advanced',
         'steps': [
             {
@@ -108,6 +111,7 @@ PROJECT_TEMPLATES = {
         'description': 'Automatic photo categorization and enhancement using computer vision',
         'languages': ['Python', 'JavaScript'],
         'skills_gained': ['Computer Vision', 'Deep Learning', 'UI Design'],
+        'tags': ['photos', 'cameras', 'images', 'pictures', 'art', 'design', 'instagram', 'editing', 'filmmaking'],
         'difficulty': 'Intermediate',
         'steps': [
             {
@@ -142,6 +146,7 @@ PROJECT_TEMPLATES = {
         'description': 'Budget tracking and investment portfolio analyzer',
         'languages': ['Python', 'JavaScript'],
         'skills_gained': ['Data Analysis', 'API Integration', 'Financial Modeling'],
+        'tags': ['stocks', 'stock trading', 'investing', 'crypto', 'money', 'budgeting', 'banking', 'economics', 'markets'],
         'difficulty': 'Beginner',
         'steps': [
             {
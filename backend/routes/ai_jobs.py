@@ -0,0 +1,83 @@
+# backend/routes/ai_jobs.py
+from flask import Blueprint, jsonify, request, url_for
+
+from backend.routes.ai_resume import rate_limited_response
+from backend.services.job_queue import FINISHED, check_callback_url, resume_jobs
+from backend.services.profile_store import UnknownProfile
+from backend.services.resume_pipeline import MISSING_FIELDS_ERROR, latency_slo, parse_resume_request
+from backend.utils import env_int
+
+ai_jobs_bp = Blueprint("ai_jobs", __name__)
+
+
+@ai_jobs_bp.record
+def _start_workers(state):
+    # Only apps built to serve (START_JOB_WORKERS) run workers, and only
+    # from their first request, so importing the app starts no threads.
+    # Starting with the server rather than the first submission picks up
+    # jobs left by a crashed process; start() is a no-op once running.
+    if state.app.config.get("START_JOB_WORKERS"):
+        state.app.before_request(lambda: resume_jobs.start())
+
+
+@ai_jobs_bp.route("/api/ai/jobs", methods=["POST"])
+def submit_resume_job():
+    """Queue a tailoring request; returns 202 and a job ID to poll.
+
+    Body: the /api/ai/resume body plus optional "priority" (high, normal
+    or low) and "callback_url", which receives the finished job as a
+    JSON POST. Identical pending requests share one job.
+    """
+    limited = rate_limited_response()
+    if limited is not None:
+        return limited
+
+    data = request.json or {}
+    try:
+        inputs = parse_resume_request(data)
+    except UnknownProfile as e:
+        return jsonify({"success": False, "error": str(e)}), 404
+    if inputs is None:
+        return jsonify({"success": False, "error": MISSING_FIELDS_ERROR}), 400
+
+    try:
+        callback_url = check_callback_url(data["callback_url"]) if data.get("callback_url") else None
+        target_role, job_description, candidate = inputs
+        job_id, deduplicated = resume_jobs.submit(
+            {"target_role": target_role, "job_description": job_description,
+             "candidate": candidate, "slo": latency_slo(data)},
+            lane=data.get("priority") or "normal",
+            callback_url=callback_url,
+        )
+    except ValueError as e:  # bad lane or callback URL
+        return jsonify({"success": False, "error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+    resume_jobs.start()
+    poll_url = url_for("ai_jobs.get_resume_job", job_id=job_id)
+    response = jsonify({"success": True, "job_id": job_id, "deduplicated": deduplicated, "poll_url": poll_url})
+    response.status_code = 202
+    response.headers["Location"] = poll_url
+    return response
+
+
+@ai_jobs_bp.route("/api/ai/jobs/<job_id>", methods=["GET"])
+def get_resume_job(job_id):
+    """Job status; `result` holds the /api/ai/resume body fields once done."""
+    try:
+        job = resume_jobs.get(job_id)
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+    if job is None:
+        return jsonify({"success": False, "error": "Unknown job"}), 404
+
+    response = jsonify({"success": True, "job": job})
+    if job["status"] not in FINISHED:
+        response.headers["Retry-After"] = str(env_int("JOB_POLL_INTERVAL_SECONDS", 2))
+    return response
+
+
+@ai_jobs_bp.route("/api/ai/jobs/stats", methods=["GET"])
+def ai_jobs_stats():
+    return jsonify({"success": True, "jobs": resume_jobs.stats()})
@@ -1,157 +1,401 @@
 # backend/routes/ai_resume.py
 
-import os
-from flask import Blueprint, request, jsonify, make_response
+import json
+import math
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from flask import Blueprint, Response, request, jsonify, make_response, stream_with_context
 
-from backend.services.ai_tailor_gemini import tailor_resume_with_gemini
-from backend.services.latex_render import resume_json_to_latex
+from backend.services.admission import ai_admission, ai_rate_limiter, client_key
+from backend.services.ai_tailor_gemini import get_router, stream_resume_with_gemini, structured_output_stats
+from backend.services.latex_render import fragment_cache_stats, render_section, resume_json_to_latex
+from backend.services.metrics import ai_fallbacks
+from backend.services.profile_store import UnknownProfile
+from backend.services.response_cache import canonical_json, resume_cache
+# The payload/demo builders moved to resume_pipeline; they are still importable from here.
+from backend.services.resume_pipeline import (
+    FALLBACK_WARNING,
+    MISSING_FIELDS_ERROR,
+    ai_enabled,
+    build_compact_payload,
+    build_demo_resume,
+    build_gemini_payload,
+    current_fingerprint,
+    fallback_warning,
+    latency_slo,
+    parse_resume_request,
+    resume_etag,
+    run_resume_pipeline,
+)
+from backend.services.single_flight import resume_flights
+from backend.utils import env_int
 
 ai_resume_bp = Blueprint("ai_resume", __name__)
 
 
-def build_gemini_payload(target_role: str, job_description: str, candidate: dict) -> dict:
-    return {
-        "instructions": [
-            "You are an expert resume writer, ATS optimizer, and technical recruiter.",
-            "ONLY use the provided candidate data. DO NOT invent companies, roles, degrees, dates, or technologies.",
-            "Tailor the resume to the target role and the job description.",
-            "Extract the most important keywords/skills/tools from the job description and naturally incorporate them where truthful.",
-            "Reorder skills, projects, and bullets by relevance to the job description.",
-            "Rewrite bullets to be impact-focused and action-oriented. Keep each bullet to 1 line when possible.",
-            "If the candidate data includes numbers/metrics, include them. If not, do NOT fabricate metrics.",
-            "If a job requirement is missing from candidate data, do not add it—list it in ats_keywords_missing instead.",
-            "Return STRICT JSON only that exactly matches output_schema. No markdown, no extra text."
-        ],
-        "target_role": target_role,
-        "job_description": job_description,
-        "candidate": candidate,
-        "output_schema": {
-            "header": {"name": "string", "email": "string", "links": ["string"]},
-            "headline": "string",
-            "summary": ["string"],
-            "skills": {"Section Name": ["string"]},
-            "projects": [{"name": "string", "bullets": ["string"]}],
-            "experience": [{"title": "string", "company": "string", "bullets": ["string"]}],
-            "ats_keywords_matched": ["string"],
-            "ats_keywords_missing": ["string"]
-        }
-    }
+_FORMATS = {"json": "application/json", "tex": "application/x-tex"}
+
+
+def negotiate_format(accept, default: str = "json") -> str:
+    """"json" or "tex" from a werkzeug MIMEAccept (the Accept header)."""
+    best = accept.best_match(
+        [_FORMATS[default]] + [m for f, m in _FORMATS.items() if f != default], default=_FORMATS[default]
+    )
+    return "tex" if best == _FORMATS["tex"] else "json"
 
 
-def build_demo_resume(target_role: str, candidate: dict) -> dict:
-    """Deterministic fallback: always works even without GEMINI_API_KEY."""
-    return {
-        "header": {
-            "name": candidate.get("name", "Candidate Name"),
-            "email": candidate.get("email", ""),
-            "links": candidate.get("links", []) if isinstance(candidate.get("links", []), list) else []
-        },
-        "headline": target_role,
-        "summary": [
-            f"{target_role} candidate with hands-on project experience and strong fundamentals."
-        ],
-        "skills": {
-            "Technical Skills": candidate.get("skills", []) if isinstance(candidate.get("skills", []), list) else []
-        },
-        "projects": candidate.get("projects", []) if isinstance(candidate.get("projects", []), list) else [],
-        "experience": candidate.get("experience", []) if isinstance(candidate.get("experience", []), list) else [],
-        "ats_keywords_matched": [],
-        "ats_keywords_missing": []
+def resume_body(result, latex: str) -> dict:
+    """JSON body for a ResumeResult."""
+    body = {
+        "success": True,
+        "used_ai": result.used_ai,
+        "resume_json": result.resume_json,
+        "latex": latex
     }
+    if result.warning:
+        body["warning"] = result.warning
+        body["error"] = result.error
+    if result.prompt_tokens:
+        body["prompt_tokens"] = result.prompt_tokens
+    return body
+
+
+def resume_headers(result, output_format: str) -> dict:
+    """Caching headers for a ResumeResult, plus the download headers for .tex."""
+    headers = {}
+    if output_format == "tex":
+        headers["Content-Type"] = "application/x-tex; charset=utf-8"
+        headers["Content-Disposition"] = "attachment; filename=resume.tex"
+        headers["X-Used-AI"] = "true" if result.used_ai else "false"
+        if result.prompt_tokens:
+            headers["X-Prompt-Tokens-Saved"] = str(result.prompt_tokens["tokens_saved"])
+        if result.warning:
+            headers["X-Fallback-Warning"] = result.warning
+
+    if result.fingerprint:
+        headers["ETag"] = f'"{resume_etag(result.fingerprint, output_format)}"'
+    else:
+        # Failure fallback: never let a client or CDN keep this one
+        headers["Cache-Control"] = "no-store"
+    return headers
+
+
+def not_modified_etag(if_none_match, inputs, output_format: str):
+    """The current ETag if `if_none_match` (werkzeug ETags) already holds it, else None.
+
+    Only the response cache is consulted: no Gemini call, no LaTeX render.
+    """
+    if not if_none_match:
+        return None
+    fingerprint = current_fingerprint(*inputs)
+    if fingerprint and if_none_match.contains(resume_etag(fingerprint, output_format)):
+        return resume_etag(fingerprint, output_format)
+    return None
+
+
+RATE_LIMIT_ERROR = "Rate limit exceeded"
+
+
+def rate_limit_retry_after(headers, remote_addr: str, cost: int = 1) -> int:
+    """Whole seconds before this client may try again, or 0 to proceed (spends `cost` tokens)."""
+    wait = ai_rate_limiter.take(client_key(headers, remote_addr), cost)
+    return math.ceil(wait) if wait else 0
+
+
+def rate_limited_response(cost: int = 1):
+    """A 429 response if the caller's token bucket is empty, else None."""
+    retry_after = rate_limit_retry_after(request.headers, request.remote_addr, cost)
+    if not retry_after:
+        return None
+    response = jsonify({"success": False, "error": RATE_LIMIT_ERROR, "retry_after": retry_after})
+    response.status_code = 429
+    response.headers["Retry-After"] = str(retry_after)
+    return response
+
+
+def _resume_response(output_format: str = None):
+    """Shared handler: output_format None means negotiate from Accept (JSON by default)."""
+    limited = rate_limited_response()
+    if limited is not None:
+        return limited
+
+    data = request.json or {}
+    try:
+        inputs = parse_resume_request(data)
+    except UnknownProfile as e:
+        return jsonify({"success": False, "error": str(e)}), 404
+    if inputs is None:
+        return jsonify({"success": False, "error": MISSING_FIELDS_ERROR}), 400
+
+    negotiated = output_format is None
+    output_format = output_format or negotiate_format(request.accept_mimetypes)
+
+    etag = not_modified_etag(request.if_none_match, inputs, output_format)
+    if etag:
+        response = make_response("", 304)
+        response.set_etag(etag)
+        if negotiated:
+            response.vary.add("Accept")
+        return response
+
+    try:
+        result = run_resume_pipeline(*inputs, slo=latency_slo(data))
+        latex = resume_json_to_latex(result.resume_json)
+    except Exception as e:
+        return jsonify({"success": False, "used_ai": False, "error": str(e)}), 500
+
+    response = make_response(latex) if output_format == "tex" else jsonify(resume_body(result, latex))
+    response.headers.update(resume_headers(result, output_format))
+    if negotiated:
+        response.vary.add("Accept")
+    return response
 
 
 @ai_resume_bp.route("/api/ai/resume", methods=["POST"])
 def ai_resume():
-    data = request.json or {}
+    """Tailored resume as JSON, or as LaTeX with Accept: application/x-tex.
 
-    target_role = (data.get("target_role") or "").strip()
-    job_description = (data.get("job_description") or "").strip()
-    candidate = data.get("candidate") or {}
+    Responses carry a strong ETag; repeating the request with
+    If-None-Match returns 304 while the result is unchanged.
+    """
+    return _resume_response()
 
-    if not target_role or not job_description or not isinstance(candidate, dict) or not candidate:
-        return jsonify({
-            "success": False,
-            "error": "Missing target_role, job_description, or candidate"
-        }), 400
 
-    # ✅ Demo fallback toggle
-    ai_enabled = os.getenv("AI_ENABLED", "true").lower() == "true"
+@ai_resume_bp.route("/api/ai/resume.tex", methods=["POST"])
+def ai_resume_tex():
+    return _resume_response("tex")
 
-    # If no key, auto-disable AI (so teammates don't crash)
-    if not os.getenv("GEMINI_API_KEY"):
-        ai_enabled = False
 
-    if not ai_enabled:
-        resume_json = build_demo_resume(target_role, candidate)
-        latex = resume_json_to_latex(resume_json)
-        return jsonify({
-            "success": True,
-            "used_ai": False,
-            "resume_json": resume_json,
-            "latex": latex
+@ai_resume_bp.route("/api/ai/resume/render", methods=["POST"])
+def render_resume():
+    """LaTeX for an edited resume, for the editor's live preview.
+
+    Body: {"resume_json": {...}}, in the shape /api/ai/resume returns.
+    Rendered through the fragment cache, so re-rendering after an edit
+    only pays for the sections and entries that changed. Returns JSON
+    ({"latex": ...}), or the .tex file with Accept: application/x-tex.
+    """
+    data = request.get_json(silent=True) or {}
+    resume_json = data.get("resume_json") if isinstance(data, dict) else None
+    if not isinstance(resume_json, dict):
+        return jsonify({"success": False, "error": "resume_json must be an object"}), 400
+    try:
+        latex = resume_json_to_latex(resume_json, cached=True)
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+    if negotiate_format(request.accept_mimetypes) == "tex":
+        response = make_response(latex)
+        response.headers["Content-Type"] = "application/x-tex; charset=utf-8"
+    else:
+        response = jsonify({"success": True, "latex": latex})
+    response.vary.add("Accept")
+    return response
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _section_events(sections):
+    for section, value in sections:
+        yield _sse("section", {
+            "section": section,
+            "data": value,
+            "latex": render_section(section, value)
         })
 
-    # AI path
-    payload = build_gemini_payload(target_role, job_description, candidate)
 
+@ai_resume_bp.route("/api/ai/resume/stream", methods=["POST"])
+def ai_resume_stream():
+    """Server-Sent Events version of /api/ai/resume.
+
+    Emits one `section` event per top-level resume key as soon as Gemini
+    has finished generating it (with its LaTeX fragment), then a `done`
+    event carrying the full resume_json and document. If Gemini fails
+    mid-stream a `fallback` event is sent and the demo resume is streamed
+    instead; clients should discard sections received before it.
+    """
+    limited = rate_limited_response()
+    if limited is not None:
+        return limited
+
+    data = request.json or {}
     try:
-        resume_json = tailor_resume_with_gemini(payload)
-        latex = resume_json_to_latex(resume_json)
-        return jsonify({
-            "success": True,
-            "used_ai": True,
-            "resume_json": resume_json,
-            "latex": latex
-        })
-    except Exception as e:
-        # If AI fails, fallback instead of breaking demo
-        resume_json = build_demo_resume(target_role, candidate)
-        latex = resume_json_to_latex(resume_json)
-        return jsonify({
+        inputs = parse_resume_request(data)
+    except UnknownProfile as e:
+        return jsonify({"success": False, "error": str(e)}), 404
+    if inputs is None:
+        return jsonify({"success": False, "error": MISSING_FIELDS_ERROR}), 400
+    target_role, job_description, candidate = inputs
+    use_ai = ai_enabled()
+
+    def generate():
+        if use_ai:
+            payload, prompt_report = build_compact_payload(target_role, job_description, candidate)
+            resume_json = {}
+            try:
+                for section, value in stream_resume_with_gemini(payload, job_description, candidate, latency_slo(data)):
+                    resume_json[section] = value
+                    yield from _section_events([(section, value)])
+                yield _sse("done", {
+                    "success": True,
+                    "used_ai": True,
+                    "resume_json": resume_json,
+                    "latex": resume_json_to_latex(resume_json, cached=True),
+                    "prompt_tokens": prompt_report
+                })
+                return
+            except Exception as e:
+                ai_fallbacks.inc(reason=type(e).__name__)
+                yield _sse("fallback", {"warning": fallback_warning(e), "error": str(e)})
+
+        resume_json = build_demo_resume(target_role, candidate, job_description)
+        yield from _section_events(resume_json.items())
+        yield _sse("done", {
             "success": True,
             "used_ai": False,
-            "warning": "Gemini failed; fallback used.",
-            "error": str(e),
             "resume_json": resume_json,
-            "latex": latex
+            "latex": resume_json_to_latex(resume_json, cached=True)
         })
 
+    response = Response(stream_with_context(generate()), mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
 
-@ai_resume_bp.route("/api/ai/resume.tex", methods=["POST"])
-def ai_resume_tex():
-    data = request.json or {}
+def _tailor_batch_item(target_role: str, job_description: str, candidate: dict, slo: float = None) -> dict:
+    result = run_resume_pipeline(target_role, job_description, candidate, slo)
+    line = {"status": "fallback" if result.warning else "ok", "used_ai": result.used_ai,
+            "resume_json": result.resume_json, "latex": resume_json_to_latex(result.resume_json)}
+    if result.warning:
+        line["warning"] = result.warning
+        line["error"] = result.error
+    if result.prompt_tokens:
+        line["prompt_tokens"] = result.prompt_tokens
+    return line
 
-    target_role = (data.get("target_role") or "").strip()
-    job_description = (data.get("job_description") or "").strip()
-    candidate = data.get("candidate") or {}
 
-    if not target_role or not job_description or not isinstance(candidate, dict) or not candidate:
-        return jsonify({
-            "success": False,
-            "error": "Missing target_role, job_description, or candidate"
-        }), 400
+@ai_resume_bp.route("/api/ai/resume/batch", methods=["POST"])
+def ai_resume_batch():
+    """Tailor one request per item and stream results back as NDJSON.
 
-    ai_enabled = os.getenv("AI_ENABLED", "true").lower() == "true"
-    if not os.getenv("GEMINI_API_KEY"):
-        ai_enabled = False
+    Body: {"items": [{target_role, job_description, candidate or candidate_ref}, ...],
+           "candidate": {...} (default for items without one),
+           "candidate_ref": "<candidate_id>@<version>" (stored default instead),
+           "concurrency": n,
+           "latency_slo_ms": n (applies to every item)}
+
+    Identical items are generated once. Each line carries the item's
+    index and a status of ok, fallback or error; results arrive in
+    completion order and a final {"done": true, ...} line summarises
+    the batch.
+    """
+    data = request.json or {}
+    items = data.get("items")
+    default_candidate = data.get("candidate") or {}
+
+    max_items = env_int("AI_BATCH_MAX_ITEMS", 200)
+    if not isinstance(items, list) or not items:
+        return jsonify({"success": False, "error": "Missing items"}), 400
+    if len(items) > max_items:
+        return jsonify({"success": False, "error": f"At most {max_items} items per batch"}), 400
+
+    # Each item is a tailoring request (spending is capped at the bucket size)
+    limited = rate_limited_response(len(items))
+    if limited is not None:
+        return limited
 
     try:
-        if ai_enabled:
-            payload = build_gemini_payload(target_role, job_description, candidate)
-            resume_json = tailor_resume_with_gemini(payload)
-        else:
-            resume_json = build_demo_resume(target_role, candidate)
+        concurrency = int(data.get("concurrency") or env_int("AI_BATCH_CONCURRENCY", 4))
+    except (TypeError, ValueError):
+        concurrency = env_int("AI_BATCH_CONCURRENCY", 4)
+    concurrency = max(1, min(concurrency, env_int("AI_BATCH_MAX_CONCURRENCY", 8)))
 
-        latex = resume_json_to_latex(resume_json)
+    slo = latency_slo(data)
 
-        response = make_response(latex)
-        response.headers["Content-Type"] = "application/x-tex; charset=utf-8"
-        response.headers["Content-Disposition"] = "attachment; filename=resume.tex"
-        return response
+    # Validate and dedupe up front: `unique` maps an item fingerprint to its
+    # arguments, `indexes` maps it to every position that asked for it.
+    errors = []
+    unique = {}
+    indexes = {}
+    for i, item in enumerate(items):
+        item = item if isinstance(item, dict) else {}
+        if not item.get("candidate") and not item.get("candidate_ref"):
+            item = {**item, "candidate": default_candidate, "candidate_ref": data.get("candidate_ref")}
+        try:
+            inputs = parse_resume_request(item)
+        except UnknownProfile as e:
+            errors.append({"index": i, "status": "error", "error": str(e)})
+            continue
+        if inputs is None:
+            errors.append({"index": i, "status": "error", "error": MISSING_FIELDS_ERROR})
+            continue
 
-    except Exception as e:
-        return jsonify({
-            "success": False,
-            "used_ai": False,
-            "error": str(e)
-        }), 500
+        key = canonical_json(list(inputs))
+        unique.setdefault(key, inputs)
+        indexes.setdefault(key, []).append(i)
+
+    def generate():
+        counts = {"ok": 0, "fallback": 0, "error": len(errors)}
+        for line in errors:
+            yield json.dumps(line) + "\n"
+
+        executor = ThreadPoolExecutor(max_workers=min(concurrency, len(unique) or 1))
+        try:
+            futures = {
+                executor.submit(_tailor_batch_item, *args, slo): key
+                for key, args in unique.items()
+            }
+            for future in as_completed(futures):
+                key = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = {"status": "error", "error": str(e)}
+
+                positions = indexes[key]
+                for n, i in enumerate(positions):
+                    counts[result["status"]] += 1
+                    line = {"index": i, **result}
+                    if n:
+                        line["duplicate_of"] = positions[0]
+                    yield json.dumps(line) + "\n"
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        yield json.dumps({"done": True, "total": len(items), "unique": len(unique), **counts}) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+@ai_resume_bp.route("/api/ai/cache/stats", methods=["GET"])
+def ai_cache_stats():
+    return jsonify({
+        "success": True,
+        "cache": resume_cache.stats(),
+        "single_flight": resume_flights.stats(),
+        "structured_output": structured_output_stats(),
+        "latex_fragments": fragment_cache_stats()
+    })
+
+
+@ai_resume_bp.route("/api/ai/admission/stats", methods=["GET"])
+def ai_admission_stats():
+    return jsonify({
+        "success": True,
+        "admission": ai_admission.stats(),
+        "rate_limit": ai_rate_limiter.stats()
+    })
+
+
+@ai_resume_bp.route("/api/ai/router/stats", methods=["GET"])
+def ai_router_stats():
+    try:
+        router = get_router()
+    except RuntimeError as e:
+        # No GEMINI_API_KEY: nothing is being routed
+        return jsonify({"success": True, "router": None, "warning": str(e)})
+    return jsonify({
+        "success": True,
+        "router": router.stats(),
+        "client": router.client.stats()
+    })
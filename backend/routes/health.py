@@ -2,8 +2,85 @@
 from flask import Blueprint, jsonify
 from datetime import datetime
 
+from backend.data.catalog import get_catalog
+from backend.services.ai_tailor_gemini import get_router
+from backend.services.response_cache import resume_cache
+from backend.services.resume_pipeline import ai_enabled
+from backend.utils import env_bool
+
 health_bp = Blueprint("health", __name__)
 
 @health_bp.route("/api/health", methods=["GET"])
 def health_check():
     return jsonify({"status": "healthy", "timestamp": datetime.now().isoformat()})
+
+
+@health_bp.route("/api/health/live", methods=["GET"])
+def liveness():
+    """The process is up and serving requests; restart it only if this fails."""
+    return jsonify({"status": "alive", "timestamp": datetime.now().isoformat()})
+
+
+def _catalog_check() -> dict:
+    try:
+        return {"status": "ok", "version": get_catalog().version}
+    except Exception as e:
+        return {"status": "error", "error": str(e)}
+
+
+def _cache_check() -> dict:
+    if not env_bool("RESUME_CACHE_ENABLED", True):
+        return {"status": "disabled"}
+    return {"status": "ok"} if resume_cache.ping() else {"status": "error", "error": "cannot open " + resume_cache.path}
+
+
+def _gemini_check() -> dict:
+    """ok, degraded (some models unavailable) or unavailable (all of them).
+
+    A model is unavailable while its circuit is open, or half open with a
+    probe in flight for longer than a whole call may take: until that
+    probe reports back, every other call to the model is rejected.
+    """
+    if not ai_enabled():
+        return {"status": "disabled"}
+    try:
+        router = get_router()
+    except RuntimeError as e:
+        return {"status": "error", "error": str(e)}
+    circuits, probes, down = {}, {}, 0
+    for model in router.chain:
+        breaker = router.client.breaker_for(model)
+        circuits[model] = state = breaker.state
+        age = breaker.probe_age if state == "half_open" else None
+        if age is not None:
+            probes[model] = round(age, 3)
+        down += state == "open" or (age is not None and age > router.client.timeout)
+    if down == 0:
+        status = "ok"
+    elif down < len(circuits):
+        status = "degraded"
+    else:
+        status = "unavailable"
+    check = {"status": status, "circuits": circuits}
+    if probes:
+        check["probe_age_seconds"] = probes
+    return check
+
+
+@health_bp.route("/api/health/ready", methods=["GET"])
+def readiness():
+    """Whether this instance should receive traffic (503 if not).
+
+    The catalog and response cache are required. Gemini being down is
+    reported but only fails readiness with READINESS_REQUIRES_GEMINI=true:
+    AI requests still get the demo resume, and since every instance shares
+    the same upstream, pulling them all out of rotation would turn a Gemini
+    outage into a full outage.
+    """
+    checks = {"catalog": _catalog_check(), "cache": _cache_check(), "gemini": _gemini_check()}
+    ready = checks["catalog"]["status"] == "ok" and checks["cache"]["status"] != "error"
+    if env_bool("READINESS_REQUIRES_GEMINI", False):
+        ready = ready and checks["gemini"]["status"] in ("ok", "degraded", "disabled")
+
+    body = {"status": "ready" if ready else "not_ready", "checks": checks, "timestamp": datetime.now().isoformat()}
+    return jsonify(body), 200 if ready else 503
@@ -0,0 +1,124 @@
+# backend/routes/metrics.py
+import time
+
+from flask import Blueprint, Response, g, request
+
+from backend.services.admission import ai_admission, ai_rate_limiter
+from backend.services.ai_tailor_gemini import get_router, structured_output_stats
+from backend.services.job_queue import resume_jobs
+from backend.services.metrics import http_request_seconds, registry
+from backend.services.response_cache import resume_cache
+from backend.services.single_flight import resume_flights
+
+metrics_bp = Blueprint("metrics", __name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@metrics_bp.route("/api/metrics", methods=["GET"])
+def prometheus_metrics():
+    return Response(registry.render(), content_type=CONTENT_TYPE)
+
+
+def init_request_metrics(app):
+    """Observe every request in intersync_http_request_duration_seconds."""
+
+    @app.before_request
+    def _start_timer():
+        g.metrics_started = time.perf_counter()
+
+    @app.after_request
+    def _observe(response):
+        started = g.pop("metrics_started", None)
+        if started is not None:
+            # The route pattern, not the path, keeps label cardinality bounded
+            endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+            http_request_seconds.observe(
+                time.perf_counter() - started,
+                endpoint=endpoint, method=request.method, status=response.status_code,
+            )
+        return response
+
+
+def _events(stats: dict, names) -> list:
+    return [({"event": name}, stats.get(name, 0)) for name in names]
+
+
+@registry.collector
+def _cache_metrics():
+    stats = resume_cache.stats()
+    return [
+        ("intersync_resume_cache_events_total", "counter", "Response cache events in this process.",
+         _events(stats["process"], ("memory_hits", "disk_hits", "misses", "sets", "evictions"))),
+        ("intersync_resume_cache_entries", "gauge", "Entries in the shared response cache.",
+         [({"tier": "memory"}, stats["memory_entries"]), ({"tier": "disk"}, stats["disk_entries"])]),
+    ]
+
+
+@registry.collector
+def _admission_metrics():
+    stats = ai_admission.stats()
+    return [
+        ("intersync_ai_admission_events_total", "counter", "Admission decisions for upstream AI calls.",
+         _events(stats, ("admitted", "queued", "shed_queue_full", "shed_deadline", "shed_timeout"))),
+        ("intersync_ai_admission_in_flight", "gauge", "Admitted AI calls running now.", [({}, stats["in_flight"])]),
+        ("intersync_ai_admission_queue_depth", "gauge", "AI calls waiting for a slot.", [({}, stats["queue_depth"])]),
+        ("intersync_ai_admission_limit", "gauge", "Admission limits.",
+         [({"limit": "concurrent"}, stats["max_concurrent"]), ({"limit": "queue"}, stats["max_queue"])]),
+        ("intersync_ai_rate_limited_total", "counter", "Requests rejected with 429 by the per-client rate limit.",
+         [({}, ai_rate_limiter.stats()["rate_limited"])]),
+    ]
+
+
+@registry.collector
+def _job_metrics():
+    stats = resume_jobs.stats()
+    return [
+        ("intersync_ai_job_queue_depth", "gauge", "Background resume jobs by lane and status.",
+         [({"lane": lane, "status": status}, n) for lane, counts in stats["lanes"].items()
+          for status, n in counts.items() if status in ("queued", "running")]),
+        ("intersync_ai_job_oldest_queued_seconds", "gauge", "Age of the oldest queued job per lane.",
+         [({"lane": lane}, age) for lane, age in stats["oldest_queued_seconds"].items()]),
+        ("intersync_ai_job_workers", "gauge", "Job worker threads alive in this process.", [({}, stats["workers"])]),
+    ]
+
+
+@registry.collector
+def _single_flight_metrics():
+    stats = resume_flights.stats()
+    return [
+        ("intersync_single_flight_events_total", "counter", "Coalescing of identical in-flight requests.",
+         _events(stats, ("calls", "leaders", "coalesced_threads", "coalesced_processes",
+                         "shared_errors", "wait_timeouts"))),
+        ("intersync_single_flight_in_flight", "gauge", "Distinct keys currently being generated.",
+         [({}, stats["in_flight"])]),
+    ]
+
+
+@registry.collector
+def _structured_output_metrics():
+    stats = structured_output_stats()
+    return [
+        ("intersync_ai_structured_output_total", "counter", "Validation and repair of Gemini output.",
+         _events(stats, list(stats))),
+    ]
+
+
+@registry.collector
+def _gemini_metrics():
+    try:
+        router = get_router()
+    except RuntimeError:
+        return []  # no GEMINI_API_KEY
+    client = router.client.stats()
+    states = []
+    for model in router.chain:
+        state = router.client.breaker_for(model).state
+        states.extend(({"model": model, "state": s}, int(s == state)) for s in ("closed", "open", "half_open"))
+    return [
+        ("intersync_gemini_circuit_state", "gauge", "Circuit breaker state per model (1 = current).", states),
+        ("intersync_gemini_in_flight", "gauge", "Gemini calls in flight in this process.",
+         [({}, client["in_flight"])]),
+        ("intersync_gemini_router_events_total", "counter", "Model fallbacks and hedged requests.",
+         _events(router.stats(), ("fallbacks", "hedges_sent", "hedges_won"))),
+    ]
@@ -0,0 +1,115 @@
+# backend/routes/profiles.py
+from flask import Blueprint, jsonify, make_response, request, url_for
+
+from backend.services.profile_store import UnknownProfile, VersionConflict, profile_store
+
+profiles_bp = Blueprint("profiles", __name__)
+
+
+def _expected_hash():
+    """The hash an If-Match header pins the update to, or None for an unconditional write."""
+    if not request.if_match or request.if_match.star_tag:
+        return None
+    return next(iter(request.if_match.as_set()), None)
+
+
+def _saved(record: dict, created: bool, status: int = 200):
+    response = jsonify({"success": True, "created": created, **record})
+    response.status_code = status
+    response.set_etag(record["hash"])
+    response.headers["Location"] = url_for("profiles.get_profile", ref=record["ref"])
+    return response
+
+
+def _write(fn):
+    try:
+        record, created = fn()
+    except UnknownProfile as e:
+        return jsonify({"success": False, "error": f"unknown candidate {e}"}), 404
+    except VersionConflict as e:
+        response = jsonify({"success": False, "error": str(e), "latest": e.latest})
+        response.status_code = 412
+        return response
+    except ValueError as e:  # invalid profile, failed patch operation (InvalidPatch), too large
+        return jsonify({"success": False, "error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+    return _saved(record, created)
+
+
+@profiles_bp.route("/api/profiles", methods=["POST"])
+def create_profile():
+    """Store a candidate profile; returns its candidate_id and ref ("<id>@1").
+
+    Body: {"candidate": {...}}, the same object /api/ai/resume takes.
+    """
+    data = request.json or {}
+    try:
+        record = profile_store.create(data.get("candidate"))
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+    return _saved(record, True, 201)
+
+
+@profiles_bp.route("/api/profiles/<ref>", methods=["GET"])
+def get_profile(ref):
+    """A stored profile: "<id>" for the latest version, "<id>@<version>" for one version."""
+    try:
+        record = profile_store.get(ref)
+    except UnknownProfile as e:
+        return jsonify({"success": False, "error": str(e)}), 404
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+    if record is None:
+        return jsonify({"success": False, "error": "Unknown profile"}), 404
+
+    if request.if_none_match.contains(record["hash"]):
+        response = make_response("", 304)
+    else:
+        response = jsonify({"success": True, **record})
+    response.set_etag(record["hash"])
+    return response
+
+
+@profiles_bp.route("/api/profiles/<candidate_id>", methods=["PUT"])
+def replace_profile(candidate_id):
+    """Replace the whole profile. Body: {"candidate": {...}}.
+
+    A new version is created only if the normalized profile changed. With
+    If-Match: "<hash>" the write fails with 412 unless that hash is still
+    the latest version's.
+    """
+    data = request.json or {}
+    return _write(lambda: profile_store.replace(candidate_id, data.get("candidate"), _expected_hash()))
+
+
+@profiles_bp.route("/api/profiles/<candidate_id>", methods=["PATCH"])
+def patch_profile(candidate_id):
+    """Apply a JSON Patch (RFC 6902) to the latest version.
+
+    Body: [{"op": "add", "path": "/skills/-", "value": "Go"}, ...], sent
+    as application/json-patch+json or application/json. Same If-Match
+    rule as PUT.
+    """
+    operations = request.get_json(force=True, silent=True)
+    if not isinstance(operations, list):
+        return jsonify({"success": False, "error": "Body must be a JSON Patch (a list of operations)"}), 400
+    return _write(lambda: profile_store.patch(candidate_id, operations, _expected_hash()))
+
+
+@profiles_bp.route("/api/profiles/<candidate_id>/versions", methods=["GET"])
+def profile_versions(candidate_id):
+    try:
+        versions = profile_store.versions(candidate_id)
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+    if not versions:
+        return jsonify({"success": False, "error": "Unknown profile"}), 404
+    return jsonify({"success": True, "candidate_id": candidate_id, "versions": versions})
+
+
+@profiles_bp.route("/api/profiles/stats", methods=["GET"])
+def profile_stats():
+    return jsonify({"success": True, "profiles": profile_store.stats()})
@@ -1,24 +1,98 @@
 # backend/routes/projects.py
 from flask import Blueprint, request, jsonify
-from backend.data.templates import PROJECT_TEMPLATES
-from backend.services.resume_utils import calculate_project_relevance
+from backend.services.project_index import get_project_index
+from backend.services.semantic_match import score_users
+from backend.utils import env_int
 
 projects_bp = Blueprint("projects", __name__)
 
+MAX_PAGE_SIZE = 50
+MAX_BULK_USERS = env_int("PROJECT_MATCH_MAX_USERS", 10000)
+
 @projects_bp.route("/api/projects/generate", methods=["POST"])
 def generate_projects():
     try:
         user_data = request.json
 
-        scored_projects = []
-        for key, project in PROJECT_TEMPLATES.items():
-            relevance = calculate_project_relevance(user_data, key, project)
-            scored_projects.append({**project, "id": key, "relevance": relevance})
+        try:
+            page = max(1, int(user_data.get("page", 1)))
+            page_size = max(1, min(int(user_data.get("page_size", 3)), MAX_PAGE_SIZE))
+        except (TypeError, ValueError):
+            return jsonify({"success": False, "error": "page and page_size must be integers"}), 400
+
+        index = get_project_index()
+        ranked, total = index.search(
+            user_data.get("interests", []),
+            user_data.get("skills", []),
+            difficulty=user_data.get("difficulty"),
+            language=user_data.get("language"),
+            limit=page_size,
+            offset=(page - 1) * page_size,
+        )
+        top_projects = [
+            {**index.templates[key], "id": key, "relevance": relevance}
+            for key, relevance in ranked
+        ]
+
+        return jsonify({
+            "success": True,
+            "projects": top_projects,
+            "total": total,
+            "page": page,
+            "page_size": page_size
+        })
+
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
 
-        scored_projects.sort(key=lambda x: x["relevance"], reverse=True)
-        top_projects = scored_projects[:3]
 
-        return jsonify({"success": True, "projects": top_projects})
+def _invalid_user(users: list):
+    """Error message for the first malformed entry of `users`, or None."""
+    for i, user in enumerate(users):
+        if not isinstance(user, dict):
+            return f"users[{i}] must be an object"
+        for field in ("interests", "skills"):
+            if user.get(field) is not None and not isinstance(user[field], list):
+                return f"users[{i}].{field} must be a list"
+    return None
+
+
+@projects_bp.route("/api/projects/match/bulk", methods=["POST"])
+def match_projects_bulk():
+    """Top-k templates for many users in one call (nightly recommendation jobs).
+
+    Body: {"users": [{"id": ..., "interests": [...], "skills": [...]}, ...], "k": 3}
+    """
+    try:
+        data = request.json or {}
+        users = data.get("users") or []
+        if not isinstance(users, list):
+            return jsonify({"success": False, "error": "users must be a list"}), 400
+        if len(users) > MAX_BULK_USERS:
+            return jsonify({"success": False, "error": f"at most {MAX_BULK_USERS} users per request"}), 400
+        error = _invalid_user(users)
+        if error:
+            return jsonify({"success": False, "error": error}), 400
+        try:
+            k = max(1, min(int(data.get("k", 3)), MAX_PAGE_SIZE))
+        except (TypeError, ValueError):
+            return jsonify({"success": False, "error": "k must be an integer"}), 400
+
+        results = score_users(users, k)
+        return jsonify({
+            "success": True,
+            "k": k,
+            "results": [
+                {
+                    "id": user.get("id", i),
+                    "projects": [
+                        {"id": pid, "relevance": relevance, "similarity": similarity}
+                        for pid, relevance, similarity in matches
+                    ],
+                }
+                for i, (user, matches) in enumerate(zip(users, results))
+            ],
+        })
 
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
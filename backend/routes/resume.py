@@ -1,7 +1,9 @@
 # backend/routes/resume.py
-from flask import Blueprint, request, jsonify
-from backend.data.templates import PROJECT_TEMPLATES
-from backend.services.resume_utils import generate_resume_bullets, generate_latex_resume
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from backend.data.catalog import get_project_templates
+from backend.services.resume_export import stream_resume_archive
+from backend.services.resume_utils import generate_latex_resume
+from backend.utils import env_int
 
 resume_bp = Blueprint("resume", __name__)
 
@@ -10,12 +12,12 @@ def generate_resume():
     try:
         data = request.json
         project_id = data.get("project_id")
+        templates = get_project_templates()
 
-        if project_id not in PROJECT_TEMPLATES:
+        if project_id not in templates:
             return jsonify({"success": False, "error": "Project not found"}), 404
 
-        project = PROJECT_TEMPLATES[project_id]
-        bullets = generate_resume_bullets(project)
+        bullets = templates.bullets(project_id)
 
         return jsonify({"success": True, "bullets": bullets})
 
@@ -30,11 +32,42 @@ def export_latex():
         user_data = data.get("user_data", {})
         project_ids = data.get("project_ids", [])
 
-        projects = [PROJECT_TEMPLATES[pid] for pid in project_ids if pid in PROJECT_TEMPLATES]
-        latex_code = generate_latex_resume(user_data, projects)
+        templates = get_project_templates()
+        found = [pid for pid in project_ids if pid in templates]
+        latex_code = generate_latex_resume(
+            user_data, [templates[pid] for pid in found], [templates.bullets(pid) for pid in found]
+        )
 
         return jsonify({"success": True, "latex": latex_code})
 
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
+
+@resume_bp.route("/api/resume/export-latex/bulk", methods=["POST"])
+def export_latex_bulk():
+    """Many /export-latex requests at once, streamed back as a zip of .tex files.
+
+    Body: {"entries": [{"user_data": {...}, "project_ids": [...], "filename": optional}, ...]}
+    The archive ends with manifest.json, one record per entry (file,
+    size, sha256, unknown project IDs, or the error for a bad entry).
+    """
+    data = request.json or {}
+    entries = data.get("entries")
+    max_entries = env_int("RESUME_EXPORT_MAX_ENTRIES", 2000)
+    if not isinstance(entries, list) or not entries:
+        return jsonify({"success": False, "error": "Missing entries"}), 400
+    if len(entries) > max_entries:
+        return jsonify({"success": False, "error": f"At most {max_entries} entries per export"}), 400
+
+    try:
+        # One catalog snapshot for the whole archive
+        templates = get_project_templates()
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+    archive = stream_resume_archive(entries, templates, env_int("RESUME_EXPORT_COMPRESSION_LEVEL", 6))
+    response = Response(stream_with_context(archive), mimetype="application/zip")
+    response.headers["Content-Disposition"] = "attachment; filename=resumes.zip"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
@@ -1,44 +1,34 @@
 # backend/routes/skills.py
 from flask import Blueprint, request, jsonify
-from backend.data.templates import PROJECT_TEMPLATES
+from backend.services.skill_graph import get_skill_graph_index
 
 skills_bp = Blueprint("skills", __name__)
 
+MAX_PATHWAY_PROJECTS = 5
+
 @skills_bp.route("/api/skills/graph", methods=["POST"])
 def generate_skill_graph():
     try:
         user_data = request.json
         current_skills = user_data.get("skills", [])
 
-        nodes = []
-        for i, skill in enumerate(current_skills):
-            nodes.append({
-                "id": skill,
-                "label": skill,
-                "level": 70 + (i * 5),
-                "type": "current"
-            })
-
-        edges = []
-        for key, project in PROJECT_TEMPLATES.items():
-            for new_skill in project["skills_gained"]:
-                if new_skill not in current_skills:
-                    nodes.append({
-                        "id": new_skill,
-                        "label": new_skill,
-                        "level": 30,
-                        "type": "potential"
-                    })
-
-                    for lang in project["languages"]:
-                        if lang in current_skills:
-                            edges.append({
-                                "from": lang,
-                                "to": new_skill,
-                                "project": project["name"]
-                            })
-
-        return jsonify({"success": True, "nodes": nodes[:10], "edges": edges[:15]})
+        index = get_skill_graph_index()
+        result = {"success": True, **index.graph(current_skills)}
+
+        # Optional pathway queries
+        target = user_data.get("target_skill")
+        if target:
+            result["pathway"] = index.shortest_path(current_skills, target)
+
+        max_projects = user_data.get("max_projects")
+        if max_projects is not None:
+            try:
+                max_projects = max(1, min(int(max_projects), MAX_PATHWAY_PROJECTS))
+            except (TypeError, ValueError):
+                return jsonify({"success": False, "error": "max_projects must be an integer"}), 400
+            result["reachable"] = index.reachable(current_skills, max_projects)
+
+        return jsonify(result)
 
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
@@ -0,0 +1,294 @@
+# backend/services/admission.py
+"""Admission control for Gemini-backed requests.
+
+Two independent gates:
+
+RateLimiter      per-client token buckets, checked by the routes before
+                 any work; an empty bucket is a 429 with Retry-After.
+AdmissionControl a process-wide cap on concurrent upstream generations
+                 with a bounded FIFO wait queue. A request that would
+                 wait longer than the queue deadline is rejected at once
+                 (AdmissionRejected) and the pipeline answers it with the
+                 demo resume instead of letting it pile up behind Gemini.
+
+Only calls that really go upstream take a slot: cache hits and requests
+coalesced into another one never queue.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager
+
+from backend.utils import env_float, env_int
+
+
+class AdmissionRejected(RuntimeError):
+    """Shed before calling Gemini: queue full, or the wait would exceed the deadline."""
+
+    def __init__(self, reason: str):
+        super().__init__(f"AI capacity exceeded ({reason})")
+        self.reason = reason
+
+
+class RateLimiter:
+    """Token bucket per client key; least recently seen clients are forgotten past max_clients.
+
+    A request costing more than the burst (a large batch) is let through
+    on a full bucket and charged in full: the bucket goes negative and
+    the client waits until the debt is paid off at the normal rate.
+    """
+
+    def __init__(self, rate_per_second: float, burst: int, max_clients: int = 10000):
+        self.rate = rate_per_second
+        self.burst = max(1, burst)
+        self.max_clients = max_clients
+        self._buckets = OrderedDict()  # client -> (tokens, updated_at)
+        self._lock = threading.Lock()
+        self.limited = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def take(self, client: str, cost: int = 1) -> float:
+        """Spend `cost` tokens; 0.0 if allowed, else seconds until it would be."""
+        if not self.enabled:
+            return 0.0
+        needed = min(cost, self.burst)
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(client, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            if tokens >= needed:
+                tokens -= cost
+                wait = 0.0
+            else:
+                wait = (needed - tokens) / self.rate
+                self.limited += 1
+            self._buckets[client] = (tokens, now)
+            while len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        return wait
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "rate_per_second": self.rate,
+                "burst": self.burst,
+                "clients": len(self._buckets),
+                "rate_limited": self.limited,
+            }
+
+
+class _Waiter:
+    __slots__ = ("granted", "event", "future", "loop")
+
+    def __init__(self):
+        self.granted = False
+        self.event = None
+        self.future = None
+        self.loop = None
+
+
+class AdmissionControl:
+    """At most `max_concurrent` admitted calls; up to `max_queue` wait in FIFO order.
+
+    The expected wait of a new arrival is its queue position times the
+    average service time over the concurrency (an EWMA of recent calls).
+    If that already exceeds `queue_timeout`, or the queue is full, the
+    call is shed immediately; a queued call still waiting when the
+    deadline passes is shed then. Threads and coroutines share one queue.
+    """
+
+    def __init__(self, max_concurrent: int = 8, max_queue: int = 32, queue_timeout: float = 2.0):
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = queue_timeout
+        self._active = 0
+        self._queue = deque()
+        self._service_seconds = None
+        self._lock = threading.Lock()
+        self._counters = {
+            "admitted": 0,
+            "queued": 0,
+            "shed_queue_full": 0,
+            "shed_deadline": 0,
+            "shed_timeout": 0,
+        }
+
+    def resize(self, max_concurrent: int):
+        """Change the concurrency cap (backend.asgi raises it for async views)."""
+        with self._lock:
+            self.max_concurrent = max(1, max_concurrent)
+            granted = self._grant_locked()
+        self._notify(granted)
+
+    def _expected_wait(self, position: int) -> float:
+        if self._service_seconds is None:
+            return 0.0
+        return position * self._service_seconds / self.max_concurrent
+
+    def _enter(self):
+        """None if admitted now, else a queued _Waiter; raises AdmissionRejected to shed."""
+        with self._lock:
+            if self._active < self.max_concurrent and not self._queue:
+                self._active += 1
+                self._counters["admitted"] += 1
+                return None
+            if len(self._queue) >= self.max_queue:
+                self._counters["shed_queue_full"] += 1
+                raise AdmissionRejected("queue_full")
+            if self._expected_wait(len(self._queue) + 1) > self.queue_timeout:
+                self._counters["shed_deadline"] += 1
+                raise AdmissionRejected("deadline")
+            waiter = _Waiter()
+            self._queue.append(waiter)
+            self._counters["queued"] += 1
+            return waiter
+
+    def _abandon(self, waiter: _Waiter) -> bool:
+        """Leave the queue after a timeout or cancel; True if the slot was granted meanwhile."""
+        with self._lock:
+            if waiter.granted:
+                return True
+            self._queue.remove(waiter)
+            return False
+
+    def acquire(self):
+        """Block until admitted; raises AdmissionRejected when shed."""
+        waiter = self._enter()
+        if waiter is None:
+            return
+        with self._lock:
+            if waiter.granted:  # granted before we could start waiting
+                return
+            waiter.event = threading.Event()
+        if waiter.event.wait(self.queue_timeout) or self._abandon(waiter):
+            return
+        self._count("shed_timeout")
+        raise AdmissionRejected("timeout")
+
+    async def aacquire(self):
+        """asyncio counterpart of acquire(); waiting holds no thread."""
+        import asyncio
+
+        waiter = self._enter()
+        if waiter is None:
+            return
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if waiter.granted:
+                return
+            waiter.loop, waiter.future = loop, loop.create_future()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), self.queue_timeout)
+            return
+        except asyncio.TimeoutError:
+            if self._abandon(waiter):
+                return
+        except asyncio.CancelledError:
+            if self._abandon(waiter):
+                self.release()
+            raise
+        self._count("shed_timeout")
+        raise AdmissionRejected("timeout")
+
+    @contextmanager
+    def slot(self):
+        """acquire() ... release(); only successful calls feed the service-time average."""
+        self.acquire()
+        started, ok = time.monotonic(), False
+        try:
+            yield
+            ok = True
+        finally:
+            self.release(time.monotonic() - started if ok else None)
+
+    @asynccontextmanager
+    async def aslot(self):
+        await self.aacquire()
+        started, ok = time.monotonic(), False
+        try:
+            yield
+            ok = True
+        finally:
+            self.release(time.monotonic() - started if ok else None)
+
+    def release(self, seconds: float = None):
+        """Free a slot, handing it straight to the longest waiter if any."""
+        with self._lock:
+            if seconds is not None:
+                previous = self._service_seconds
+                self._service_seconds = seconds if previous is None else 0.8 * previous + 0.2 * seconds
+            self._active -= 1
+            granted = self._grant_locked()
+        self._notify(granted)
+
+    def _grant_locked(self) -> list:
+        granted = []
+        while self._queue and self._active < self.max_concurrent:
+            waiter = self._queue.popleft()
+            waiter.granted = True
+            self._active += 1
+            self._counters["admitted"] += 1
+            granted.append(waiter)
+        return granted
+
+    def _notify(self, waiters):
+        for waiter in waiters:
+            if waiter.event is not None:
+                waiter.event.set()
+            elif waiter.future is not None:
+                try:
+                    waiter.loop.call_soon_threadsafe(_resolve, waiter.future)
+                except RuntimeError:  # loop closed; the waiter is gone
+                    self.release()
+
+    def _count(self, name: str):
+        with self._lock:
+            self._counters[name] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            service = self._service_seconds
+            return {
+                **self._counters,
+                "in_flight": self._active,
+                "queue_depth": len(self._queue),
+                "max_concurrent": self.max_concurrent,
+                "max_queue": self.max_queue,
+                "queue_timeout_seconds": self.queue_timeout,
+                "avg_service_seconds": round(service, 3) if service is not None else None,
+            }
+
+
+def _resolve(future):
+    if not future.done():
+        future.set_result(None)
+
+
+def client_key(headers, remote_addr: str) -> str:
+    """Rate-limit identity: AI_CLIENT_ID_HEADER (first value) if set and present, else the peer address."""
+    header = os.getenv("AI_CLIENT_ID_HEADER")
+    if header:
+        value = headers.get(header)
+        if value:
+            return value.split(",")[0].strip()
+    return remote_addr or "unknown"
+
+
+ai_rate_limiter = RateLimiter(
+    # Off by default: behind a proxy every client shares the proxy's address
+    # until AI_CLIENT_ID_HEADER is set
+    rate_per_second=env_float("AI_RATE_LIMIT_PER_MINUTE", 0) / 60,
+    burst=env_int("AI_RATE_LIMIT_BURST", 10),
+    max_clients=env_int("AI_RATE_LIMIT_MAX_CLIENTS", 10000),
+)
+
+ai_admission = AdmissionControl(
+    max_concurrent=env_int("AI_MAX_CONCURRENT", env_int("GEMINI_MAX_IN_FLIGHT", 8)),
+    max_queue=env_int("AI_MAX_QUEUE", 32),
+    queue_timeout=env_int("AI_QUEUE_TIMEOUT_MS", 2000) / 1000,
+)
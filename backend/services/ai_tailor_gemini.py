@@ -1,17 +1,73 @@
 import os
 import json
-from dotenv import load_dotenv
-from google import genai
+import threading
+import time
+from contextlib import nullcontext
 
-load_dotenv()
+from backend.services.admission import ai_admission
+from backend.services.ats_keywords import apply_ats_keywords
+from backend.services.gemini_client import GeminiUnavailableError, client_from_env
+from backend.services.metrics import ai_cache_lookups, stage
+from backend.services.json_stream import iter_sections, salvage_sections
+from backend.services.model_router import model_chain, router_from_env
+from backend.services.prompt_compaction import compact_json, estimate_tokens
+from backend.services.response_cache import payload_fingerprint, resume_cache
+from backend.services.resume_schema import resume_schema
+from backend.services.single_flight import resume_flights
+from backend.utils import env_bool
 
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-GEMINI_MODEL = os.getenv("GEMINI_MODEL", "models/gemini-2.5-flash")
+DEFAULT_GEMINI_MODEL = "models/gemini-2.5-flash"
 
-if not GEMINI_API_KEY:
-    raise RuntimeError("Missing GEMINI_API_KEY. Put it in backend/.env")
+_gemini = None
+_router = None
+_gemini_lock = threading.Lock()
 
-client = genai.Client(api_key=GEMINI_API_KEY)
+_structured_stats = {
+    "responses": 0,
+    "invalid_responses": 0,
+    "repair_calls": 0,
+    "sections_repaired": 0,
+    "sections_from_demo": 0,
+}
+_stats_lock = threading.Lock()
+
+
+def gemini_model() -> str:
+    return os.getenv("GEMINI_MODEL", DEFAULT_GEMINI_MODEL)
+
+
+def primary_model() -> str:
+    """First model of the router chain. Response cache keys name it, and
+    only resumes it answered alone are cached under them."""
+    return model_chain(gemini_model())[0]
+
+
+def get_gemini():
+    """Build the shared GeminiClient on first use.
+
+    Nothing here runs at import time, so a pod without GEMINI_API_KEY still
+    starts and serves the demo fallback instead of crashing.
+    """
+    global _gemini
+    if _gemini is None:
+        with _gemini_lock:
+            if _gemini is None:
+                api_key = os.getenv("GEMINI_API_KEY")
+                if not api_key:
+                    raise RuntimeError("Missing GEMINI_API_KEY. Put it in backend/.env")
+                _gemini = client_from_env(api_key, gemini_model())
+    return _gemini
+
+
+def get_router():
+    """Model router over the shared client (GEMINI_MODEL_CHAIN fallbacks)."""
+    global _router
+    if _router is None:
+        client = get_gemini()
+        with _gemini_lock:
+            if _router is None:
+                _router = router_from_env(client)
+    return _router
 
 def _strip_code_fences(text: str) -> str:
     t = (text or "").strip()
@@ -23,10 +79,309 @@ def _strip_code_fences(text: str) -> str:
                 t = t[4:].strip()
     return t
 
-def tailor_resume_with_gemini(payload: dict) -> dict:
-    resp = client.models.generate_content(
-        model=GEMINI_MODEL,
-        contents=json.dumps(payload)
-    )
-    text = _strip_code_fences(resp.text)
-    return json.loads(text)
+def finish_resume(resume_json: dict, job_description: str, candidate: dict) -> dict:
+    """Copy of a model resume with the ATS keyword lists filled in.
+
+    The keywords come from the local matcher, not from model output, and
+    from the request's original job description and candidate: the
+    payload Gemini saw may have been compacted. Applied after the
+    response cache, since inputs that compact to the same payload share
+    one cache entry.
+    """
+    return apply_ats_keywords(dict(resume_json), job_description, candidate)
+
+def _count(name: str, amount: int = 1):
+    with _stats_lock:
+        _structured_stats[name] += amount
+
+def structured_output_stats() -> dict:
+    with _stats_lock:
+        return dict(_structured_stats)
+
+def structured_config(json_schema: dict):
+    """Native JSON output constrained to `json_schema` (GEMINI_STRUCTURED_OUTPUT)."""
+    if not env_bool("GEMINI_STRUCTURED_OUTPUT", True):
+        return None
+    from google.genai import types
+
+    return types.GenerateContentConfig(response_mime_type="application/json", response_json_schema=json_schema)
+
+def _schema(payload: dict):
+    output_schema = payload.get("output_schema")
+    return resume_schema(output_schema) if isinstance(output_schema, dict) and output_schema else None
+
+def parse_resume_text(text: str) -> dict:
+    """Decode a model response; a malformed or truncated object keeps its complete sections."""
+    text = _strip_code_fences(text)
+    try:
+        value = json.loads(text)
+    except ValueError:
+        return salvage_sections(text)
+    return value if isinstance(value, dict) else {}
+
+def _repair_request(payload: dict, resume: dict, invalid: dict) -> dict:
+    return {
+        "instructions": list(payload.get("instructions", [])) + [
+            "Some sections of your previous answer were invalid or missing.",
+            "Regenerate ONLY the sections in output_schema; `errors` says what was wrong with each.",
+        ],
+        "target_role": payload.get("target_role", ""),
+        "job_description": payload.get("job_description", ""),
+        "candidate": payload.get("candidate", {}),
+        "previous_sections": {section: resume.get(section) for section in invalid},
+        "errors": invalid,
+        "output_schema": {section: payload["output_schema"][section] for section in invalid},
+    }
+
+def _merge_repair(valid: dict, invalid: dict, text: str, schema):
+    fixed = parse_resume_text(text)
+    for section in list(invalid):
+        if section in fixed and not schema.validate_section(section, fixed[section]):
+            valid[section] = fixed[section]
+            del invalid[section]
+            _count("sections_repaired")
+
+def _complete(valid: dict, invalid: dict, payload: dict, schema) -> dict:
+    """Sections that survived no repair come from the demo resume; schema order is restored."""
+    if invalid:
+        from backend.services.resume_pipeline import build_demo_resume
+
+        demo = build_demo_resume(payload.get("target_role", ""), payload.get("candidate") or {})
+        for section in invalid:
+            valid[section] = demo.get(section)
+            _count("sections_from_demo")
+    return {section: valid[section] for section in schema.sections if section in valid}
+
+def _check(resume: dict, schema):
+    """Split a response into valid and invalid sections, counting the outcome."""
+    valid, invalid = schema.split(resume)
+    _count("responses")
+    if invalid:
+        if not valid:
+            raise ValueError("Gemini returned no usable resume sections")
+        _count("invalid_responses")
+    return valid, invalid
+
+def _validated(resume: dict, payload: dict, slo: float = None, model: str = None):
+    """Keep valid sections and fix the rest with one targeted follow-up call.
+
+    Returns (resume, model): `model` (the one that wrote `resume`) if it
+    also wrote every repaired section, None if another model or the demo
+    resume filled some in.
+    """
+    schema = _schema(payload)
+    if schema is None:
+        return resume, model
+    valid, invalid = _check(resume, schema)
+    if invalid and env_bool("GEMINI_REPAIR_ENABLED", True):
+        _count("repair_calls")
+        try:
+            resp, repaired_by = get_router().generate(
+                compact_json(_repair_request(payload, resume, invalid)),
+                slo=slo, config=structured_config(schema.subset(invalid)),
+            )
+            model = model if repaired_by == model else None
+            _merge_repair(valid, invalid, resp.text, schema)
+        except Exception:
+            pass
+    return _complete(valid, invalid, payload, schema), None if invalid else model
+
+async def _avalidated(resume: dict, payload: dict, slo: float = None, model: str = None):
+    schema = _schema(payload)
+    if schema is None:
+        return resume, model
+    valid, invalid = _check(resume, schema)
+    if invalid and env_bool("GEMINI_REPAIR_ENABLED", True):
+        _count("repair_calls")
+        try:
+            resp, repaired_by = await get_router().agenerate(
+                compact_json(_repair_request(payload, resume, invalid)),
+                slo=slo, config=structured_config(schema.subset(invalid)),
+            )
+            model = model if repaired_by == model else None
+            _merge_repair(valid, invalid, resp.text, schema)
+        except Exception:
+            pass
+    return _complete(valid, invalid, payload, schema), None if invalid else model
+
+def _config_for(payload: dict):
+    schema = _schema(payload)
+    return structured_config(schema.json_schema) if schema is not None else None
+
+def tailor_resume_with_gemini(payload: dict, slo: float = None):
+    """(resume_json, model): the model that answered, or None if the resume
+    is a mix (another model's repairs, demo sections)."""
+    if env_bool("GEMINI_SECTION_MODE", False):
+        from backend.services.section_tailor import tailor_resume_by_section
+
+        with stage("gemini"):
+            return tailor_resume_by_section(payload, slo)
+    with stage("gemini"):
+        resp, model = get_router().generate(compact_json(payload), slo=slo, config=_config_for(payload))
+    with stage("parse"):
+        resume_json = parse_resume_text(resp.text)
+    with stage("validate"):
+        return _validated(resume_json, payload, slo, model)
+
+async def tailor_resume_with_gemini_async(payload: dict, slo: float = None):
+    if env_bool("GEMINI_SECTION_MODE", False):
+        from backend.services.section_tailor import tailor_resume_by_section_async
+
+        with stage("gemini"):
+            return await tailor_resume_by_section_async(payload, slo)
+    with stage("gemini"):
+        resp, model = await get_router().agenerate(compact_json(payload), slo=slo, config=_config_for(payload))
+    with stage("parse"):
+        resume_json = parse_resume_text(resp.text)
+    with stage("validate"):
+        return await _avalidated(resume_json, payload, slo, model)
+
+def _admitted():
+    """The ai_admission slot for one tailoring call; section mode admits each section call itself."""
+    return nullcontext() if env_bool("GEMINI_SECTION_MODE", False) else ai_admission.slot()
+
+def _aadmitted():
+    return nullcontext() if env_bool("GEMINI_SECTION_MODE", False) else ai_admission.aslot()
+
+def _cache_lookup(key: str):
+    with stage("cache"):
+        cached = resume_cache.get(key)
+    ai_cache_lookups.inc(result="miss" if cached is None else "hit")
+    return cached
+
+def tailor_resume_cached(payload: dict, slo: float = None) -> dict:
+    """tailor_resume_with_gemini behind the shared response cache.
+
+    Concurrent identical requests (double clicks, client retries) share one
+    Gemini call through resume_flights, across threads and, via the cache,
+    across worker processes. Only that call takes an ai_admission slot (one
+    per section call in section mode); it raises AdmissionRejected when the
+    process is at capacity. A resume
+    answered by a fallback model is served but not cached, so the primary
+    model gets the next request.
+    """
+    use_cache = env_bool("RESUME_CACHE_ENABLED", True)
+    primary = primary_model()
+    key = payload_fingerprint(payload, primary)
+
+    if use_cache:
+        cached = _cache_lookup(key)
+        if cached is not None:
+            return cached
+
+    def compute():
+        with _admitted():
+            resume_json, model = tailor_resume_with_gemini(payload, slo)
+        if use_cache and model == primary:
+            resume_cache.set(key, resume_json)
+        return resume_json
+
+    if not env_bool("SINGLE_FLIGHT_ENABLED", True):
+        return compute()
+    return resume_flights.do(key, compute, lookup=(lambda: resume_cache.get(key)) if use_cache else None)
+
+async def tailor_resume_cached_async(payload: dict, slo: float = None) -> dict:
+    """asyncio counterpart of tailor_resume_cached.
+
+    Cache reads and writes stay synchronous: they are local SQLite
+    operations that take well under a millisecond.
+    """
+    use_cache = env_bool("RESUME_CACHE_ENABLED", True)
+    primary = primary_model()
+    key = payload_fingerprint(payload, primary)
+
+    if use_cache:
+        cached = _cache_lookup(key)
+        if cached is not None:
+            return cached
+
+    async def compute():
+        async with _aadmitted():
+            resume_json, model = await tailor_resume_with_gemini_async(payload, slo)
+        if use_cache and model == primary:
+            resume_cache.set(key, resume_json)
+        return resume_json
+
+    if not env_bool("SINGLE_FLIGHT_ENABLED", True):
+        return await compute()
+    return await resume_flights.ado(key, compute, lookup=(lambda: resume_cache.get(key)) if use_cache else None)
+
+def _stream_sections(payload: dict, slo: float = None):
+    """(section, value, model) from the first model in the router chain that starts answering.
+
+    A model that fails before its first section is skipped for the next one;
+    after that an error propagates, since sections were already handed out.
+    """
+    router = get_router()
+    contents = compact_json(payload)
+    config = _config_for(payload)
+    error = None
+    for model in router.candidates(estimate_tokens(contents), slo):
+        if error is not None:
+            router.count_fallback()
+        started = time.monotonic()
+        emitted = False
+        try:
+            for section, value in iter_sections(get_gemini().stream(contents, model=model, config=config)):
+                emitted = True
+                yield section, value, model
+        except Exception as e:
+            router.record(model, time.monotonic() - started, False)
+            if emitted:
+                raise
+            error = e
+            continue
+        router.record(model, time.monotonic() - started, True)
+        return
+    raise error or GeminiUnavailableError("No configured Gemini model accepts this prompt")
+
+def stream_resume_with_gemini(payload: dict, job_description: str, candidate: dict, slo: float = None):
+    """Yield (section, value) pairs as soon as Gemini finishes each one.
+
+    A cached response is replayed immediately; a completed stream is
+    written back to the cache. Sections failing validation are held back;
+    if the stream breaks after valid sections arrived, those are kept. The
+    held-back and missing sections are repaired at the end (see
+    _validated) and yielded last, followed by the ATS keyword lists for
+    the original `job_description` and `candidate` (see finish_resume).
+    """
+    use_cache = env_bool("RESUME_CACHE_ENABLED", True)
+    primary = primary_model()
+    key = payload_fingerprint(payload, primary)
+
+    if use_cache:
+        cached = _cache_lookup(key)
+        if cached is not None:
+            for section, value in finish_resume(cached, job_description, candidate).items():
+                yield section, value
+            return
+
+    schema = _schema(payload)
+    resume_json = {}
+    sent = set()
+    model = None
+    with ai_admission.slot():
+        try:
+            for section, value, model in _stream_sections(payload, slo):
+                if section.startswith("ats_keywords_"):
+                    continue
+                resume_json[section] = value
+                if schema is None or not schema.validate_section(section, value):
+                    sent.add(section)
+                    yield section, value
+        except Exception:
+            if not sent:
+                raise
+            model = None  # broken off; the rest comes from repairs
+
+        resume_json, model = _validated(resume_json, payload, slo, model)
+    for section, value in resume_json.items():
+        if section not in sent:
+            yield section, value
+
+    if use_cache and model == primary:
+        resume_cache.set(key, resume_json)
+
+    finished = finish_resume(resume_json, job_description, candidate)
+    yield "ats_keywords_matched", finished["ats_keywords_matched"]
+    yield "ats_keywords_missing", finished["ats_keywords_missing"]
@@ -0,0 +1,181 @@
+# backend/services/ats_keywords.py
+import threading
+from collections import deque
+
+from backend.data.catalog import get_catalog
+from backend.services.profile_builder import ROLE_KEYWORDS
+
+# Tools and skills that recur in job descriptions but not in the catalog.
+# Ambiguous English words (Go, Swift, Rust as a verb...) are left out.
+COMMON_KEYWORDS = [
+    "Python", "Java", "JavaScript", "TypeScript", "C++", "C#", "Ruby", "PHP", "Kotlin", "Scala",
+    "SQL", "PostgreSQL", "MySQL", "SQLite", "MongoDB", "Redis", "Elasticsearch", "Kafka",
+    "Docker", "Kubernetes", "Terraform", "AWS", "GCP", "Azure", "Linux", "Bash", "CI/CD",
+    "Git", "GitHub", "REST", "GraphQL", "gRPC", "microservices", "OAuth", "authentication",
+    "React", "Vue", "Angular", "Node.js", "Next.js", "HTML", "CSS", "Tailwind", "Flask",
+    "Django", "FastAPI", "Spring", "pandas", "NumPy", "scikit-learn", "TensorFlow", "PyTorch",
+    "Spark", "Airflow", "dbt", "Tableau", "Power BI", "Excel", "machine learning",
+    "deep learning", "NLP", "computer vision", "data analysis", "data visualization",
+    "statistics", "A/B testing", "unit testing", "agile", "Scrum", "Jira", "Figma",
+]
+
+
+def _ascii_lower(text: str) -> str:
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    # A few non-ASCII characters change length when lowercased; fold only
+    # ASCII so match offsets still line up with the original text.
+    return "".join(c.lower() if c.isascii() else c for c in text)
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton over a keyword lexicon.
+
+    Matching is case-insensitive except for short all-caps acronyms (SQL,
+    REST, UI...), which must appear in capitals so that e.g. "the rest of"
+    does not count as REST. Hits must sit on word boundaries. One pass over
+    the text finds every keyword regardless of lexicon size.
+    """
+
+    def __init__(self, terms):
+        self.terms = []          # canonical spelling, by term id
+        self.case_sensitive = []
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+
+        seen = set()
+        for term in terms:
+            term = str(term).strip()
+            key = term.lower()
+            if not term or key in seen:
+                continue
+            seen.add(key)
+            self._add(key, len(self.terms))
+            self.terms.append(term)
+            self.case_sensitive.append(term.isupper() and len(term) <= 4)
+
+        self._build()
+
+    def _add(self, key: str, term_id: int):
+        node = 0
+        for ch in key:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append(term_id)
+
+    def _build(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                f = self._fail[node]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[nxt] = self._goto[f].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find(self, text: str) -> list:
+        """Keywords present in `text`, in order of first occurrence."""
+        if not text:
+            return []
+
+        lowered = _ascii_lower(text)
+        goto, fail, out = self._goto, self._fail, self._out
+        terms, case_sensitive = self.terms, self.case_sensitive
+        n = len(text)
+        found = {}
+        node = 0
+
+        for i, ch in enumerate(lowered):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if not out[node]:
+                continue
+            for term_id in out[node]:
+                if term_id in found:
+                    continue
+                term = terms[term_id]
+                start = i - len(term) + 1
+                if start > 0 and text[start - 1].isalnum():
+                    continue
+                if i + 1 < n and text[i + 1].isalnum():
+                    continue
+                if case_sensitive[term_id] and text[start:i + 1] != term:
+                    continue
+                found[term_id] = start
+
+        return [terms[t] for t in sorted(found, key=found.get)]
+
+
+def _flatten_text(value, parts: list):
+    if isinstance(value, str):
+        parts.append(value)
+    elif isinstance(value, dict):
+        for v in value.values():
+            _flatten_text(v, parts)
+    elif isinstance(value, (list, tuple)):
+        for v in value:
+            _flatten_text(v, parts)
+
+
+def ats_keywords(job_description: str, candidate: dict, matcher: KeywordMatcher = None) -> dict:
+    """Job-description keywords split into those the candidate data covers and those it lacks."""
+    matcher = matcher or get_keyword_matcher()
+    wanted = matcher.find(job_description or "")
+    if not wanted:
+        return {"matched": [], "missing": []}
+
+    parts = []
+    _flatten_text(candidate or {}, parts)
+    have = {k.lower() for k in matcher.find("\n".join(parts))}
+    return {
+        "matched": [k for k in wanted if k.lower() in have],
+        "missing": [k for k in wanted if k.lower() not in have],
+    }
+
+
+def apply_ats_keywords(resume_json: dict, job_description: str, candidate: dict) -> dict:
+    """Fill ats_keywords_matched / ats_keywords_missing in place and return the resume."""
+    result = ats_keywords(job_description, candidate)
+    resume_json["ats_keywords_matched"] = result["matched"]
+    resume_json["ats_keywords_missing"] = result["missing"]
+    return resume_json
+
+
+def lexicon(catalog) -> list:
+    terms = []
+    for pid in catalog:
+        project = catalog[pid]
+        terms.extend(project.get("languages", []))
+        terms.extend(project.get("skills_gained", []))
+    for keywords in ROLE_KEYWORDS.values():
+        terms.extend(keywords)
+    terms.extend(COMMON_KEYWORDS)
+    return terms
+
+
+_matcher = None
+_matcher_version = None
+_matcher_lock = threading.Lock()
+
+
+def get_keyword_matcher() -> KeywordMatcher:
+    """Matcher over the current catalog's lexicon, rebuilt when its version changes."""
+    global _matcher, _matcher_version
+    catalog = get_catalog()
+    if _matcher is None or _matcher_version != catalog.version:
+        with _matcher_lock:
+            if _matcher is None or _matcher_version != catalog.version:
+                _matcher = KeywordMatcher(lexicon(catalog))
+                _matcher_version = catalog.version
+    return _matcher
@@ -0,0 +1,447 @@
+# backend/services/gemini_client.py
+import asyncio
+import os
+import random
+import threading
+import time
+import weakref
+
+from backend.services import metrics
+from backend.utils import env_float, env_int
+
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+
+
+class GeminiUnavailableError(RuntimeError):
+    """Raised without calling upstream; callers should fall back immediately."""
+
+
+class CircuitOpenError(GeminiUnavailableError):
+    pass
+
+
+class GeminiOverloadedError(GeminiUnavailableError):
+    pass
+
+
+def is_retryable(exc: Exception) -> bool:
+    """Timeouts, connection errors and 408/429/5xx responses are retryable."""
+    if isinstance(exc, (TimeoutError, asyncio.TimeoutError, ConnectionError)):
+        return True
+
+    code = getattr(exc, "code", None) or getattr(exc, "status_code", None)
+    if isinstance(code, int):
+        return code in RETRYABLE_STATUS
+
+    try:
+        import httpx
+    except ImportError:
+        return False
+    return isinstance(exc, (httpx.TimeoutException, httpx.TransportError))
+
+
+class RetryBudget:
+    """Caps retries to a fraction of calls so retries can't amplify an outage.
+
+    Every call deposits ``ratio`` tokens (up to ``max_tokens``); every retry
+    withdraws one. ``min_tokens`` keeps a little headroom at low traffic.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_tokens: float = 3.0, max_tokens: float = 20.0):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self._tokens = min_tokens
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        with self._lock:
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return True
+            return False
+
+    @property
+    def tokens(self) -> float:
+        return self._tokens
+
+
+class CircuitBreaker:
+    """closed -> open after N consecutive failures -> half_open after a cool-down.
+
+    While open every call is rejected up front. In half_open a single probe
+    is let through; its result closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._probe_started = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == "open" and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return "half_open"
+            return self._state
+
+    @property
+    def probe_age(self):
+        """Seconds the half-open probe has been in flight, or None without one."""
+        with self._lock:
+            if not self._probe_in_flight:
+                return None
+            return time.monotonic() - self._probe_started
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._state == "closed":
+                return True
+            if self._state == "open":
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self._state = "half_open"
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            self._probe_started = time.monotonic()
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._state = "closed"
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._state == "half_open" or self._failures >= self.failure_threshold:
+                self._state = "open"
+                self._opened_at = time.monotonic()
+
+    def release(self):
+        """Forget a probe that ended without saying anything about upstream health."""
+        with self._lock:
+            self._probe_in_flight = False
+
+
+class GeminiClient:
+    """Shared, resilient wrapper around ``genai.Client``.
+
+    One SDK client (and therefore one pooled HTTP connection set) is created
+    lazily and reused by every call. Each call gets an overall deadline that
+    covers queueing, every attempt and the back-off sleeps in between.
+    Retries use full jitter and draw from a shared RetryBudget; the circuit
+    breaker fails calls fast with CircuitOpenError while upstream is
+    unhealthy (one breaker per model, so an overloaded model doesn't block
+    fallbacks to the others). At most ``max_in_flight`` blocking calls run
+    concurrently, and at most ``max_in_flight_async`` asyncio calls per
+    event loop; the async limit can be much higher since a waiting
+    coroutine holds no thread. ``base_url`` points the SDK at another
+    endpoint (a proxy, or the benchmark's fake Gemini server).
+    """
+
+    def __init__(self, api_key: str, model: str, timeout: float = 30.0, max_retries: int = 2,
+                 backoff_base: float = 0.25, backoff_cap: float = 4.0, max_in_flight: int = 8,
+                 retry_budget: RetryBudget = None, breaker: CircuitBreaker = None,
+                 max_in_flight_async: int = None, base_url: str = None):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.model = model
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.max_in_flight = max_in_flight
+        self.max_in_flight_async = max_in_flight_async or max_in_flight
+        self.retry_budget = retry_budget or RetryBudget()
+        self.breaker = breaker or CircuitBreaker()
+        self._breakers = {model: self.breaker}
+
+        self._client = None
+        self._client_lock = threading.Lock()
+        self._semaphore = threading.BoundedSemaphore(max_in_flight)
+        self._async_semaphores = weakref.WeakKeyDictionary()
+        self._in_flight = 0
+        self._count_lock = threading.Lock()
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    from google import genai
+                    from google.genai import types
+
+                    self._client = genai.Client(
+                        api_key=self.api_key,
+                        http_options=types.HttpOptions(
+                            timeout=int(self.timeout * 1000), base_url=self.base_url
+                        ),
+                    )
+        return self._client
+
+    def breaker_for(self, model: str = None) -> CircuitBreaker:
+        """Circuit breaker for `model`, created with the default breaker's settings."""
+        model = model or self.model
+        breaker = self._breakers.get(model)
+        if breaker is None:
+            with self._count_lock:
+                breaker = self._breakers.setdefault(
+                    model, CircuitBreaker(self.breaker.failure_threshold, self.breaker.reset_timeout)
+                )
+        return breaker
+
+    def _config(self, remaining: float, config=None):
+        from google.genai import types
+
+        http_options = types.HttpOptions(timeout=max(1, int(remaining * 1000)))
+        if config is None:
+            return types.GenerateContentConfig(http_options=http_options)
+        return config.model_copy(update={"http_options": http_options})
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt)))
+
+    def _track(self, delta: int):
+        with self._count_lock:
+            self._in_flight += delta
+
+    def _should_retry(self, exc: Exception, attempt: int, deadline: float) -> float:
+        """Back-off delay before the next attempt, or None to give up."""
+        if not is_retryable(exc) or attempt >= self.max_retries:
+            return None
+        delay = self._backoff(attempt)
+        if time.monotonic() + delay >= deadline or not self.retry_budget.withdraw():
+            return None
+        return delay
+
+    def _record(self, breaker: CircuitBreaker, exc: Exception):
+        if exc is None:
+            breaker.record_success()
+        elif is_retryable(exc):
+            breaker.record_failure()
+        else:
+            # A 4xx says nothing about upstream health.
+            breaker.release()
+
+    @staticmethod
+    def _observe(model: str, started: float, exc: Exception = None, usage=None):
+        metrics.gemini_request_seconds.observe(time.perf_counter() - started, model=model)
+        metrics.gemini_requests.inc(model=model, outcome="ok" if exc is None else type(exc).__name__)
+        metrics.record_usage(model, usage)
+
+    def generate(self, contents, model: str = None, timeout: float = None, config=None):
+        """Blocking generate_content with deadline, retries and circuit breaking."""
+        deadline = time.monotonic() + (timeout or self.timeout)
+        model = model or self.model
+        breaker = self.breaker_for(model)
+        self.retry_budget.deposit()
+
+        if not self._semaphore.acquire(timeout=max(0.0, deadline - time.monotonic())):
+            raise GeminiOverloadedError("Too many Gemini calls in flight")
+        self._track(1)
+        try:
+            attempt = 0
+            while True:
+                if not breaker.allow():
+                    raise CircuitOpenError(f"Gemini circuit is open for {model}")
+                recorded = False
+                try:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError("Gemini deadline exceeded")
+                    started = time.perf_counter()
+                    try:
+                        resp = self.client.models.generate_content(
+                            model=model,
+                            contents=contents,
+                            config=self._config(remaining, config),
+                        )
+                    except Exception as e:
+                        self._observe(model, started, e)
+                        self._record(breaker, e)
+                        recorded = True
+                        delay = self._should_retry(e, attempt, deadline)
+                        if delay is None:
+                            raise
+                        time.sleep(delay)
+                        attempt += 1
+                        continue
+                    self._observe(model, started, usage=getattr(resp, "usage_metadata", None))
+                    self._record(breaker, None)
+                    recorded = True
+                    return resp
+                finally:
+                    if not recorded:
+                        # A half-open probe must not stay claimed forever
+                        breaker.release()
+        finally:
+            self._track(-1)
+            self._semaphore.release()
+
+    def stream(self, contents, model: str = None, timeout: float = None, config=None):
+        """generate_content_stream yielding text chunks.
+
+        Failures before the first chunk are retried like generate(); once
+        text has been handed to the caller an error is raised as-is, since
+        the caller may already have acted on the partial output.
+        """
+        deadline = time.monotonic() + (timeout or self.timeout)
+        model = model or self.model
+        breaker = self.breaker_for(model)
+        self.retry_budget.deposit()
+
+        if not self._semaphore.acquire(timeout=max(0.0, deadline - time.monotonic())):
+            raise GeminiOverloadedError("Too many Gemini calls in flight")
+        self._track(1)
+        try:
+            attempt = 0
+            while True:
+                if not breaker.allow():
+                    raise CircuitOpenError(f"Gemini circuit is open for {model}")
+                recorded = False
+                try:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError("Gemini deadline exceeded")
+                    started = False
+                    attempt_started = time.perf_counter()
+                    usage = None
+                    try:
+                        for chunk in self.client.models.generate_content_stream(
+                            model=model,
+                            contents=contents,
+                            config=self._config(remaining, config),
+                        ):
+                            if time.monotonic() > deadline:
+                                raise TimeoutError("Gemini deadline exceeded")
+                            # Usage is cumulative; the last chunk carries the totals
+                            usage = getattr(chunk, "usage_metadata", None) or usage
+                            text = chunk.text
+                            if text:
+                                started = True
+                                yield text
+                    except Exception as e:
+                        self._observe(model, attempt_started, e)
+                        self._record(breaker, e)
+                        recorded = True
+                        delay = None if started else self._should_retry(e, attempt, deadline)
+                        if delay is None:
+                            raise
+                        time.sleep(delay)
+                        attempt += 1
+                        continue
+                    self._observe(model, attempt_started, usage=usage)
+                    self._record(breaker, None)
+                    recorded = True
+                    return
+                finally:
+                    if not recorded:
+                        # Closed early by the consumer (GeneratorExit) or
+                        # never started: free a half-open probe
+                        breaker.release()
+        finally:
+            self._track(-1)
+            self._semaphore.release()
+
+    def _async_semaphore(self):
+        loop = asyncio.get_running_loop()
+        sem = self._async_semaphores.get(loop)
+        if sem is None:
+            sem = self._async_semaphores[loop] = asyncio.Semaphore(self.max_in_flight_async)
+        return sem
+
+    async def agenerate(self, contents, model: str = None, timeout: float = None, config=None):
+        """asyncio counterpart of generate(), using the SDK's aio client."""
+        deadline = time.monotonic() + (timeout or self.timeout)
+        model = model or self.model
+        breaker = self.breaker_for(model)
+        self.retry_budget.deposit()
+
+        sem = self._async_semaphore()
+        try:
+            await asyncio.wait_for(sem.acquire(), max(0.0, deadline - time.monotonic()))
+        except asyncio.TimeoutError:
+            raise GeminiOverloadedError("Too many Gemini calls in flight")
+        self._track(1)
+        try:
+            attempt = 0
+            while True:
+                if not breaker.allow():
+                    raise CircuitOpenError(f"Gemini circuit is open for {model}")
+                recorded = False
+                try:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError("Gemini deadline exceeded")
+                    started = time.perf_counter()
+                    try:
+                        resp = await asyncio.wait_for(
+                            self.client.aio.models.generate_content(
+                                model=model,
+                                contents=contents,
+                                config=self._config(remaining, config),
+                            ),
+                            remaining,
+                        )
+                    except Exception as e:
+                        self._observe(model, started, e)
+                        self._record(breaker, e)
+                        recorded = True
+                        delay = self._should_retry(e, attempt, deadline)
+                        if delay is None:
+                            raise
+                        await asyncio.sleep(delay)
+                        attempt += 1
+                        continue
+                    self._observe(model, started, usage=getattr(resp, "usage_metadata", None))
+                    self._record(breaker, None)
+                    recorded = True
+                    return resp
+                finally:
+                    if not recorded:
+                        # Cancelled (a losing hedge, a section past its
+                        # deadline) or out of time: free a half-open probe
+                        breaker.release()
+        finally:
+            self._track(-1)
+            sem.release()
+
+    def stats(self) -> dict:
+        return {
+            "model": self.model,
+            "circuit": self.breaker.state,
+            "circuits": {name: b.state for name, b in list(self._breakers.items())},
+            "in_flight": self._in_flight,
+            "max_in_flight": self.max_in_flight,
+            "max_in_flight_async": self.max_in_flight_async,
+            "retry_budget_tokens": round(self.retry_budget.tokens, 2),
+        }
+
+
+def client_from_env(api_key: str, model: str) -> GeminiClient:
+    return GeminiClient(
+        api_key=api_key,
+        model=model,
+        timeout=env_float("GEMINI_TIMEOUT_SECONDS", 30.0),
+        max_retries=env_int("GEMINI_MAX_RETRIES", 2),
+        max_in_flight=env_int("GEMINI_MAX_IN_FLIGHT", 8),
+        max_in_flight_async=env_int("GEMINI_MAX_IN_FLIGHT_ASYNC", 64),
+        base_url=os.getenv("GEMINI_BASE_URL") or None,
+        retry_budget=RetryBudget(ratio=env_float("GEMINI_RETRY_BUDGET_RATIO", 0.2)),
+        breaker=CircuitBreaker(
+            failure_threshold=env_int("GEMINI_BREAKER_FAILURES", 5),
+            reset_timeout=env_float("GEMINI_BREAKER_RESET_SECONDS", 30.0),
+        ),
+    )
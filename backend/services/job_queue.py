@@ -0,0 +1,579 @@
+# backend/services/job_queue.py
+"""Durable background jobs for resume tailoring.
+
+POST /api/ai/jobs stores the request in a SQLite file and returns a job
+ID at once; worker threads claim jobs, run the same pipeline as
+/api/ai/resume (tailoring plus LaTeX) and store the result, which the
+client polls at /api/ai/jobs/<id> or receives at its callback URL.
+
+Lanes      high, normal and low map to priorities 0-2. Workers take the
+           lowest `priority * JOB_PRIORITY_AGING_SECONDS + created_at`,
+           so a low job that has waited long enough overtakes new high
+           ones instead of starving.
+Dedup      jobs are keyed by a hash of their payload. Submitting a payload
+           that is queued, running, or already done with AI output
+           returns the existing job (and raises its lane if needed).
+Recovery   a claimed job holds a lease. If its worker dies, the lease
+           expires and any worker reclaims it, up to JOB_MAX_ATTEMPTS.
+           A worker that lost its lease cannot overwrite the new result.
+Shedding   a job shed by admission control is requeued with backoff
+           rather than answered with the demo resume, until its last
+           attempt.
+
+Every process sharing the file is a producer and (with JOB_WORKERS > 0)
+a consumer; `python -m backend.services.job_queue` runs a worker-only
+process. Callbacks are best effort: polling is the source of truth.
+"""
+import argparse
+import hashlib
+import hmac
+import http.client
+import ipaddress
+import json
+import logging
+import os
+import socket
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from urllib.parse import urlparse
+
+from backend.services.latex_render import resume_json_to_latex
+from backend.services.metrics import ai_job_run_seconds, ai_job_wait_seconds, ai_jobs
+from backend.services.response_cache import canonical_json
+from backend.services.resume_pipeline import SHED_WARNING, run_resume_pipeline
+from backend.utils import env_float, env_int
+
+LANES = {"high": 0, "normal": 1, "low": 2}
+FINISHED = ("done", "failed")
+
+logger = logging.getLogger(__name__)
+
+
+class RetryJob(Exception):
+    """Raised by a handler to put the job back in the queue after `delay` seconds."""
+
+    def __init__(self, message: str, delay: float = None):
+        super().__init__(message)
+        self.delay = delay
+
+
+class InvalidCallback(ValueError):
+    pass
+
+
+def _iso(ts):
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat() if ts else None
+
+
+def _allowed_hosts() -> set:
+    return {h.strip().lower() for h in os.getenv("JOB_CALLBACK_ALLOWED_HOSTS", "").split(",") if h.strip()}
+
+
+def _public_addresses(hostname: str, port: int) -> list:
+    """Addresses `hostname` resolves to; raises InvalidCallback unless all of them are public."""
+    try:
+        infos = socket.getaddrinfo(hostname, port, type=socket.SOCK_STREAM)
+    except OSError as e:
+        raise InvalidCallback(f"cannot resolve callback host {hostname}") from e
+    addresses = [info[4][0] for info in infos]
+    for address in addresses:
+        if not ipaddress.ip_address(address.split("%")[0]).is_global:
+            raise InvalidCallback(f"callback host {hostname} resolves to a non-public address")
+    return addresses
+
+
+def _callback_target(url: str):
+    """(parsed URL, port, address to connect to) for a callback URL; raises InvalidCallback."""
+    parsed = urlparse(url or "")
+    if parsed.scheme not in ("http", "https") or not parsed.hostname:
+        raise InvalidCallback("callback_url must be an http(s) URL")
+    try:
+        port = parsed.port or (443 if parsed.scheme == "https" else 80)
+    except ValueError as e:
+        raise InvalidCallback("callback_url has an invalid port") from e
+    allowed = _allowed_hosts()
+    if allowed:
+        if parsed.hostname.lower() not in allowed:
+            raise InvalidCallback(f"callback host {parsed.hostname} is not allowed")
+        return parsed, port, parsed.hostname
+    return parsed, port, _public_addresses(parsed.hostname, port)[0]
+
+
+def check_callback_url(url: str) -> str:
+    """The URL if it may receive callbacks; raises InvalidCallback otherwise.
+
+    Only http(s). With JOB_CALLBACK_ALLOWED_HOSTS set (comma-separated)
+    the host must be one of those. Without it the host must resolve to
+    public addresses only, so clients cannot aim callbacks at loopback,
+    private or link-local services such as a cloud metadata endpoint.
+    Delivery resolves and checks again, connects to the checked address
+    (no DNS rebinding) and does not follow redirects.
+    """
+    _callback_target(url)
+    return url
+
+
+class _PinnedHTTPConnection(http.client.HTTPConnection):
+    """HTTP connection to a fixed address, with `host` only used for the Host header."""
+
+    def __init__(self, host: str, address: str, **kwargs):
+        super().__init__(host, **kwargs)
+        self._address = address
+
+    def connect(self):
+        self.sock = socket.create_connection((self._address, self.port), self.timeout)
+
+
+class _PinnedHTTPSConnection(http.client.HTTPSConnection):
+    """HTTPS counterpart of _PinnedHTTPConnection; the certificate is checked against `host`."""
+
+    def __init__(self, host: str, address: str, **kwargs):
+        super().__init__(host, **kwargs)
+        self._address = address
+
+    def connect(self):
+        sock = socket.create_connection((self._address, self.port), self.timeout)
+        self.sock = self._context.wrap_socket(sock, server_hostname=self.host)
+
+
+def _post_callback(url: str, body: bytes, headers: dict, timeout: float):
+    """POST to a callback URL; any non-2xx answer, redirects included, raises."""
+    parsed, port, address = _callback_target(url)
+    connection_class = _PinnedHTTPSConnection if parsed.scheme == "https" else _PinnedHTTPConnection
+    conn = connection_class(parsed.hostname, address, port=port, timeout=timeout)
+    try:
+        path = (parsed.path or "/") + (f"?{parsed.query}" if parsed.query else "")
+        conn.request("POST", path, body=body, headers=headers)
+        response = conn.getresponse()
+        response.read()
+        if not 200 <= response.status < 300:
+            raise RuntimeError(f"callback answered HTTP {response.status}")
+    finally:
+        conn.close()
+
+
+class JobQueue:
+    def __init__(self, path: str, handler, workers: int = 2, lease_seconds: float = 300.0,
+                 max_attempts: int = 3, retry_delay: float = 5.0, aging_seconds: float = 60.0,
+                 result_ttl: float = 86400.0, poll_seconds: float = 1.0):
+        self.path = path
+        self.handler = handler
+        self.workers = workers
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max(1, max_attempts)
+        self.retry_delay = retry_delay
+        self.aging_seconds = aging_seconds
+        self.result_ttl = result_ttl
+        self.poll_seconds = poll_seconds
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition()
+        self._threads = []
+        self._pid = None
+        self._stopping = threading.Event()
+        self._callbacks = None
+        self._purged_at = 0.0
+
+    # -- storage -----------------------------------------------------------
+
+    def _conn(self) -> sqlite3.Connection:
+        # Same per-thread, per-pid connection rule as the response cache
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = sqlite3.connect(self.path, timeout=10.0, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY,"
+            " dedup_key TEXT NOT NULL,"
+            " lane TEXT NOT NULL,"
+            " priority INTEGER NOT NULL,"
+            " status TEXT NOT NULL,"
+            " outcome TEXT,"
+            " payload TEXT NOT NULL,"
+            " result TEXT,"
+            " error TEXT,"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " worker TEXT,"
+            " created_at REAL NOT NULL,"
+            " available_at REAL NOT NULL,"
+            " started_at REAL,"
+            " finished_at REAL,"
+            " lease_expires_at REAL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs(status, available_at)")
+        conn.execute("CREATE INDEX IF NOT EXISTS jobs_dedup ON jobs(dedup_key)")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS job_callbacks ("
+            " job_id TEXT NOT NULL,"
+            " url TEXT NOT NULL,"
+            " status TEXT NOT NULL DEFAULT 'pending',"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " last_error TEXT,"
+            " PRIMARY KEY (job_id, url))"
+        )
+
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def _transaction(self, fn):
+        """Run fn(conn) inside BEGIN IMMEDIATE, so claims and submits are atomic across processes."""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            value = fn(conn)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return value
+
+    # -- producer ----------------------------------------------------------
+
+    @staticmethod
+    def dedup_key(payload: dict) -> str:
+        return hashlib.sha256(canonical_json(payload).encode("utf-8")).hexdigest()
+
+    def submit(self, payload: dict, lane: str = "normal", callback_url: str = None):
+        """(job id, deduplicated) for `payload`; raises ValueError for an unknown lane."""
+        if lane not in LANES:
+            raise ValueError(f"lane must be one of {', '.join(LANES)}")
+        priority = LANES[lane]
+        key = self.dedup_key(payload)
+        now = time.time()
+
+        def submit_locked(conn):
+            row = conn.execute(
+                "SELECT id, status, priority FROM jobs WHERE dedup_key = ?"
+                " AND (status IN ('queued', 'running') OR (status = 'done' AND outcome = 'ok'))"
+                " ORDER BY created_at DESC LIMIT 1",
+                (key,),
+            ).fetchone()
+            if row is not None:
+                job_id = row["id"]
+                if row["status"] == "queued" and priority < row["priority"]:
+                    conn.execute("UPDATE jobs SET priority = ?, lane = ? WHERE id = ?", (priority, lane, job_id))
+            else:
+                job_id = uuid.uuid4().hex
+                conn.execute(
+                    "INSERT INTO jobs (id, dedup_key, lane, priority, status, payload, created_at, available_at)"
+                    " VALUES (?, ?, ?, ?, 'queued', ?, ?, ?)",
+                    (job_id, key, lane, priority, canonical_json(payload), now, now),
+                )
+            if callback_url:
+                conn.execute("INSERT OR IGNORE INTO job_callbacks (job_id, url) VALUES (?, ?)", (job_id, callback_url))
+            return job_id, row is not None, row is not None and row["status"] == "done"
+
+        job_id, deduplicated, finished = self._transaction(submit_locked)
+        ai_jobs.inc(event="deduplicated" if deduplicated else "submitted")
+        if finished and callback_url:
+            self._send_callbacks(job_id)
+        elif not deduplicated:
+            with self._wakeup:
+                self._wakeup.notify()
+        return job_id, deduplicated
+
+    def get(self, job_id: str):
+        """Public view of a job, or None if unknown (or purged)."""
+        row = self._conn().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = {
+            "id": row["id"],
+            "status": row["status"],
+            "lane": row["lane"],
+            "attempts": row["attempts"],
+            "created_at": _iso(row["created_at"]),
+            "started_at": _iso(row["started_at"]),
+            "finished_at": _iso(row["finished_at"]),
+        }
+        if row["status"] == "queued":
+            job["position"] = self._conn().execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = 'queued'"
+                " AND priority * ? + created_at < ? * ? + ?",
+                (self.aging_seconds, row["priority"], self.aging_seconds, row["created_at"]),
+            ).fetchone()[0]
+        if row["result"] is not None:
+            job["result"] = json.loads(row["result"])
+        if row["error"]:
+            job["error"] = row["error"]
+        return job
+
+    # -- consumer ----------------------------------------------------------
+
+    def claim(self, worker: str):
+        """Lease the next runnable job to `worker`; None if there is none."""
+        now = time.time()
+
+        def claim_locked(conn):
+            while True:
+                row = conn.execute(
+                    "SELECT id, status, attempts, lane, created_at, payload FROM jobs"
+                    " WHERE (status = 'queued' AND available_at <= ?)"
+                    " OR (status = 'running' AND lease_expires_at <= ?)"
+                    " ORDER BY priority * ? + created_at LIMIT 1",
+                    (now, now, self.aging_seconds),
+                ).fetchone()
+                if row is None:
+                    return None, []
+                events = ["recovered"] if row["status"] == "running" else []
+                if row["status"] == "running" and row["attempts"] >= self.max_attempts:
+                    conn.execute(
+                        "UPDATE jobs SET status = 'failed', error = ?, finished_at = ?, lease_expires_at = NULL"
+                        " WHERE id = ?",
+                        ("worker lost the job on every attempt", now, row["id"]),
+                    )
+                    ai_jobs.inc(event="failed")
+                    continue
+                conn.execute(
+                    "UPDATE jobs SET status = 'running', attempts = attempts + 1, worker = ?,"
+                    " started_at = COALESCE(started_at, ?), lease_expires_at = ? WHERE id = ?",
+                    (worker, now, now + self.lease_seconds, row["id"]),
+                )
+                return dict(row, attempts=row["attempts"] + 1), events
+
+        job, events = self._transaction(claim_locked)
+        for event in events:
+            ai_jobs.inc(event=event)
+        if job is not None and job["attempts"] == 1:
+            ai_job_wait_seconds.observe(now - job["created_at"], lane=job["lane"])
+        return job
+
+    def _finish(self, job: dict, worker: str, status: str, result: dict = None, error: str = None) -> bool:
+        """Store the outcome if `worker` still holds the lease."""
+        outcome = result.get("status", "ok") if result else None
+        updated = self._conn().execute(
+            "UPDATE jobs SET status = ?, outcome = ?, result = ?, error = ?, finished_at = ?,"
+            " lease_expires_at = NULL WHERE id = ? AND worker = ? AND status = 'running'",
+            (status, outcome, canonical_json(result) if result else None, error, time.time(), job["id"], worker),
+        ).rowcount
+        return bool(updated)
+
+    def _requeue(self, job: dict, worker: str, delay: float):
+        self._conn().execute(
+            "UPDATE jobs SET status = 'queued', worker = NULL, lease_expires_at = NULL, available_at = ?"
+            " WHERE id = ? AND worker = ? AND status = 'running'",
+            (time.time() + delay, job["id"], worker),
+        )
+
+    def run_one(self, job: dict, worker: str):
+        started = time.monotonic()
+        last_attempt = job["attempts"] >= self.max_attempts
+        try:
+            result = self.handler(json.loads(job["payload"]), last_attempt)
+        except RetryJob as e:
+            if not last_attempt:
+                # Exponential backoff: retry_delay, 2x, 4x, ...
+                self._requeue(job, worker, e.delay or self.retry_delay * 2 ** (job["attempts"] - 1))
+                ai_jobs.inc(event="requeued")
+                return
+            status, result, error = "failed", None, str(e)
+        except Exception as e:
+            status, result, error = "failed", None, f"{type(e).__name__}: {e}"
+        else:
+            status, error = "done", None
+        finally:
+            ai_job_run_seconds.observe(time.monotonic() - started, lane=job["lane"])
+
+        if self._finish(job, worker, status, result, error):
+            ai_jobs.inc(event="completed" if status == "done" else "failed")
+            self._send_callbacks(job["id"])
+        else:
+            ai_jobs.inc(event="lease_lost")
+
+    def _work(self):
+        worker = f"{os.getpid()}:{threading.current_thread().name}"
+        while not self._stopping.is_set():
+            try:
+                job = self.claim(worker)
+            except sqlite3.Error:
+                job = None
+            if job is not None:
+                try:
+                    self.run_one(job, worker)
+                except Exception:
+                    # e.g. sqlite3.OperationalError storing the result. The
+                    # thread must survive it; the job's lease runs out and
+                    # it is claimed again.
+                    logger.exception("job %s: worker %s failed", job["id"], worker)
+                    ai_jobs.inc(event="worker_error")
+                continue
+            self._maybe_purge()
+            with self._wakeup:
+                self._wakeup.wait(self.poll_seconds)
+
+    def start(self, workers: int = None):
+        """Start the worker threads for this process (idempotent; restarts after a fork)."""
+        workers = self.workers if workers is None else workers
+        if workers <= 0:
+            return
+        with self._lock:
+            if self._pid == os.getpid() and any(t.is_alive() for t in self._threads):
+                return
+            self._pid = os.getpid()
+            self._stopping.clear()
+            self._threads = [
+                threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+                for i in range(workers)
+            ]
+            for thread in self._threads:
+                thread.start()
+
+    def stop(self, timeout: float = None):
+        self._stopping.set()
+        with self._wakeup:
+            self._wakeup.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def _maybe_purge(self):
+        now = time.time()
+        if now - self._purged_at < 60:
+            return
+        self._purged_at = now
+        try:
+            conn = self._conn()
+            cutoff = now - self.result_ttl
+            conn.execute(
+                "DELETE FROM job_callbacks WHERE job_id IN"
+                " (SELECT id FROM jobs WHERE status IN ('done', 'failed') AND finished_at < ?)",
+                (cutoff,),
+            )
+            conn.execute("DELETE FROM jobs WHERE status IN ('done', 'failed') AND finished_at < ?", (cutoff,))
+        except sqlite3.Error:
+            pass
+
+    # -- callbacks ---------------------------------------------------------
+
+    def _send_callbacks(self, job_id: str):
+        rows = self._conn().execute(
+            "SELECT url FROM job_callbacks WHERE job_id = ? AND status = 'pending'", (job_id,)
+        ).fetchall()
+        if not rows:
+            return
+        with self._lock:
+            if self._callbacks is None:
+                self._callbacks = ThreadPoolExecutor(max_workers=2, thread_name_prefix="job-callback")
+        for row in rows:
+            self._callbacks.submit(self._deliver, job_id, row["url"])
+
+    def _deliver(self, job_id: str, url: str, attempts: int = 3):
+        """POST the job to `url`, signed with JOB_CALLBACK_SECRET if set; retries with backoff."""
+        body = json.dumps({"job": self.get(job_id)}).encode("utf-8")
+        headers = {"Content-Type": "application/json", "X-Intersync-Job-Id": job_id}
+        secret = os.getenv("JOB_CALLBACK_SECRET")
+        if secret:
+            digest = hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+            headers["X-Intersync-Signature"] = f"sha256={digest}"
+
+        error = None
+        for attempt in range(attempts):
+            if attempt:
+                time.sleep(2 ** (attempt - 1))
+            try:
+                _post_callback(url, body, headers, env_float("JOB_CALLBACK_TIMEOUT_SECONDS", 5.0))
+                error = None
+                break
+            except InvalidCallback as e:
+                error = f"{type(e).__name__}: {e}"
+                break
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+
+        ai_jobs.inc(event="callback_failed" if error else "callback_sent")
+        try:
+            self._conn().execute(
+                "UPDATE job_callbacks SET status = ?, attempts = attempts + ?, last_error = ?"
+                " WHERE job_id = ? AND url = ?",
+                ("failed" if error else "sent", attempt + 1, error, job_id, url),
+            )
+        except sqlite3.Error:
+            pass
+
+    # -- stats ---------------------------------------------------------------
+
+    def stats(self) -> dict:
+        now = time.time()
+        counts = {lane: {"queued": 0, "running": 0, "done": 0, "failed": 0} for lane in LANES}
+        oldest = {}
+        try:
+            conn = self._conn()
+            for row in conn.execute("SELECT lane, status, COUNT(*) AS n FROM jobs GROUP BY lane, status"):
+                counts.setdefault(row["lane"], {})[row["status"]] = row["n"]
+            for row in conn.execute(
+                "SELECT lane, MIN(created_at) AS oldest FROM jobs WHERE status = 'queued' GROUP BY lane"
+            ):
+                oldest[row["lane"]] = round(now - row["oldest"], 3)
+        except sqlite3.Error:
+            pass
+        return {
+            "path": self.path,
+            "lanes": counts,
+            "queue_depth": sum(c.get("queued", 0) for c in counts.values()),
+            "oldest_queued_seconds": oldest,
+            "workers": sum(t.is_alive() for t in self._threads) if self._pid == os.getpid() else 0,
+        }
+
+
+def run_resume_job(payload: dict, last_attempt: bool) -> dict:
+    """Job handler: the /api/ai/resume pipeline; shed requests wait for a later attempt."""
+    result = run_resume_pipeline(
+        payload["target_role"], payload["job_description"], payload["candidate"], payload.get("slo")
+    )
+    if result.warning == SHED_WARNING and not last_attempt:
+        raise RetryJob(result.error)
+
+    body = {"status": "fallback" if result.warning else "ok", "used_ai": result.used_ai,
+            "resume_json": result.resume_json, "latex": resume_json_to_latex(result.resume_json)}
+    if result.warning:
+        body["warning"] = result.warning
+        body["error"] = result.error
+    if result.prompt_tokens:
+        body["prompt_tokens"] = result.prompt_tokens
+    return body
+
+
+resume_jobs = JobQueue(
+    path=os.getenv("JOB_QUEUE_PATH") or os.path.join(tempfile.gettempdir(), "intersync_jobs.sqlite3"),
+    handler=run_resume_job,
+    workers=env_int("JOB_WORKERS", 2),
+    lease_seconds=env_float("JOB_LEASE_SECONDS", 300),
+    max_attempts=env_int("JOB_MAX_ATTEMPTS", 3),
+    retry_delay=env_float("JOB_RETRY_DELAY_SECONDS", 5),
+    aging_seconds=env_float("JOB_PRIORITY_AGING_SECONDS", 60),
+    result_ttl=env_float("JOB_RESULT_TTL", 86400),
+    poll_seconds=env_float("JOB_POLL_SECONDS", 1.0),
+)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run resume job workers without the web app.")
+    parser.add_argument("--workers", type=int, default=env_int("JOB_WORKERS", 2) or 2)
+    args = parser.parse_args(argv)
+
+    resume_jobs.start(args.workers)
+    print(f"{args.workers} job workers on {resume_jobs.path}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        resume_jobs.stop(timeout=5)
+
+
+if __name__ == "__main__":
+    main()
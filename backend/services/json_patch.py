@@ -0,0 +1,136 @@
+# backend/services/json_patch.py
+"""JSON Patch (RFC 6902) for profile delta updates.
+
+apply_patch returns a new document and never touches its input; any bad
+operation raises InvalidPatch and nothing is applied.
+"""
+import copy
+
+
+class InvalidPatch(ValueError):
+    pass
+
+
+def _pointer(path) -> list:
+    """Reference tokens of a JSON Pointer (RFC 6901)."""
+    if not isinstance(path, str) or (path and not path.startswith("/")):
+        raise InvalidPatch(f"bad path {path!r}")
+    if not path:
+        return []
+    return [token.replace("~1", "/").replace("~0", "~") for token in path[1:].split("/")]
+
+
+def _index(container: list, token: str, allow_end: bool = False) -> int:
+    if token == "-" and allow_end:
+        return len(container)
+    if not token.isdigit() or (len(token) > 1 and token.startswith("0")):
+        raise InvalidPatch(f"bad array index {token!r}")
+    index = int(token)
+    if index > len(container) or (index == len(container) and not allow_end):
+        raise InvalidPatch(f"array index {index} out of range")
+    return index
+
+
+def _parent(doc, tokens: list):
+    """(container, last token) for a path; the container must exist."""
+    if not tokens:
+        raise InvalidPatch("operation on the document root is not supported")
+    node = doc
+    for token in tokens[:-1]:
+        if isinstance(node, dict) and token in node:
+            node = node[token]
+        elif isinstance(node, list):
+            node = node[_index(node, token)]
+        else:
+            raise InvalidPatch(f"path /{'/'.join(tokens)} does not exist")
+    if not isinstance(node, (dict, list)):
+        raise InvalidPatch(f"path /{'/'.join(tokens)} does not exist")
+    return node, tokens[-1]
+
+
+def _get(doc, tokens: list):
+    node = doc
+    for token in tokens:
+        if isinstance(node, dict) and token in node:
+            node = node[token]
+        elif isinstance(node, list):
+            node = node[_index(node, token)]
+        else:
+            raise InvalidPatch(f"path /{'/'.join(tokens)} does not exist")
+    return node
+
+
+def _json_equal(a, b) -> bool:
+    """Equality as JSON sees it: true is not 1 and false is not 0, but 1 is 1.0."""
+    if isinstance(a, bool) or isinstance(b, bool):
+        return type(a) is type(b) and a == b
+    if isinstance(a, (int, float)) and isinstance(b, (int, float)):
+        return a == b
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(_json_equal(a[k], b[k]) for k in a)
+    if isinstance(a, list) and isinstance(b, list):
+        return len(a) == len(b) and all(map(_json_equal, a, b))
+    return type(a) is type(b) and a == b
+
+
+def _add(doc, tokens: list, value):
+    container, token = _parent(doc, tokens)
+    if isinstance(container, list):
+        container.insert(_index(container, token, allow_end=True), value)
+    else:
+        container[token] = value
+
+
+def _remove(doc, tokens: list):
+    container, token = _parent(doc, tokens)
+    if isinstance(container, list):
+        return container.pop(_index(container, token))
+    if token not in container:
+        raise InvalidPatch(f"path /{'/'.join(tokens)} does not exist")
+    return container.pop(token)
+
+
+def _replace(doc, tokens: list, value):
+    container, token = _parent(doc, tokens)
+    if isinstance(container, list):
+        container[_index(container, token)] = value
+    elif token in container:
+        container[token] = value
+    else:
+        raise InvalidPatch(f"path /{'/'.join(tokens)} does not exist")
+
+
+def apply_patch(doc: dict, operations) -> dict:
+    """`doc` with the operations (add, remove, replace, move, copy, test) applied."""
+    if not isinstance(operations, list):
+        raise InvalidPatch("a JSON Patch is a list of operations")
+    doc = copy.deepcopy(doc)
+    for op in operations:
+        if not isinstance(op, dict) or "path" not in op:
+            raise InvalidPatch(f"bad operation {op!r}")
+        kind = op.get("op")
+        tokens = _pointer(op["path"])
+        if kind in ("add", "replace", "test") and "value" not in op:
+            raise InvalidPatch(f"{kind} needs a value")
+
+        if kind == "add":
+            _add(doc, tokens, copy.deepcopy(op["value"]))
+        elif kind == "remove":
+            _remove(doc, tokens)
+        elif kind == "replace":
+            _replace(doc, tokens, copy.deepcopy(op["value"]))
+        elif kind in ("move", "copy"):
+            source = _pointer(op.get("from"))
+            if kind == "move":
+                if tokens[:len(source)] == source and tokens != source:
+                    raise InvalidPatch("cannot move a value into itself")
+                value = _remove(doc, source)
+            else:
+                value = copy.deepcopy(_get(doc, source))
+            _add(doc, tokens, value)
+        elif kind == "test":
+            if not _json_equal(_get(doc, tokens), op["value"]):
+                raise InvalidPatch(f"test failed at {op['path']}")
+        else:
+            raise InvalidPatch(f"unknown op {kind!r}")
+    return doc
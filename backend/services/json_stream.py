@@ -0,0 +1,122 @@
+# backend/services/json_stream.py
+import json
+
+
+class SectionStreamParser:
+    """Incremental parser for a streamed top-level JSON object.
+
+    Feed it text chunks as they arrive; every call returns the
+    ``(key, value)`` members whose values finished in that chunk. Only the
+    top level is tracked (depth, string and escape state), and each member
+    is decoded with ``json.loads`` once its closing ``,`` or ``}`` shows
+    up, so the cost is linear in the response size. Anything before the
+    opening brace (e.g. a ```json fence) and after the closing brace is
+    ignored.
+
+    A member that doesn't decode raises ValueError, unless
+    ``skip_malformed`` is set: then it is counted in ``malformed`` and
+    parsing goes on with the next member.
+    """
+
+    def __init__(self, skip_malformed: bool = False):
+        self._buf = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._member_start = None
+        self._colon = None
+        self.done = False
+        self.skip_malformed = skip_malformed
+        self.malformed = 0
+
+    def feed(self, chunk: str) -> list:
+        if self.done or not chunk:
+            return []
+
+        self._buf += chunk
+        members = []
+        buf = self._buf
+        i = self._pos
+
+        while i < len(buf):
+            ch = buf[i]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif self._depth == 0:
+                if ch == "{":
+                    self._depth = 1
+                    self._member_start = i + 1
+            elif ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "]}":
+                if self._depth == 1:
+                    self._emit(buf, i, members)
+                    self.done = True
+                    break
+                self._depth -= 1
+            elif self._depth == 1:
+                if ch == ":" and self._colon is None:
+                    self._colon = i
+                elif ch == ",":
+                    self._emit(buf, i, members)
+                    self._member_start = i + 1
+
+            i += 1
+
+        # Drop what has been consumed so the buffer only holds the member
+        # currently being streamed.
+        if self._member_start is not None and not self.done:
+            cut = self._member_start
+            self._buf = buf[cut:]
+            self._pos = i - cut
+            self._member_start = 0
+            if self._colon is not None:
+                self._colon -= cut
+        else:
+            self._buf = ""
+            self._pos = 0
+
+        return members
+
+    def _emit(self, buf: str, end: int, members: list):
+        colon, self._colon = self._colon, None
+        try:
+            if colon is None:
+                if buf[self._member_start:end].strip():
+                    raise ValueError("Malformed JSON member: missing ':'")
+                return
+            key = json.loads(buf[self._member_start:colon])
+            value = json.loads(buf[colon + 1:end])
+        except ValueError:
+            if not self.skip_malformed:
+                raise
+            self.malformed += 1
+            return
+        members.append((key, value))
+
+
+def iter_sections(chunks):
+    """Yield ``(key, value)`` top-level members from an iterable of text chunks."""
+    parser = SectionStreamParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    if not parser.done:
+        raise ValueError("Truncated JSON object in stream")
+
+
+def salvage_sections(text: str) -> dict:
+    """Complete top-level members of a malformed or truncated JSON object.
+
+    Every member that decodes on its own is kept; broken ones are skipped,
+    as is a member cut off by truncation.
+    """
+    return dict(SectionStreamParser(skip_malformed=True).feed(text or ""))
@@ -1,20 +1,31 @@
 # backend/services/latex_render.py
+import threading
+from collections import OrderedDict
 
-def _escape_latex(s) -> str:
+from backend.services.metrics import stage
+from backend.utils import env_int
+
+def _escape_specials(s: str) -> str:
+    # Still one str.replace per character. A single-pass str.translate or
+    # re.sub with multi-character replacements measures slower in CPython
+    # (see the "escape" table of backend.benchmarks.latex_render), and
+    # cold renders are about as fast as before; the speed-up for repeated
+    # renders comes from the fragment cache.
+    return (
+        s.replace("&", "\\&").replace("%", "\\%").replace("$", "\\$").replace("#", "\\#")
+        .replace("_", "\\_").replace("{", "\\{").replace("}", "\\}")
+        .replace("~", "\\textasciitilde{}").replace("^", "\\textasciicircum{}")
+    )
+
+def escape_latex(s) -> str:
     if s is None:
         return ""
     s = str(s)
-    s = s.replace("\\", "\\textbackslash{}")
-    s = s.replace("&", "\\&")
-    s = s.replace("%", "\\%")
-    s = s.replace("$", "\\$")
-    s = s.replace("#", "\\#")
-    s = s.replace("_", "\\_")
-    s = s.replace("{", "\\{")
-    s = s.replace("}", "\\}")
-    s = s.replace("~", "\\textasciitilde{}")
-    s = s.replace("^", "\\textasciicircum{}")
-    return s
+    if "\\" in s:
+        # Escape around backslashes so the braces of \textbackslash{} are
+        # not themselves escaped by the brace replacements.
+        return "\\textbackslash{}".join(_escape_specials(part) for part in s.split("\\"))
+    return _escape_specials(s)
 
 def _as_list(x):
     if x is None:
@@ -24,103 +35,243 @@ def _as_list(x):
     return [x]
 
 def _itemize(lines) -> str:
-    lines = [l for l in (_escape_latex(l).strip() for l in (lines or [])) if l]
-    if not lines:
+    items = [l for l in (escape_latex(l).strip() for l in (lines or [])) if l]
+    if not items:
         return ""
-    out = "\\begin{itemize}\\itemsep 0pt\n"
-    for l in lines:
-        out += f"  \\item {l}\n"
-    out += "\\end{itemize}\n"
-    return out
+    return "\\begin{itemize}\\itemsep 0pt\n  \\item " + "\n  \\item ".join(items) + "\n\\end{itemize}\n"
 
-def resume_json_to_latex(resume: dict) -> str:
-    if not isinstance(resume, dict):
-        resume = {}
 
-    header = resume.get("header") or {}
+SECTION_ORDER = ("header", "headline", "summary", "skills", "experience", "projects")
+
+_PREAMBLE = r"""\documentclass[letterpaper,11pt]{article}
+\usepackage[margin=0.75in]{geometry}
+\usepackage{enumitem}
+\usepackage[hidelinks]{hyperref}
+\setlist[itemize]{leftmargin=*,nosep}
+
+\begin{document}
+
+\begin{center}
+"""
+
+_CENTER_END = "\\end{center}\n\n"
+_DOCUMENT_END = r"\end{document}"
+
+
+def _header_latex(header) -> str:
     if not isinstance(header, dict):
         header = {}
 
-    name = _escape_latex(header.get("name") or "Your Name")
-    email = _escape_latex(header.get("email") or "")
+    name = escape_latex(header.get("name") or "Your Name")
     links = header.get("links") or []
     if not isinstance(links, list):
         links = []
-    links = [_escape_latex(x) for x in links if x]
 
-    headline = _escape_latex(resume.get("headline") or "")
+    contact_parts = [escape_latex(p) for p in [header.get("email")] + links if p]
+    return "{\\LARGE \\textbf{" + name + "}}\\\\\n" + " | ".join(contact_parts) + "\\\\\n"
 
-    summary = _as_list(resume.get("summary"))
-    skills = resume.get("skills") or {}
-    if not isinstance(skills, dict):
-        skills = {}
 
-    projects = resume.get("projects") or []
-    if not isinstance(projects, list):
-        projects = []
+def _headline_latex(headline) -> str:
+    return "\\textit{" + escape_latex(headline or "") + "}\n"
 
-    experience = resume.get("experience") or []
-    if not isinstance(experience, list):
-        experience = []
 
-    contact_parts = [p for p in [email] + links if p]
-    contact_line = " | ".join(contact_parts)
+def _summary_latex(summary) -> str:
+    return "\\section*{Summary}\n" + (_itemize(_as_list(summary)) or " ") + "\n"
+
 
-    skill_lines = ""
+def _skills_latex(skills) -> str:
+    if not isinstance(skills, dict):
+        skills = {}
+
+    out = ["\\section*{Skills}\n"]
     for section, items in skills.items():
         if not items:
             continue
         items = items if isinstance(items, list) else [items]
-        items = [_escape_latex(i) for i in items if i]
+        items = [escape_latex(i) for i in items if i]
         if items:
-            skill_lines += f"\\textbf{{{_escape_latex(section)}:}} " + ", ".join(items) + r"\\"
-            skill_lines += "\n"
+            out.append("\\textbf{" + escape_latex(section) + ":} " + ", ".join(items) + "\\\\\n")
 
-    latex = r"""\documentclass[letterpaper,11pt]{article}
-\usepackage[margin=0.75in]{geometry}
-\usepackage{enumitem}
-\usepackage[hidelinks]{hyperref}
-\setlist[itemize]{leftmargin=*,nosep}
+    if len(out) == 1:
+        out.append(" ")
+    out.append("\n\n")
+    return "".join(out)
 
-\begin{document}
 
-\begin{center}
-{\LARGE \textbf{""" + name + r"""}}\\
-""" + _escape_latex(contact_line) + r"""\\
-\textit{""" + headline + r"""}
-\end{center}
+def _experience_entry_latex(x: dict) -> str:
+    title = escape_latex(x.get("title") or "")
+    company = escape_latex(x.get("company") or "")
+    dates = escape_latex(x.get("dates") or "")
 
-\section*{Summary}
-""" + (_itemize(summary) or " ") + r"""
-\section*{Skills}
-""" + (skill_lines or " ") + r"""
+    out = ["\\textbf{", title or "Experience", "}"]
+    if company:
+        out += [" --- ", company]
+    if dates:
+        out += [" \\hfill ", dates]
+    out += ["\n\n", _itemize(_as_list(x.get("bullets"))), "\\vspace{2mm}\n"]
+    return "".join(out)
 
-\section*{Experience}
-"""
 
-    for x in experience:
-        if not isinstance(x, dict):
-            continue
-        title = _escape_latex(x.get("title") or "")
-        company = _escape_latex(x.get("company") or "")
-        dates = _escape_latex(x.get("dates") or "")
-        header_line = "\\textbf{" + (title or "Experience") + "}"
-        if company:
-            header_line += " --- " + company
-        if dates:
-            header_line += " \\hfill " + dates
-        latex += header_line + "\n\n"
-        latex += _itemize(_as_list(x.get("bullets")))
-        latex += "\\vspace{2mm}\n"
-
-    latex += "\\section*{Projects}\n"
-    for p in projects:
-        if not isinstance(p, dict):
-            continue
-        pname = _escape_latex(p.get("name") or "Project")
-        latex += f"\\textbf{{{pname}}}\n\n"
-        latex += _itemize(_as_list(p.get("bullets")))
-        latex += "\\vspace{2mm}\n"
+def _project_entry_latex(p: dict) -> str:
+    pname = escape_latex(p.get("name") or "Project")
+    return "\\textbf{" + pname + "}\n\n" + _itemize(_as_list(p.get("bullets"))) + "\\vspace{2mm}\n"
+
+
+# Fragment cache: every piece of the document is memoized on its content,
+# so re-rendering after a one-bullet edit only escapes the entry that
+# changed. It only pays off when the same values are rendered again (the
+# streamed sections followed by the full document, an editor preview);
+# a one-shot render skips it, since building keys for a document seen
+# once costs more than the escaping it would save.
+_FRAGMENT_RENDERERS = {
+    "header": _header_latex,
+    "headline": _headline_latex,
+    "summary": _summary_latex,
+    "skills": _skills_latex,
+    "experience_entry": _experience_entry_latex,
+    "project_entry": _project_entry_latex,
+}
+
+_STR = {str}
+
+
+def _plain(value):
+    """`value` as a hashable tuple if it is a string, None or a list of strings, else None."""
+    if value is None or type(value) is str:
+        return value
+    if type(value) is list and set(map(type, value)) <= _STR:
+        return tuple(value)
+    return None
+
+
+def _fragment_key(kind: str, value):
+    """Cache key for a fragment.
+
+    Resume values are strings, lists of strings and flat dicts of those;
+    as tuples they hash several times faster than their repr(). Anything
+    else (numbers, nested objects) is keyed on repr(), which keeps e.g.
+    1 and True apart. Dict keys stay in order, which matters for the
+    order of skill groups.
+    """
+    if type(value) is dict:
+        items = []
+        for k, v in value.items():
+            frozen = _plain(v)
+            if frozen is None and v is not None:
+                return kind, repr(value)
+            items.append((k, frozen))
+        return kind, dict, tuple(items)
+    frozen = _plain(value)
+    if frozen is None and value is not None:
+        return kind, repr(value)
+    return kind, type(value), frozen
+
+
+class _FragmentCache:
+    """Bounded LRU of rendered fragments keyed by _fragment_key()."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def render(self, kind: str, value) -> str:
+        key = _fragment_key(kind, value)
+        with self._lock:
+            fragment = self._data.get(key)
+            if fragment is not None:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return fragment
+            self.misses += 1
+
+        fragment = _FRAGMENT_RENDERERS[kind](value)
+        with self._lock:
+            self._data[key] = fragment
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return fragment
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._data),
+            "max_size": self.maxsize,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+def _render(kind: str, value) -> str:
+    return _FRAGMENT_RENDERERS[kind](value)
+
+
+_fragments = _FragmentCache(env_int("LATEX_FRAGMENT_CACHE_SIZE", 4096))
+_fragment = _fragments.render
+
+
+def fragment_cache_stats() -> dict:
+    return _fragments.stats()
+
+
+def clear_fragment_cache():
+    _fragments.clear()
+
+
+def _experience_latex(experience, fragment=_fragment) -> str:
+    if not isinstance(experience, list):
+        experience = []
+    return "\\section*{Experience}\n" + "".join(
+        fragment("experience_entry", x) for x in experience if isinstance(x, dict)
+    )
+
+
+def _projects_latex(projects, fragment=_fragment) -> str:
+    if not isinstance(projects, list):
+        projects = []
+    return "\\section*{Projects}\n" + "".join(
+        fragment("project_entry", p) for p in projects if isinstance(p, dict)
+    )
+
+
+def render_section(section: str, value) -> str:
+    """LaTeX fragment for one top-level resume section ("" if it has none), cached."""
+    if section == "experience":
+        return _experience_latex(value)
+    if section == "projects":
+        return _projects_latex(value)
+    if section in _FRAGMENT_RENDERERS:
+        return _fragment(section, value)
+    return ""
+
+
+def resume_json_to_latex(resume: dict, cached: bool = False) -> str:
+    """The full LaTeX document. Pass cached=True when the same resume (or
+    most of it) is likely to be rendered again, e.g. after render_section."""
+    with stage("latex"):
+        return _document(resume, _fragment if cached else _render)
+
+
+def _document(resume: dict, fragment) -> str:
+    if not isinstance(resume, dict):
+        resume = {}
 
-    latex += r"\end{document}"
-    return latex
+    return "".join((
+        _PREAMBLE,
+        fragment("header", resume.get("header") or {}),
+        fragment("headline", resume.get("headline")),
+        _CENTER_END,
+        fragment("summary", resume.get("summary")),
+        fragment("skills", resume.get("skills") or {}),
+        _experience_latex(resume.get("experience") or [], fragment),
+        _projects_latex(resume.get("projects") or [], fragment),
+        _DOCUMENT_END,
+    ))
@@ -0,0 +1,225 @@
+# backend/services/metrics.py
+"""Process-local metrics rendered in the Prometheus text format.
+
+Counters and histograms are updated inline on the request path (a dict
+update under a lock). State that other services already track (cache
+counters, circuit states, single-flight) is read by collector callbacks
+at scrape time instead of being mirrored here.
+
+Every worker process has its own registry, so scrape each worker (or run
+one worker per pod); values restart from zero when a worker restarts,
+which Prometheus' rate() handles as a counter reset.
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(tuple(str(labels.get(n, "")) for n in self.labelnames), 0)
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [(self.name, _labels(self.labelnames, key), value) for key, value in sorted(items)]
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}  # labels -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float, **labels):
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    state[i] += 1
+            state[-2] += seconds
+            state[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self):
+        with self._lock:
+            items = [(key, list(state)) for key, state in self._values.items()]
+        out = []
+        for key, state in sorted(items):
+            for bound, count in zip(self.buckets + (float("inf"),), state[:len(self.buckets)] + [state[-1]]):
+                out.append((f"{self.name}_bucket", _labels(self.labelnames, key, f'le="{_number(bound)}"'), count))
+            out.append((f"{self.name}_sum", _labels(self.labelnames, key), state[-2]))
+            out.append((f"{self.name}_count", _labels(self.labelnames, key), state[-1]))
+        return out
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def counter(self, name: str, help: str, labelnames=()) -> Counter:
+        metric = Counter(name, help, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help: str, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        metric = Histogram(name, help, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def collector(self, fn):
+        """Register `fn() -> [(name, kind, help, [(labels dict, value), ...]), ...]` for scrape time."""
+        self._collectors.append(fn)
+        return fn
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(f"{name}{labels} {_number(value)}" for name, labels, value in metric.samples())
+
+        for fn in self._collectors:
+            try:
+                families = fn()
+            except Exception:
+                continue  # a broken collector must not take the whole scrape down
+            for name, kind, help, samples in families:
+                lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_labels(labels.keys(), labels.values())} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_request_seconds = registry.histogram(
+    "intersync_http_request_duration_seconds",
+    "Time to response headers per route (streamed bodies continue after this).",
+    ("endpoint", "method", "status"),
+)
+ai_stage_seconds = registry.histogram(
+    "intersync_ai_stage_seconds",
+    "Time spent per AI resume pipeline stage.",
+    ("stage",),
+)
+ai_fallbacks = registry.counter(
+    "intersync_ai_fallbacks_total",
+    "AI resume requests answered with the demo resume after a failure, by error type.",
+    ("reason",),
+)
+ai_sections = registry.counter(
+    "intersync_ai_section_calls_total",
+    "Per-section tailoring calls (GEMINI_SECTION_MODE) by section and outcome (ok, error, timeout).",
+    ("section", "outcome"),
+)
+ai_cache_lookups = registry.counter(
+    "intersync_ai_cache_lookups_total",
+    "Response cache lookups in front of Gemini.",
+    ("result",),
+)
+gemini_request_seconds = registry.histogram(
+    "intersync_gemini_request_seconds",
+    "Gemini network time per attempt.",
+    ("model",),
+)
+gemini_requests = registry.counter(
+    "intersync_gemini_requests_total",
+    "Gemini attempts by model and outcome (ok or the error type).",
+    ("model", "outcome"),
+)
+gemini_tokens = registry.counter(
+    "intersync_gemini_tokens_total",
+    "Tokens reported in Gemini usage metadata.",
+    ("model", "kind"),
+)
+ai_jobs = registry.counter(
+    "intersync_ai_jobs_total",
+    "Background resume job events (submitted, deduplicated, completed, failed, requeued, recovered, callbacks).",
+    ("event",),
+)
+ai_job_wait_seconds = registry.histogram(
+    "intersync_ai_job_wait_seconds",
+    "Time from submit to a worker first picking the job up, per lane.",
+    ("lane",),
+    buckets=(0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 3600.0),
+)
+ai_job_run_seconds = registry.histogram(
+    "intersync_ai_job_run_seconds",
+    "Time a worker spends running one job attempt, per lane.",
+    ("lane",),
+)
+
+_USAGE_FIELDS = {
+    "prompt": "prompt_token_count",
+    "cached": "cached_content_token_count",
+    "output": "candidates_token_count",
+    "thoughts": "thoughts_token_count",
+}
+
+
+def record_usage(model: str, usage):
+    """Add a response's usage_metadata to gemini_tokens."""
+    if usage is None:
+        return
+    for kind, field in _USAGE_FIELDS.items():
+        count = getattr(usage, field, None)
+        if count:
+            gemini_tokens.inc(count, model=model, kind=kind)
+
+
+@contextmanager
+def stage(name: str):
+    """Time a block as one AI pipeline stage."""
+    with ai_stage_seconds.time(stage=name):
+        yield
@@ -0,0 +1,36 @@
+# backend/services/model_catalog.py
+import json
+import os
+from functools import lru_cache
+
+DEFAULT_MODELS_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "models.json"
+)
+
+
+@lru_cache(maxsize=None)
+def load_models(path: str = None) -> dict:
+    """models.json (the ListModels dump) as {name: model info}."""
+    path = path or os.getenv("GEMINI_MODELS_PATH", DEFAULT_MODELS_PATH)
+    try:
+        with open(path, encoding="utf-8-sig") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return {m["name"]: m for m in data.get("models", []) if "name" in m}
+
+
+def get_model_info(name: str) -> dict:
+    models = load_models()
+    if name in models:
+        return models[name]
+    # Accept names with or without the "models/" prefix
+    return models.get(name if name.startswith("models/") else f"models/{name}", {})
+
+
+def input_token_limit(name: str, default: int = 32768) -> int:
+    return int(get_model_info(name).get("inputTokenLimit") or default)
+
+
+def supports(name: str, method: str = "generateContent") -> bool:
+    return method in get_model_info(name).get("supportedGenerationMethods", [])
@@ -0,0 +1,323 @@
+# backend/services/model_router.py
+"""Per-request Gemini model selection with a fallback chain.
+
+The chain (GEMINI_MODEL_CHAIN, default: GEMINI_MODEL, then the cheaper
+flash models) is filtered against models.json: a model must support
+generateContent, take the prompt within its inputTokenLimit and allow
+GEMINI_EXPECTED_OUTPUT_TOKENS of output. Given a latency SLO, models
+whose observed p95 is within it are tried first; models with an open
+circuit go last.
+
+A call that fails or times out moves on to the next model until the
+chain or the overall deadline (GEMINI_ROUTER_DEADLINE_SECONDS) runs out,
+so only a chain-wide failure drops the caller to the demo resume. With
+GEMINI_HEDGE_ENABLED, a call still running after the model's p95 (or the
+SLO, if sooner) gets a second request to the next model in the chain and
+the first answer wins.
+"""
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeout
+
+from backend.services.gemini_client import GeminiUnavailableError
+from backend.services.model_catalog import get_model_info, input_token_limit, supports
+from backend.services.prompt_compaction import estimate_tokens
+from backend.utils import env_bool, env_float, env_int
+
+DEFAULT_FALLBACKS = ["models/gemini-2.5-flash-lite", "models/gemini-2.0-flash"]
+
+# Quantiles from fewer samples than this are noise.
+MIN_SAMPLES = 10
+
+
+class LatencyStats:
+    """Sliding window of successful call latencies for one model."""
+
+    def __init__(self, window: int = 200):
+        self._samples = deque(maxlen=window)
+        self.successes = 0
+        self.failures = 0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float, ok: bool):
+        with self._lock:
+            if ok:
+                self.successes += 1
+                self._samples.append(seconds)
+            else:
+                self.failures += 1
+
+    def quantile(self, q: float):
+        """Latency at quantile `q` in seconds, or None until MIN_SAMPLES calls succeeded."""
+        with self._lock:
+            samples = sorted(self._samples)
+        if len(samples) < MIN_SAMPLES:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+    def snapshot(self) -> dict:
+        p50, p95 = self.quantile(0.5), self.quantile(0.95)
+        return {
+            "successes": self.successes,
+            "failures": self.failures,
+            "samples": len(self._samples),
+            "p50_ms": None if p50 is None else round(p50 * 1000),
+            "p95_ms": None if p95 is None else round(p95 * 1000),
+        }
+
+
+_hedge_pool = None
+_hedge_pool_lock = threading.Lock()
+
+
+def _pool() -> ThreadPoolExecutor:
+    global _hedge_pool
+    if _hedge_pool is None:
+        with _hedge_pool_lock:
+            if _hedge_pool is None:
+                _hedge_pool = ThreadPoolExecutor(
+                    max_workers=env_int("GEMINI_HEDGE_WORKERS", 16), thread_name_prefix="gemini-hedge"
+                )
+    return _hedge_pool
+
+
+class ModelRouter:
+    """Routes generate calls for a GeminiClient across a chain of models."""
+
+    def __init__(self, client, chain, deadline: float = 45.0, expected_output_tokens: int = 4096,
+                 hedge: bool = False, hedge_min_delay: float = 1.0, hedge_quantile: float = 0.95,
+                 window: int = 200):
+        self.client = client
+        self.chain = [m for m in dict.fromkeys(chain) if m]
+        self.deadline = deadline
+        self.expected_output_tokens = expected_output_tokens
+        self.hedge = hedge
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_quantile = hedge_quantile
+        self.latency = {m: LatencyStats(window) for m in self.chain}
+        self.fallbacks = 0
+        self.hedges_sent = 0
+        self.hedges_won = 0
+        self._lock = threading.Lock()
+
+    def _fits(self, model: str, prompt_tokens: int) -> bool:
+        info = get_model_info(model)
+        if not info:
+            # Not in models.json (newer than the dump); let the API decide
+            return True
+        return (
+            supports(model, "generateContent")
+            and input_token_limit(model) >= prompt_tokens
+            and int(info.get("outputTokenLimit") or 0) >= self.expected_output_tokens
+        )
+
+    def candidates(self, prompt_tokens: int = 0, slo: float = None) -> list:
+        """Models to try for a prompt of `prompt_tokens`, best first."""
+        def rank(item):
+            position, model = item
+            circuit_open = self.client.breaker_for(model).state == "open"
+            p95 = self.latency[model].quantile(0.95)
+            too_slow = slo is not None and p95 is not None and p95 > slo
+            return circuit_open, too_slow, position
+
+        fitting = [(i, m) for i, m in enumerate(self.chain) if self._fits(m, prompt_tokens)]
+        return [m for _, m in sorted(fitting, key=rank)]
+
+    def _count(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def count_fallback(self):
+        """Count a move to the next model of the chain made outside generate()."""
+        self._count("fallbacks")
+
+    def record(self, model: str, seconds: float, ok: bool):
+        stats = self.latency.get(model)
+        if stats is not None:
+            stats.record(seconds, ok)
+
+    def _hedge_delay(self, model: str, slo: float = None):
+        if not self.hedge:
+            return None
+        p = self.latency[model].quantile(self.hedge_quantile)
+        if p is None:
+            return None
+        if slo is not None:
+            p = min(p, slo)
+        return max(self.hedge_min_delay, p)
+
+    def _call(self, model: str, contents, deadline: float, config=None):
+        started = time.monotonic()
+        timeout = min(self.client.timeout, deadline - started)
+        if timeout <= 0:
+            raise TimeoutError("Gemini deadline exceeded")
+        try:
+            resp = self.client.generate(contents, model=model, timeout=timeout, config=config)
+        except Exception:
+            self.record(model, time.monotonic() - started, False)
+            raise
+        self.record(model, time.monotonic() - started, True)
+        return resp
+
+    def _hedged(self, contents, primary: str, rest: list, delay: float, deadline: float, config):
+        """Call `primary`; after `delay` also call the next model of `rest` (popped from it)."""
+        first = _pool().submit(self._call, primary, contents, deadline, config)
+        try:
+            return first.result(timeout=delay), primary
+        except FutureTimeout:
+            pass
+
+        secondary = rest.pop(0) if rest else primary
+        self._count("hedges_sent")
+        second = _pool().submit(self._call, secondary, contents, deadline, config)
+        pending = {first: primary, second: secondary}
+        error = None
+        while pending:
+            done, _ = wait(pending, timeout=max(0.0, deadline - time.monotonic()),
+                           return_when=FIRST_COMPLETED)
+            if not done:
+                raise TimeoutError("Gemini deadline exceeded")
+            for future in done:
+                model = pending.pop(future)
+                if future.exception() is None:
+                    # The slower request keeps running in the pool; its
+                    # result is dropped but its latency still counts.
+                    if future is second:
+                        self._count("hedges_won")
+                    return future.result(), model
+                error = error or future.exception()
+        raise error
+
+    def _plan(self, contents, prompt_tokens, slo):
+        if prompt_tokens is None:
+            prompt_tokens = estimate_tokens(contents) if isinstance(contents, str) else 0
+        models = self.candidates(prompt_tokens, slo)
+        if not models:
+            raise GeminiUnavailableError(f"No configured Gemini model accepts a {prompt_tokens}-token prompt")
+        return models
+
+    def _deadline(self, timeout: float = None) -> float:
+        budget = self.deadline if timeout is None else min(self.deadline, timeout)
+        return time.monotonic() + budget
+
+    def generate(self, contents, prompt_tokens: int = None, slo: float = None, config=None, timeout: float = None):
+        """Blocking generate over the chain; returns (response, model used).
+
+        `timeout` caps the overall deadline for a caller with its own budget.
+        """
+        models = self._plan(contents, prompt_tokens, slo)
+        deadline = self._deadline(timeout)
+        last_error = None
+
+        while models and time.monotonic() < deadline:
+            model = models.pop(0)
+            if last_error is not None:
+                self._count("fallbacks")
+            delay = self._hedge_delay(model, slo)
+            try:
+                if delay is not None and time.monotonic() + delay < deadline:
+                    return self._hedged(contents, model, models, delay, deadline, config)
+                return self._call(model, contents, deadline, config), model
+            except Exception as e:
+                last_error = e
+
+        raise last_error or TimeoutError("Gemini deadline exceeded")
+
+    async def _acall(self, model: str, contents, deadline: float, config=None):
+        started = time.monotonic()
+        timeout = min(self.client.timeout, deadline - started)
+        if timeout <= 0:
+            raise TimeoutError("Gemini deadline exceeded")
+        try:
+            resp = await self.client.agenerate(contents, model=model, timeout=timeout, config=config)
+        except Exception:
+            self.record(model, time.monotonic() - started, False)
+            raise
+        self.record(model, time.monotonic() - started, True)
+        return resp
+
+    async def _ahedged(self, contents, primary: str, rest: list, delay: float, deadline: float, config):
+        import asyncio
+
+        first = asyncio.ensure_future(self._acall(primary, contents, deadline, config))
+        done, _ = await asyncio.wait({first}, timeout=delay)
+        if done:
+            return first.result(), primary
+
+        secondary = rest.pop(0) if rest else primary
+        self._count("hedges_sent")
+        second = asyncio.ensure_future(self._acall(secondary, contents, deadline, config))
+        pending = {first: primary, second: secondary}
+        error = None
+        try:
+            while pending:
+                done, _ = await asyncio.wait(pending, timeout=max(0.0, deadline - time.monotonic()),
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    raise TimeoutError("Gemini deadline exceeded")
+                for task in done:
+                    model = pending.pop(task)
+                    if task.exception() is None:
+                        if task is second:
+                            self._count("hedges_won")
+                        return task.result(), model
+                    error = error or task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def agenerate(self, contents, prompt_tokens: int = None, slo: float = None, config=None,
+                        timeout: float = None):
+        """asyncio counterpart of generate(); the losing hedge is cancelled."""
+        models = self._plan(contents, prompt_tokens, slo)
+        deadline = self._deadline(timeout)
+        last_error = None
+
+        while models and time.monotonic() < deadline:
+            model = models.pop(0)
+            if last_error is not None:
+                self._count("fallbacks")
+            delay = self._hedge_delay(model, slo)
+            try:
+                if delay is not None and time.monotonic() + delay < deadline:
+                    return await self._ahedged(contents, model, models, delay, deadline, config)
+                return await self._acall(model, contents, deadline, config), model
+            except Exception as e:
+                last_error = e
+
+        raise last_error or TimeoutError("Gemini deadline exceeded")
+
+    def _counters(self) -> dict:
+        with self._lock:
+            return {"fallbacks": self.fallbacks, "hedges_sent": self.hedges_sent, "hedges_won": self.hedges_won}
+
+    def stats(self) -> dict:
+        return {
+            "chain": self.chain,
+            "hedging": self.hedge,
+            **self._counters(),
+            "models": {m: s.snapshot() for m, s in self.latency.items()},
+        }
+
+
+def model_chain(primary: str) -> list:
+    """GEMINI_MODEL_CHAIN (comma separated) or the primary model plus DEFAULT_FALLBACKS."""
+    raw = os.getenv("GEMINI_MODEL_CHAIN", "")
+    chain = [m.strip() for m in raw.split(",") if m.strip()]
+    return chain or [primary] + DEFAULT_FALLBACKS
+
+
+def router_from_env(client) -> ModelRouter:
+    return ModelRouter(
+        client,
+        model_chain(client.model),
+        deadline=env_float("GEMINI_ROUTER_DEADLINE_SECONDS", 45.0),
+        expected_output_tokens=env_int("GEMINI_EXPECTED_OUTPUT_TOKENS", 4096),
+        hedge=env_bool("GEMINI_HEDGE_ENABLED", False),
+        hedge_min_delay=env_float("GEMINI_HEDGE_MIN_SECONDS", 1.0),
+        hedge_quantile=env_float("GEMINI_HEDGE_QUANTILE", 0.95),
+    )
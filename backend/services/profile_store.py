@@ -0,0 +1,344 @@
+# backend/services/profile_store.py
+"""Versioned candidate profiles, so clients stop re-uploading them.
+
+A profile is stored once (POST /api/profiles) and updated with a full
+replacement or a JSON Patch delta; every change that alters it becomes a
+new immutable version. Tailoring requests then send
+"candidate_ref": "<candidate_id>@<version>" (or just the ID for the
+latest version) instead of the whole candidate.
+
+Profiles are normalized before they are stored: whitespace collapsed,
+empty values dropped, duplicate skills and links removed. Equal profiles
+therefore hash (and serialize) identically, and since a version never
+changes, the payload fingerprint downstream is stable too, which is what
+the response cache and single flight key on.
+
+Tailoring reads a view of a version ranked for one job: projects,
+experience and skills ordered by their overlap with the job description.
+Views are kept in an in-process LRU keyed by (candidate_id, version,
+job); a pinned reference is then served without touching SQLite.
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from backend.services.json_patch import apply_patch
+from backend.services.prompt_compaction import content_words, relevance, strip_boilerplate
+from backend.services.response_cache import canonical_json
+from backend.utils import env_int
+
+_REF_RE = re.compile(r"^([A-Za-z0-9_-]{1,64})(?:@([1-9][0-9]{0,8}))?$")
+_DEDUPED = ("skills", "links")
+_RANKED = ("projects", "experience", "skills")
+
+
+class UnknownProfile(LookupError):
+    pass
+
+
+class VersionConflict(Exception):
+    """If-Match named a version that is no longer the latest."""
+
+    def __init__(self, latest: dict):
+        super().__init__(f"profile changed; latest version is {latest['version']}")
+        self.latest = latest
+
+
+def parse_ref(ref: str):
+    """(candidate_id, version or None) from "id" or "id@version"; raises UnknownProfile."""
+    match = _REF_RE.match(ref.strip()) if isinstance(ref, str) else None
+    if match is None:
+        raise UnknownProfile(f"bad candidate reference {ref!r}")
+    return match.group(1), int(match.group(2)) if match.group(2) else None
+
+
+def _clean(value):
+    if isinstance(value, str):
+        return " ".join(value.split())
+    if isinstance(value, dict):
+        cleaned = {str(k).strip(): _clean(v) for k, v in value.items()}
+        return {k: v for k, v in cleaned.items() if k and v not in (None, "", [], {})}
+    if isinstance(value, list):
+        return [v for v in map(_clean, value) if v not in (None, "", [], {})]
+    return value
+
+
+def normalize_profile(profile) -> dict:
+    """Canonical form of a candidate profile; raises ValueError if it is not one."""
+    if not isinstance(profile, dict):
+        raise ValueError("profile must be a JSON object")
+    profile = _clean(profile)
+    if not profile:
+        raise ValueError("profile is empty")
+    for key in _DEDUPED:
+        if isinstance(profile.get(key), list):
+            seen = set()
+            unique = []
+            for item in profile[key]:
+                marker = item.lower() if isinstance(item, str) else canonical_json(item)
+                if marker not in seen:
+                    seen.add(marker)
+                    unique.append(item)
+            profile[key] = unique
+    return profile
+
+
+def profile_hash(profile: dict) -> str:
+    return hashlib.sha256(canonical_json(profile).encode("utf-8")).hexdigest()
+
+
+def ranked_view(profile: dict, target_role: str, job_description: str) -> dict:
+    """`profile` with projects, experience and skills most relevant to the job first.
+
+    The sort is stable, so entries that tie keep the candidate's order.
+    """
+    jd_words = content_words(strip_boilerplate(job_description) + " " + target_role)
+    view = dict(profile)
+    for key in _RANKED:
+        if isinstance(view.get(key), list):
+            view[key] = sorted(view[key], key=lambda entry: -relevance(entry, jd_words))
+    return view
+
+
+def _iso(ts):
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat() if ts else None
+
+
+class ProfileStore:
+    def __init__(self, path: str, max_versions: int = 50, max_bytes: int = 256 * 1024,
+                 view_entries: int = 1024):
+        self.path = path
+        self.max_versions = max(1, max_versions)
+        self.max_bytes = max_bytes
+        self.view_entries = view_entries
+
+        self._views = OrderedDict()  # (candidate_id, version, job digest) -> (json_text, record)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._counters = {"view_hits": 0, "view_misses": 0, "versions_created": 0, "unchanged_writes": 0}
+
+    # -- storage -----------------------------------------------------------
+
+    def _conn(self) -> sqlite3.Connection:
+        # Same per-thread, per-pid connection rule as the response cache
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = sqlite3.connect(self.path, timeout=10.0, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS profiles ("
+            " candidate_id TEXT NOT NULL,"
+            " version INTEGER NOT NULL,"
+            " body TEXT NOT NULL,"
+            " hash TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " PRIMARY KEY (candidate_id, version))"
+        )
+
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def _transaction(self, fn):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            value = fn(conn)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return value
+
+    def _count(self, name: str, amount: int = 1):
+        with self._lock:
+            self._counters[name] += amount
+
+    @staticmethod
+    def _record(row, with_profile: bool = False) -> dict:
+        record = {
+            "candidate_id": row["candidate_id"],
+            "version": row["version"],
+            "ref": f"{row['candidate_id']}@{row['version']}",
+            "hash": row["hash"],
+            "size": row["size"],
+            "created_at": _iso(row["created_at"]),
+        }
+        if with_profile:
+            record["profile"] = json.loads(row["body"])
+        return record
+
+    @staticmethod
+    def _latest(conn, candidate_id: str):
+        return conn.execute(
+            "SELECT * FROM profiles WHERE candidate_id = ? ORDER BY version DESC LIMIT 1", (candidate_id,)
+        ).fetchone()
+
+    def _row(self, candidate_id: str, version: int = None):
+        if version is None:
+            return self._latest(self._conn(), candidate_id)
+        return self._conn().execute(
+            "SELECT * FROM profiles WHERE candidate_id = ? AND version = ?", (candidate_id, version)
+        ).fetchone()
+
+    def _write(self, candidate_id: str, update, expected_hash: str = None):
+        """Store update(latest profile or None) as the next version.
+
+        Returns (record, created); an update that leaves the profile as it
+        was creates no version. Raises VersionConflict when expected_hash
+        is given and is not the latest version's hash.
+        """
+        def write_locked(conn):
+            latest = self._latest(conn, candidate_id)
+            if expected_hash is not None and (latest is None or latest["hash"] != expected_hash):
+                if latest is None:
+                    raise UnknownProfile(candidate_id)
+                raise VersionConflict(self._record(latest))
+
+            profile = normalize_profile(update(json.loads(latest["body"]) if latest is not None else None))
+            body = canonical_json(profile)
+            if len(body.encode("utf-8")) > self.max_bytes:
+                raise ValueError(f"profile is larger than {self.max_bytes} bytes")
+            digest = profile_hash(profile)
+            if latest is not None and latest["hash"] == digest:
+                return self._record(latest), False
+
+            version = latest["version"] + 1 if latest is not None else 1
+            conn.execute(
+                "INSERT INTO profiles (candidate_id, version, body, hash, size, created_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (candidate_id, version, body, digest, len(body), time.time()),
+            )
+            conn.execute(
+                "DELETE FROM profiles WHERE candidate_id = ? AND version <= ?",
+                (candidate_id, version - self.max_versions),
+            )
+            return self._record(self._latest(conn, candidate_id)), True
+
+        record, created = self._transaction(write_locked)
+        self._count("versions_created" if created else "unchanged_writes")
+        return record, created
+
+    # -- public API --------------------------------------------------------
+
+    def create(self, profile: dict) -> dict:
+        """Store a new profile as version 1 of a new candidate_id."""
+        record, _ = self._write(uuid.uuid4().hex, lambda _: profile)
+        return record
+
+    def replace(self, candidate_id: str, profile: dict, expected_hash: str = None):
+        """(record, created) after replacing the whole profile."""
+        def update(latest):
+            if latest is None:
+                raise UnknownProfile(candidate_id)
+            return profile
+
+        return self._write(candidate_id, update, expected_hash)
+
+    def patch(self, candidate_id: str, operations: list, expected_hash: str = None):
+        """(record, created) after applying a JSON Patch to the latest version.
+
+        Raises InvalidPatch (a ValueError) if any operation fails.
+        """
+        def update(latest):
+            if latest is None:
+                raise UnknownProfile(candidate_id)
+            return apply_patch(latest, operations)
+
+        return self._write(candidate_id, update, expected_hash)
+
+    def get(self, ref: str):
+        """Record of `ref` including its profile, or None if unknown (or pruned)."""
+        candidate_id, version = parse_ref(ref)
+        row = self._row(candidate_id, version)
+        return self._record(row, with_profile=True) if row is not None else None
+
+    def versions(self, candidate_id: str) -> list:
+        rows = self._conn().execute(
+            "SELECT candidate_id, version, hash, size, created_at FROM profiles"
+            " WHERE candidate_id = ? ORDER BY version",
+            (candidate_id,),
+        ).fetchall()
+        return [self._record(row) for row in rows]
+
+    def view(self, ref: str, target_role: str, job_description: str):
+        """(ranked profile, record without the profile) for a reference; raises UnknownProfile."""
+        candidate_id, version = parse_ref(ref)
+        row = None
+        if version is None:
+            # Unpinned: the latest version has to be looked up every time
+            row = self._row(candidate_id)
+            if row is None:
+                raise UnknownProfile(f"unknown candidate {candidate_id}")
+            version = row["version"]
+
+        job = hashlib.sha256(canonical_json([target_role, job_description]).encode("utf-8")).hexdigest()
+        key = (candidate_id, version, job)
+        with self._lock:
+            cached = self._views.get(key)
+            if cached is not None:
+                self._views.move_to_end(key)
+                self._counters["view_hits"] += 1
+        if cached is not None:
+            return json.loads(cached[0]), dict(cached[1])
+
+        if row is None:
+            row = self._row(candidate_id, version)
+            if row is None:
+                raise UnknownProfile(f"unknown candidate version {candidate_id}@{version}")
+        record = self._record(row)
+        text = canonical_json(ranked_view(json.loads(row["body"]), target_role, job_description))
+        with self._lock:
+            self._counters["view_misses"] += 1
+            self._views[key] = (text, record)
+            while len(self._views) > self.view_entries:
+                self._views.popitem(last=False)
+        return json.loads(text), dict(record)
+
+    def stats(self) -> dict:
+        with self._lock:
+            local = dict(self._counters)
+            views = len(self._views)
+
+        candidates, versions, size = 0, 0, 0
+        try:
+            candidates, versions, size = self._conn().execute(
+                "SELECT COUNT(DISTINCT candidate_id), COUNT(*), COALESCE(SUM(size), 0) FROM profiles"
+            ).fetchone()
+        except sqlite3.Error:
+            pass
+        lookups = local["view_hits"] + local["view_misses"]
+        return {
+            "path": self.path,
+            "candidates": candidates,
+            "versions": versions,
+            "bytes": size,
+            "view_entries": views,
+            "process": {**local, "view_hit_rate": round(local["view_hits"] / lookups, 4) if lookups else 0.0},
+        }
+
+
+profile_store = ProfileStore(
+    path=os.getenv("PROFILE_STORE_PATH")
+    or os.path.join(tempfile.gettempdir(), "intersync_profiles.sqlite3"),
+    max_versions=env_int("PROFILE_MAX_VERSIONS", 50),
+    max_bytes=env_int("PROFILE_MAX_BYTES", 256 * 1024),
+    view_entries=env_int("PROFILE_VIEW_CACHE_ENTRIES", 1024),
+)
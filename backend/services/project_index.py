@@ -0,0 +1,142 @@
+# backend/services/project_index.py
+import heapq
+import re
+import threading
+from collections import defaultdict
+
+from backend.data.catalog import get_catalog
+from backend.utils import env_bool
+
+# Same weights as resume_utils.calculate_project_relevance
+BASE_SCORE = 50
+INTEREST_BONUS = 45
+LANGUAGE_BONUS = 10
+MAX_SCORE = 100
+
+_TOKEN_RE = re.compile(r"[a-z0-9+#.]+")
+
+
+def tokenize(text) -> list:
+    return _TOKEN_RE.findall(str(text or "").lower())
+
+
+class ProjectIndex:
+    """Inverted index over the project catalog.
+
+    Interest tokens map to template IDs through the template's category key,
+    languages map through the template's ``languages``. A query only visits
+    the posting lists its tokens hit, scores those candidates with the
+    calculate_project_relevance weights and picks the top k with a heap;
+    templates nothing matched all share the base score and are taken in
+    catalog order, only as many as the page needs.
+
+    With PROJECT_SEMANTIC_MATCHING on (the default), interests that are not
+    a category key still earn a share of the interest bonus through
+    services.semantic_match, so "guitar" reaches the music template.
+    """
+
+    def __init__(self, catalog):
+        self.templates = catalog
+        self.version = catalog.version
+        self.ids = []
+
+        self.by_category = defaultdict(list)
+        self.by_language = defaultdict(list)
+        self.by_difficulty = defaultdict(list)
+
+        # index_rows() avoids decoding full templates on lazy backends
+        for pid, languages, difficulty in catalog.index_rows():
+            self.ids.append(pid)
+            for token in set(tokenize(pid)):
+                self.by_category[token].append(pid)
+            for lang in {l.lower() for l in languages}:
+                self.by_language[lang].append(pid)
+            if difficulty:
+                self.by_difficulty[difficulty.lower()].append(pid)
+
+        self.position = {pid: i for i, pid in enumerate(self.ids)}
+
+    def _facet_pool(self, difficulty: str = None, language: str = None):
+        """IDs allowed by the facet filters, in catalog order (None = no filter)."""
+        pools = []
+        if difficulty:
+            pools.append(self.by_difficulty.get(difficulty.lower(), []))
+        if language:
+            pools.append(self.by_language.get(language.lower(), []))
+        if not pools:
+            return None
+
+        pools.sort(key=len)
+        pool = pools[0]
+        for other in pools[1:]:
+            allowed = set(other)
+            pool = [pid for pid in pool if pid in allowed]
+        return pool
+
+    def score_candidates(self, interests, skills) -> dict:
+        """Score every template that matches at least one interest or skill."""
+        interest_tokens = {t for i in interests or [] for t in tokenize(i)}
+        skill_terms = set()
+        for s in skills or []:
+            s = str(s).lower().strip()
+            if s:
+                skill_terms.add(s)
+                skill_terms.update(tokenize(s))
+
+        scores = {}
+        if interests and env_bool("PROJECT_SEMANTIC_MATCHING", True):
+            from backend.services.semantic_match import get_semantic_index
+
+            for pid, bonus in get_semantic_index().interest_bonuses(interests).items():
+                if pid in self.position:
+                    scores[pid] = BASE_SCORE + round(bonus, 1)
+        for token in interest_tokens:
+            for pid in self.by_category.get(token, ()):
+                scores[pid] = BASE_SCORE + INTEREST_BONUS
+        for term in skill_terms:
+            for pid in self.by_language.get(term, ()):
+                scores[pid] = scores.get(pid, BASE_SCORE) + LANGUAGE_BONUS
+        return scores
+
+    def search(self, interests, skills, difficulty: str = None, language: str = None,
+               limit: int = 3, offset: int = 0):
+        """Return (page of (id, relevance) pairs, total matching the filters)."""
+        pool = self._facet_pool(difficulty, language)
+        scores = self.score_candidates(interests, skills)
+        if pool is not None:
+            allowed = set(pool)
+            scores = {pid: s for pid, s in scores.items() if pid in allowed}
+
+        want = offset + limit
+        position = self.position
+        ranked = heapq.nsmallest(
+            want, scores.items(), key=lambda item: (-min(item[1], MAX_SCORE), position[item[0]])
+        )
+        ranked = [(pid, min(score, MAX_SCORE)) for pid, score in ranked]
+
+        if len(ranked) < want:
+            for pid in (self.ids if pool is None else pool):
+                if pid not in scores:
+                    ranked.append((pid, BASE_SCORE))
+                    if len(ranked) >= want:
+                        break
+
+        total = len(self.ids) if pool is None else len(pool)
+        return ranked[offset:want], total
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_project_index() -> ProjectIndex:
+    """Index for the current catalog snapshot, rebuilt when its version changes."""
+    global _index
+    catalog = get_catalog()
+    index = _index
+    if index is None or index.version != catalog.version:
+        with _index_lock:
+            if _index is None or _index.version != catalog.version:
+                _index = ProjectIndex(catalog)
+            index = _index
+    return index
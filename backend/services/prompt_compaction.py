@@ -0,0 +1,164 @@
+# backend/services/prompt_compaction.py
+import copy
+import json
+import re
+
+from backend.services.model_catalog import input_token_limit
+from backend.utils import env_float, env_int
+
+# Gemini averages roughly four characters of English per token; close enough
+# for budgeting without a countTokens round trip.
+CHARS_PER_TOKEN = 4
+
+# Headings of job-description sections that never help tailoring.
+_BOILERPLATE_HEADING = re.compile(
+    r"^\W*(benefits|perks|what we offer|compensation( and benefits)?|salary|pay range|"
+    r"about (us|the company)|who we are|our (culture|values|mission)|equal (employment )?opportunity|"
+    r"eeo|diversity( and inclusion)?|accommodations?|privacy|legal|disclaimer)\b[^\n]{0,40}$",
+    re.IGNORECASE,
+)
+# Paragraphs that are boilerplate wherever they appear.
+_BOILERPLATE_PARAGRAPH = re.compile(
+    r"equal opportunity employer|without regard to (race|sex|age)|e-verify|reasonable accommodation|"
+    r"protected veteran|applicants? (with|who have) disabilities|401\(?k\)?|paid time off|"
+    r"dental|parental leave",
+    re.IGNORECASE,
+)
+
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or our that the to was were "
+    "will with you your we this they their who what which can able etc using used use work".split()
+)
+_WORD_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+
+
+def compact_json(value) -> str:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _is_heading(line: str) -> bool:
+    line = line.strip()
+    return bool(line) and len(line) <= 60 and (
+        line.endswith(":") or line.startswith("#") or (line.isupper() and len(line) > 3)
+    )
+
+
+def strip_boilerplate(job_description: str) -> str:
+    """Drop benefits, EEO, about-us and similar sections from a job description."""
+    kept = []
+    skipping = False
+    for block in re.split(r"\n\s*\n", job_description or ""):
+        lines = block.strip().splitlines()
+        if not lines:
+            continue
+        if _is_heading(lines[0]):
+            skipping = bool(_BOILERPLATE_HEADING.match(lines[0].strip().strip("#:").strip()))
+            if skipping:
+                continue
+        elif skipping:
+            # Body paragraphs of a dropped section run until the next heading
+            continue
+        body = [l for l in lines if not _BOILERPLATE_PARAGRAPH.search(l)]
+        if body:
+            kept.append("\n".join(body))
+    return "\n\n".join(kept)
+
+
+def content_words(text: str) -> set:
+    return {w for w in _WORD_RE.findall(text.lower()) if w not in _STOPWORDS and len(w) > 1}
+
+
+def _strings(value, parts: list) -> list:
+    """String values in `value`, depth first. Keys are left out: every entry
+    has the same ones ("name", "bullets", ...), so they match any job
+    description that mentions them."""
+    if isinstance(value, str):
+        parts.append(value)
+    elif isinstance(value, dict):
+        for v in value.values():
+            _strings(v, parts)
+    elif isinstance(value, list):
+        for v in value:
+            _strings(v, parts)
+    return parts
+
+
+def relevance(entry, jd_words: set) -> int:
+    """Content words the entry's values share with the job description."""
+    return len(content_words("\n".join(_strings(entry, []))) & jd_words)
+
+
+def _trim_entries(entries, jd_words: set, keep_at_least: int):
+    """Entries sharing no content word with the job description are dropped,
+    keeping the `keep_at_least` most relevant ones regardless; order is kept."""
+    if not isinstance(entries, list):
+        return entries, 0
+    scored = [(relevance(e, jd_words), i) for i, e in enumerate(entries)]
+    floor = {i for _, i in sorted(scored, key=lambda s: (-s[0], s[1]))[:keep_at_least]}
+    kept = [e for (score, i), e in zip(scored, entries) if score > 0 or i in floor]
+    return kept, len(entries) - len(kept)
+
+
+def token_budget(model: str) -> int:
+    """Prompt budget: PROMPT_TOKEN_BUDGET if set, else a share of inputTokenLimit."""
+    limit = int(input_token_limit(model) * env_float("PROMPT_BUDGET_FRACTION", 0.5))
+    explicit = env_int("PROMPT_TOKEN_BUDGET", 0)
+    return min(limit, explicit) if explicit > 0 else limit
+
+
+def compact_payload(payload: dict, model: str, budget: int = None):
+    """Shrink a build_gemini_payload payload; returns (payload, report).
+
+    Boilerplate is stripped from the job description, candidate projects and
+    experience with no overlap with it are trimmed, and if the compact JSON is
+    still over budget the least relevant entries and then the tail of the job
+    description are cut until it fits.
+    """
+    budget = budget or token_budget(model)
+    before = estimate_tokens(json.dumps(payload))
+    keep_at_least = env_int("PROMPT_MIN_ENTRIES", 2)
+
+    out = copy.copy(payload)
+    out["job_description"] = strip_boilerplate(payload.get("job_description", ""))
+    jd_words = content_words(out["job_description"] + " " + str(payload.get("target_role", "")))
+
+    candidate = dict(payload.get("candidate") or {})
+    dropped = {}
+    for section in ("projects", "experience"):
+        if section in candidate:
+            candidate[section], n = _trim_entries(candidate[section], jd_words, keep_at_least)
+            if n:
+                dropped[section] = n
+    out["candidate"] = candidate
+
+    after = estimate_tokens(compact_json(out))
+    truncated = False
+    if after > budget:
+        # Over budget: drop remaining entries from least relevant up...
+        for section in ("projects", "experience"):
+            entries = candidate.get(section)
+            while isinstance(entries, list) and len(entries) > 1 and after > budget:
+                worst = min(range(len(entries)), key=lambda i: (relevance(entries[i], jd_words), -i))
+                entries.pop(worst)
+                dropped[section] = dropped.get(section, 0) + 1
+                after = estimate_tokens(compact_json(out))
+        # ...then cut the job description itself.
+        if after > budget:
+            overflow_chars = (after - budget) * CHARS_PER_TOKEN
+            out["job_description"] = out["job_description"][:max(0, len(out["job_description"]) - overflow_chars)]
+            truncated = True
+            after = estimate_tokens(compact_json(out))
+
+    report = {
+        "tokens_before": before,
+        "tokens_after": after,
+        "tokens_saved": before - after,
+        "budget": budget,
+        "dropped_entries": dropped,
+        "job_description_truncated": truncated,
+    }
+    return out, report
@@ -0,0 +1,273 @@
+# backend/services/response_cache.py
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+from backend.utils import env_float, env_int
+
+
+def canonical_json(value) -> str:
+    """Stable JSON encoding: sorted keys, no whitespace, unicode kept as-is."""
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+def payload_fingerprint(payload: dict, model: str) -> str:
+    """Content hash of a Gemini payload; the model name is part of the key."""
+    canonical = canonical_json({"model": model, "payload": payload})
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Two-level cache for tailored resumes.
+
+    An in-process LRU sits in front of a SQLite file. SQLite (WAL mode) is
+    what makes the cache shared between gunicorn workers on one host: every
+    worker opens the same file, so a response generated by one worker is a
+    hit for all the others. Entries expire after ``ttl_seconds`` and the
+    store is trimmed (least recently accessed first) once it grows past
+    ``max_entries`` rows or ``max_bytes`` of stored JSON.
+
+    Neither bookkeeping job touches SQLite on every call. Hit/miss counters
+    are kept in memory and added to the shared table every
+    ``flush_seconds``. The store's size is tracked incrementally from
+    this process's writes, and recounted every EVICT_CHECK_EVERY sets to
+    pick up the other workers' writes, or when the estimate crosses a
+    limit.
+    """
+
+    EVICT_CHECK_EVERY = 256
+
+    def __init__(self, path: str, ttl_seconds: int = 86400, max_entries: int = 5000,
+                 max_bytes: int = 64 * 1024 * 1024, memory_entries: int = 256, flush_seconds: float = 5.0):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.memory_entries = memory_entries
+        self.flush_seconds = flush_seconds
+
+        self._memory = OrderedDict()  # key -> (expires_at, json_text)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "sets": 0, "evictions": 0}
+        self._pending = {}  # counter increments not yet in the shared table
+        self._flushed_at = time.monotonic()
+        self._disk_size = None  # (rows, bytes) estimate; None until first counted
+        self._sets_since_count = 0
+
+    # -- storage -----------------------------------------------------------
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread and per process: sqlite connections must
+        # not cross a fork, so a pid change forces a reconnect.
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses(accessed_at)")
+        conn.execute("CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def _count(self, name: str, amount: int = 1):
+        with self._lock:
+            self._counters[name] += amount
+            self._pending[name] = self._pending.get(name, 0) + amount
+            due = time.monotonic() - self._flushed_at >= self.flush_seconds
+        if due:
+            self.flush_counters()
+
+    def flush_counters(self):
+        """Add this process's pending counter increments to the shared table."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._flushed_at = time.monotonic()
+        if not pending:
+            return
+        try:
+            self._conn().executemany(
+                "INSERT INTO counters (name, value) VALUES (?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+                list(pending.items()),
+            )
+        except sqlite3.Error:
+            pass
+
+    def _remember(self, key: str, expires_at: float, text: str):
+        with self._lock:
+            self._memory[key] = (expires_at, text)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    # -- public API --------------------------------------------------------
+
+    def get(self, key: str):
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._memory.move_to_end(key)
+                else:
+                    del self._memory[key]
+                    entry = None
+
+        if entry is not None:
+            self._count("memory_hits")
+            return json.loads(entry[1])
+
+        try:
+            conn = self._conn()
+            row = conn.execute(
+                "SELECT value, expires_at FROM responses WHERE key = ? AND expires_at > ?",
+                (key, now),
+            ).fetchone()
+            if row is not None:
+                conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+        except sqlite3.Error:
+            row = None
+
+        if row is None:
+            self._count("misses")
+            return None
+
+        self._remember(key, row[1], row[0])
+        self._count("disk_hits")
+        return json.loads(row[0])
+
+    def set(self, key: str, value: dict):
+        now = time.time()
+        expires_at = now + self.ttl_seconds
+        text = canonical_json(value)
+
+        self._remember(key, expires_at, text)
+        try:
+            conn = self._conn()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, text, len(text), expires_at, now),
+            )
+            self._count("sets")
+            if self._grew(len(text)):
+                self._evict(conn, now)
+        except sqlite3.Error:
+            pass
+
+    def _grew(self, size: int) -> bool:
+        """Add one write to the size estimate; True when it is time to recount and evict."""
+        with self._lock:
+            if self._disk_size is None:
+                return True
+            rows, total = self._disk_size
+            self._disk_size = (rows + 1, total + size)
+            self._sets_since_count += 1
+            return (rows + 1 > self.max_entries or total + size > self.max_bytes
+                    or self._sets_since_count >= self.EVICT_CHECK_EVERY)
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        evicted = conn.execute("DELETE FROM responses WHERE expires_at <= ?", (now,)).rowcount
+
+        count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        if count > self.max_entries or total > self.max_bytes:
+            # Walk from the least recently accessed row and drop rows until
+            # both limits hold again.
+            doomed = []
+            for key, size in conn.execute("SELECT key, size FROM responses ORDER BY accessed_at"):
+                if count <= self.max_entries and total <= self.max_bytes:
+                    break
+                doomed.append((key,))
+                count -= 1
+                total -= size
+            conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+            evicted += len(doomed)
+
+        with self._lock:
+            self._disk_size = (count, total)
+            self._sets_since_count = 0
+
+        if evicted:
+            self._count("evictions", evicted)
+
+    def ping(self) -> bool:
+        """Whether the SQLite file can be opened and queried."""
+        try:
+            self._conn().execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._disk_size = None
+        try:
+            self._conn().execute("DELETE FROM responses")
+        except sqlite3.Error:
+            pass
+
+    def stats(self) -> dict:
+        self.flush_counters()
+        with self._lock:
+            local = dict(self._counters)
+            memory_size = len(self._memory)
+
+        shared, entries, size = {}, 0, 0
+        try:
+            conn = self._conn()
+            shared = dict(conn.execute("SELECT name, value FROM counters").fetchall())
+            entries, size = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        except sqlite3.Error:
+            pass
+
+        def _hit_rate(c):
+            hits = c.get("memory_hits", 0) + c.get("disk_hits", 0)
+            total = hits + c.get("misses", 0)
+            return round(hits / total, 4) if total else 0.0
+
+        return {
+            "path": self.path,
+            "ttl_seconds": self.ttl_seconds,
+            "memory_entries": memory_size,
+            "disk_entries": entries,
+            "disk_bytes": size,
+            "process": {**local, "hit_rate": _hit_rate(local)},
+            "shared": {**shared, "hit_rate": _hit_rate(shared)},
+        }
+
+
+resume_cache = ResponseCache(
+    path=os.getenv("RESUME_CACHE_PATH")
+    or os.path.join(tempfile.gettempdir(), "intersync_resume_cache.sqlite3"),
+    ttl_seconds=env_int("RESUME_CACHE_TTL", 86400),
+    max_entries=env_int("RESUME_CACHE_MAX_ENTRIES", 5000),
+    max_bytes=env_int("RESUME_CACHE_MAX_BYTES", 64 * 1024 * 1024),
+    memory_entries=env_int("RESUME_CACHE_MEMORY_ENTRIES", 256),
+    flush_seconds=env_float("RESUME_CACHE_STATS_FLUSH_SECONDS", 5.0),
+)
@@ -0,0 +1,112 @@
+# backend/services/resume_export.py
+"""Bulk LaTeX export as a zip that is streamed while it is built.
+
+Each entry ({"user_data", "project_ids", optional "filename"}) becomes
+one .tex file, rendered with generate_latex_resume's parts. A project's
+LaTeX block (escaped name and the catalog's precomputed bullets) is
+rendered once per export and shared by every student who picked it.
+
+The zip is written to an unseekable sink, so zipfile emits each member
+with a data descriptor and nothing has to be rewound. After every member
+the compressed bytes are handed to the response and dropped. Manifest
+records wait in a temporary file, so what stays in memory is one
+document plus zipfile's central directory, about 1 KB per file, which
+the zip format needs at the very end. manifest.json comes last and
+lists every entry, including the ones that failed.
+"""
+import hashlib
+import json
+import re
+import tempfile
+import time
+import zipfile
+
+from backend.services.resume_utils import latex_resume_parts, project_latex
+
+MANIFEST_NAME = "manifest.json"
+_UNSAFE_CHARS = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+class _ChunkSink:
+    """Write-only file object whose contents are collected and taken by the caller."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def archive_name(index: int, entry: dict) -> str:
+    """Zip member name: the entry's filename, else its position and the student's name."""
+    user_data = entry.get("user_data") if isinstance(entry.get("user_data"), dict) else {}
+    stem = entry.get("filename") or f"{index + 1:04d}-{user_data.get('name') or 'resume'}"
+    stem = _UNSAFE_CHARS.sub("-", str(stem)).strip("-.")[:80] or f"{index + 1:04d}"
+    return stem if stem.endswith(".tex") else stem + ".tex"
+
+
+def stream_resume_archive(entries: list, templates, compresslevel: int = 6):
+    """Yield the zip archive for `entries` as byte chunks: one per .tex file, then the manifest's."""
+    sink = _ChunkSink()
+    blocks = {}
+    counts = {"files": 0, "errors": 0}
+    generated_at = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+
+    def block(project_id):
+        if project_id not in blocks:
+            blocks[project_id] = project_latex(templates[project_id], templates.bullets(project_id))
+        return blocks[project_id]
+
+    # Manifest records are spooled to disk, one JSON line each, until the end
+    with tempfile.TemporaryFile(mode="w+", encoding="utf-8") as records, \
+            zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED, compresslevel=compresslevel) as archive:
+        for index, entry in enumerate(entries):
+            entry = entry if isinstance(entry, dict) else {}
+            user_data = entry.get("user_data")
+            project_ids = entry.get("project_ids") or []
+            if not isinstance(user_data, dict) or not isinstance(project_ids, list):
+                counts["errors"] += 1
+                records.write(json.dumps({"index": index, "status": "error",
+                                          "error": "user_data must be an object and project_ids a list"}) + "\n")
+                continue
+
+            name = archive_name(index, entry)
+            if name in archive.NameToInfo:
+                name = f"{name[:-4]}-{index + 1}.tex"
+
+            found = [pid for pid in project_ids if isinstance(pid, str) and pid in templates]
+            document = "".join(latex_resume_parts(user_data, [block(pid) for pid in found])).encode("utf-8")
+            archive.writestr(name, document)
+            counts["files"] += 1
+            records.write(json.dumps({
+                "index": index,
+                "status": "ok",
+                "file": name,
+                "name": user_data.get("name", ""),
+                "project_ids": found,
+                "missing_project_ids": [pid for pid in project_ids if pid not in found],
+                "bytes": len(document),
+                "sha256": hashlib.sha256(document).hexdigest(),
+            }) + "\n")
+            yield sink.take()
+
+        head = {"generated_at": generated_at, "catalog_version": getattr(templates, "version", None),
+                "entries": len(entries), **counts}
+        records.seek(0)
+        with archive.open(MANIFEST_NAME, "w") as manifest:
+            manifest.write((json.dumps(head)[:-1] + ', "resumes": [\n').encode("utf-8"))
+            for i, line in enumerate(records):
+                manifest.write(((",\n" if i else "") + line.rstrip("\n")).encode("utf-8"))
+                if i % 256 == 255:
+                    yield sink.take()
+            manifest.write(b"\n]}\n")
+    yield sink.take()
@@ -0,0 +1,231 @@
+# backend/services/resume_pipeline.py
+"""One request pipeline behind every AI resume endpoint.
+
+validate -> AI toggle -> compact payload -> Gemini (cached, coalesced,
+admission-controlled, routed over the model chain) -> demo fallback on
+any failure, including being shed at capacity.
+
+Results carry a fingerprint of what was served; routes turn it into a
+strong ETag per output format. For AI output the fingerprint covers the
+cached response itself, since a regenerated response (after the cache
+entry expires) is different content for the same input. A fallback
+caused by a failure gets no fingerprint, so clients never pin it.
+"""
+import hashlib
+import os
+
+from backend.data.catalog import get_catalog
+from backend.services.admission import AdmissionRejected
+from backend.services.ai_tailor_gemini import (
+    finish_resume, gemini_model, primary_model, tailor_resume_cached, tailor_resume_cached_async
+)
+from backend.services.ats_keywords import apply_ats_keywords
+from backend.services.metrics import ai_fallbacks, stage
+from backend.services.profile_store import profile_store
+from backend.services.prompt_compaction import compact_payload
+from backend.services.response_cache import canonical_json, payload_fingerprint, resume_cache
+from backend.utils import env_bool, env_int
+
+MISSING_FIELDS_ERROR = "Missing target_role, job_description, or candidate"
+FALLBACK_WARNING = "Gemini failed; fallback used."
+SHED_WARNING = "AI is at capacity; fallback used."
+
+
+def build_gemini_payload(target_role: str, job_description: str, candidate: dict) -> dict:
+    return {
+        "instructions": [
+            "You are an expert resume writer, ATS optimizer, and technical recruiter.",
+            "ONLY use the provided candidate data. DO NOT invent companies, roles, degrees, dates, or technologies.",
+            "Tailor the resume to the target role and the job description.",
+            "Extract the most important keywords/skills/tools from the job description and naturally incorporate them where truthful.",
+            "Reorder skills, projects, and bullets by relevance to the job description.",
+            "Rewrite bullets to be impact-focused and action-oriented. Keep each bullet to 1 line when possible.",
+            "If the candidate data includes numbers/metrics, include them. If not, do NOT fabricate metrics.",
+            "If a job requirement is missing from candidate data, do not add it.",
+            "Return STRICT JSON only that exactly matches output_schema. No markdown, no extra text."
+        ],
+        "target_role": target_role,
+        "job_description": job_description,
+        "candidate": candidate,
+        "output_schema": {
+            "header": {"name": "string", "email": "string", "links": ["string"]},
+            "headline": "string",
+            "summary": ["string"],
+            "skills": {"Section Name": ["string"]},
+            "projects": [{"name": "string", "bullets": ["string"]}],
+            "experience": [{"title": "string", "company": "string", "bullets": ["string"]}]
+        }
+    }
+
+
+def build_demo_resume(target_role: str, candidate: dict, job_description: str = "") -> dict:
+    """Deterministic fallback: always works even without GEMINI_API_KEY."""
+    resume_json = {
+        "header": {
+            "name": candidate.get("name", "Candidate Name"),
+            "email": candidate.get("email", ""),
+            "links": candidate.get("links", []) if isinstance(candidate.get("links", []), list) else []
+        },
+        "headline": target_role,
+        "summary": [
+            f"{target_role} candidate with hands-on project experience and strong fundamentals."
+        ],
+        "skills": {
+            "Technical Skills": candidate.get("skills", []) if isinstance(candidate.get("skills", []), list) else []
+        },
+        "projects": candidate.get("projects", []) if isinstance(candidate.get("projects", []), list) else [],
+        "experience": candidate.get("experience", []) if isinstance(candidate.get("experience", []), list) else []
+    }
+    return apply_ats_keywords(resume_json, job_description, candidate)
+
+
+def build_compact_payload(target_role: str, job_description: str, candidate: dict):
+    """build_gemini_payload followed by the token-budget compaction stage.
+
+    Returns (payload, report); report is None when compaction is disabled.
+    """
+    with stage("payload"):
+        payload = build_gemini_payload(target_role, job_description, candidate)
+        if os.getenv("PROMPT_COMPACTION_ENABLED", "true").lower() != "true":
+            return payload, None
+        return compact_payload(payload, gemini_model())
+
+
+def latency_slo(data: dict):
+    """Per-request latency SLO in seconds (latency_slo_ms, else GEMINI_LATENCY_SLO_MS), or None."""
+    try:
+        slo_ms = float(data.get("latency_slo_ms") or env_int("GEMINI_LATENCY_SLO_MS", 0))
+    except (TypeError, ValueError):
+        return None
+    return slo_ms / 1000 if slo_ms > 0 else None
+
+
+def ai_enabled() -> bool:
+    """AI_ENABLED toggle; without GEMINI_API_KEY AI is off so teammates don't crash."""
+    if os.getenv("AI_ENABLED", "true").lower() != "true":
+        return False
+    return bool(os.getenv("GEMINI_API_KEY"))
+
+
+def parse_resume_request(data: dict):
+    """(target_role, job_description, candidate) from a request body, or None if incomplete.
+
+    "candidate_ref" (a profile store reference, "<candidate_id>@<version>")
+    takes the place of "candidate"; the candidate is then the stored
+    profile ranked for this job. An unknown reference raises UnknownProfile.
+    """
+    target_role = (data.get("target_role") or "").strip()
+    job_description = (data.get("job_description") or "").strip()
+    candidate = data.get("candidate") or {}
+    if data.get("candidate_ref") and target_role and job_description:
+        candidate, _ = profile_store.view(data["candidate_ref"], target_role, job_description)
+
+    if not target_role or not job_description or not isinstance(candidate, dict) or not candidate:
+        return None
+    return target_role, job_description, candidate
+
+
+class ResumeResult:
+    def __init__(self, resume_json: dict, used_ai: bool, fingerprint: str = None,
+                 prompt_tokens: dict = None, warning: str = None, error: str = None):
+        self.resume_json = resume_json
+        self.used_ai = used_ai
+        self.fingerprint = fingerprint
+        self.prompt_tokens = prompt_tokens
+        self.warning = warning
+        self.error = error
+
+
+def _hash(*parts) -> str:
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def _demo_fingerprint(target_role: str, job_description: str, candidate: dict) -> str:
+    # The demo resume is a pure function of the inputs and the catalog
+    # (which feeds the ATS keyword lexicon).
+    return _hash("demo", get_catalog().version, canonical_json([target_role, job_description, candidate]))
+
+
+def _ai_fingerprint(key: str, resume_json: dict) -> str:
+    return _hash("ai", key, canonical_json(resume_json))
+
+
+def fallback_warning(error: Exception) -> str:
+    return SHED_WARNING if isinstance(error, AdmissionRejected) else FALLBACK_WARNING
+
+
+def _fallback(target_role: str, job_description: str, candidate: dict, error: Exception) -> ResumeResult:
+    ai_fallbacks.inc(reason=type(error).__name__)
+    return ResumeResult(
+        build_demo_resume(target_role, candidate, job_description),
+        used_ai=False,
+        warning=fallback_warning(error),
+        error=str(error),
+    )
+
+
+def _ai_result(payload: dict, resume_json: dict, prompt_report: dict) -> ResumeResult:
+    fingerprint = None
+    if env_bool("RESUME_CACHE_ENABLED", True):
+        fingerprint = _ai_fingerprint(payload_fingerprint(payload, primary_model()), resume_json)
+    return ResumeResult(resume_json, used_ai=True, fingerprint=fingerprint, prompt_tokens=prompt_report)
+
+
+def _demo_result(target_role: str, job_description: str, candidate: dict) -> ResumeResult:
+    return ResumeResult(
+        build_demo_resume(target_role, candidate, job_description),
+        used_ai=False,
+        fingerprint=_demo_fingerprint(target_role, job_description, candidate),
+    )
+
+
+def run_resume_pipeline(target_role: str, job_description: str, candidate: dict,
+                        slo: float = None) -> ResumeResult:
+    """Tailor with Gemini when enabled, falling back to the demo resume on any failure."""
+    if not ai_enabled():
+        return _demo_result(target_role, job_description, candidate)
+
+    payload, prompt_report = build_compact_payload(target_role, job_description, candidate)
+    try:
+        resume_json = tailor_resume_cached(payload, slo)
+    except Exception as e:
+        return _fallback(target_role, job_description, candidate, e)
+    return _ai_result(payload, finish_resume(resume_json, job_description, candidate), prompt_report)
+
+
+async def run_resume_pipeline_async(target_role: str, job_description: str, candidate: dict,
+                                    slo: float = None) -> ResumeResult:
+    """asyncio counterpart of run_resume_pipeline for the ASGI entry point."""
+    if not ai_enabled():
+        return _demo_result(target_role, job_description, candidate)
+
+    payload, prompt_report = build_compact_payload(target_role, job_description, candidate)
+    try:
+        resume_json = await tailor_resume_cached_async(payload, slo)
+    except Exception as e:
+        return _fallback(target_role, job_description, candidate, e)
+    return _ai_result(payload, finish_resume(resume_json, job_description, candidate), prompt_report)
+
+
+def current_fingerprint(target_role: str, job_description: str, candidate: dict):
+    """Fingerprint run_resume_pipeline would return right now, if known without generating.
+
+    Used to answer If-None-Match: only the response cache is consulted, so
+    a stale or uncached AI result returns None and the request proceeds.
+    """
+    if not ai_enabled():
+        return _demo_fingerprint(target_role, job_description, candidate)
+    if not env_bool("RESUME_CACHE_ENABLED", True):
+        return None
+
+    payload, _ = build_compact_payload(target_role, job_description, candidate)
+    key = payload_fingerprint(payload, primary_model())
+    cached = resume_cache.get(key)
+    if cached is None:
+        return None
+    return _ai_fingerprint(key, finish_resume(cached, job_description, candidate))
+
+
+def resume_etag(fingerprint: str, output_format: str) -> str:
+    """Strong ETag value (unquoted) for one output format of a result."""
+    return _hash(fingerprint, output_format)[:32]
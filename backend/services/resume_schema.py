@@ -0,0 +1,145 @@
+# backend/services/resume_schema.py
+"""JSON Schema and validators for the resume output_schema.
+
+build_gemini_payload describes the resume by example: "string" for a
+string, a one-element list for an array, and a placeholder key with
+spaces or a capital letter (e.g. "Section Name") for a map with
+free-form keys. to_json_schema turns that into the JSON Schema Gemini
+takes as response_json_schema. compile_validator turns a schema into
+nested closures once, so checking a response is a single walk with no
+schema interpretation.
+"""
+import threading
+
+from backend.services.response_cache import canonical_json
+
+_SCALARS = {"string": (str,), "number": (int, float), "integer": (int,), "boolean": (bool,)}
+
+
+def _is_placeholder_key(key: str) -> bool:
+    return " " in key or key[:1].isupper()
+
+
+def to_json_schema(example) -> dict:
+    if isinstance(example, dict):
+        if len(example) == 1 and _is_placeholder_key(next(iter(example))):
+            return {"type": "object", "additionalProperties": to_json_schema(next(iter(example.values())))}
+        return {
+            "type": "object",
+            "properties": {key: to_json_schema(value) for key, value in example.items()},
+            "required": list(example),
+            # Gemini emits properties in this order, which keeps streamed
+            # sections arriving in document order.
+            "propertyOrdering": list(example),
+        }
+    if isinstance(example, list):
+        return {"type": "array", "items": to_json_schema(example[0]) if example else {}}
+    if example in _SCALARS:
+        return {"type": example}
+    return {"type": "string"}
+
+
+def compile_validator(schema: dict):
+    """Validator `check(value, path, errors)` that appends messages to `errors`."""
+    kind = schema.get("type")
+
+    if kind == "object":
+        properties = {k: compile_validator(v) for k, v in schema.get("properties", {}).items()}
+        required = tuple(schema.get("required", ()))
+        extra = schema.get("additionalProperties")
+        extra = compile_validator(extra) if isinstance(extra, dict) else None
+
+        def check_object(value, path, errors):
+            if not isinstance(value, dict):
+                errors.append(f"{path}: expected object")
+                return
+            for key in required:
+                if key not in value:
+                    errors.append(f"{path}.{key}: missing")
+            for key, item in value.items():
+                sub = properties.get(key, extra)
+                if sub is not None:
+                    sub(item, f"{path}.{key}", errors)
+        return check_object
+
+    if kind == "array":
+        check_item = compile_validator(schema.get("items") or {})
+
+        def check_array(value, path, errors):
+            if not isinstance(value, list):
+                errors.append(f"{path}: expected array")
+                return
+            for i, item in enumerate(value):
+                check_item(item, f"{path}[{i}]", errors)
+        return check_array
+
+    if kind not in _SCALARS:
+        return lambda value, path, errors: None
+    expected = _SCALARS[kind]
+
+    def check_scalar(value, path, errors):
+        # bool is an int subclass; only "boolean" accepts it
+        if not isinstance(value, expected) or (isinstance(value, bool) and kind != "boolean"):
+            errors.append(f"{path}: expected {kind}")
+    return check_scalar
+
+
+class ResumeSchema:
+    """Top-level sections of an output_schema with one compiled validator each."""
+
+    def __init__(self, output_schema: dict):
+        self.sections = list(output_schema)
+        self.json_schema = to_json_schema(output_schema)
+        self._validators = {
+            section: compile_validator(self.json_schema["properties"][section]) for section in self.sections
+        }
+
+    def validate_section(self, section: str, value) -> list:
+        errors = []
+        check = self._validators.get(section)
+        if check is not None:
+            check(value, section, errors)
+        return errors
+
+    def split(self, resume: dict):
+        """(valid sections in schema order, {invalid or missing section: errors})."""
+        valid, invalid = {}, {}
+        for section in self.sections:
+            if section not in resume:
+                invalid[section] = [f"{section}: missing"]
+                continue
+            errors = self.validate_section(section, resume[section])
+            if errors:
+                invalid[section] = errors[:10]
+            else:
+                valid[section] = resume[section]
+        return valid, invalid
+
+    def subset(self, sections) -> dict:
+        """JSON Schema for an object holding only `sections`."""
+        sections = [s for s in self.sections if s in sections]
+        return {
+            "type": "object",
+            "properties": {s: self.json_schema["properties"][s] for s in sections},
+            "required": sections,
+            "propertyOrdering": sections,
+        }
+
+
+_compiled = {}
+_compiled_lock = threading.Lock()
+
+
+def resume_schema(output_schema: dict) -> ResumeSchema:
+    """Compiled ResumeSchema, built once per distinct output_schema."""
+    # Keyed on the canonical (sorted) form but built from the original, so
+    # section order follows the schema as written.
+    key = canonical_json(output_schema)
+    schema = _compiled.get(key)
+    if schema is None:
+        schema = ResumeSchema(output_schema)
+        with _compiled_lock:
+            if len(_compiled) >= 16:
+                _compiled.clear()
+            _compiled[key] = schema
+    return schema
@@ -1,5 +1,6 @@
 # backend/services/resume_utils.py
-from backend.data.templates import PROJECT_TEMPLATES
+from backend.services.latex_render import escape_latex
+
 def calculate_project_relevance(user_data, project_key, project_info):
     """Calculate how relevant a project is to the user (0-100)"""
     score = 50  # Base score
@@ -7,13 +8,16 @@ def calculate_project_relevance(user_data, project_key, project_info):
     interests = [i.lower() for i in user_data.get('interests', [])]
     skills = [s.lower() for s in user_data.get('skills', [])]
     
+    interests_text = ' '.join(interests)
+    skills_text = ' '.join(skills)
+    
     # High bonus if interest matches project category
-    if project_key in ' '.join(interests):
+    if project_key in interests_text:
         score += 45
     
     # Bonus for relevant skills
     for lang in project_info['languages']:
-        if lang.lower() in ' '.join(skills):
+        if lang.lower() in skills_text:
             score += 10
     
     # Cap at 100
@@ -30,9 +34,7 @@ def generate_resume_bullets(project):
     return bullets
 
 
-def generate_latex_resume(user_data, projects):
-    """Generate LaTeX resume code"""
-    latex = r"""\documentclass[letterpaper,11pt]{article}
+_LATEX_PREAMBLE = r"""\documentclass[letterpaper,11pt]{article}
 \usepackage[margin=0.75in]{geometry}
 \usepackage{enumitem}
 \usepackage{hyperref}
@@ -40,29 +42,46 @@ def generate_latex_resume(user_data, projects):
 \begin{document}
 
 \begin{center}
-{\LARGE \textbf{""" + user_data.get('name', 'Your Name') + r"""}}\\
-\vspace{2mm}
-""" + user_data.get('targetRole', 'Software Developer') + r"""
-\end{center}
+{\LARGE \textbf{"""
 
-\section*{Skills}
-""" + ', '.join(user_data.get('skills', [])) + r"""
 
-\section*{Projects}
-"""
-    
-    for project in projects:
+def _join_escaped(items):
+    return ', '.join(escape_latex(i) for i in (items if isinstance(items, list) else []))
+
+
+def project_latex(project, bullets=None):
+    """LaTeX block for one project template (bullets default to generate_resume_bullets)"""
+    if bullets is None:
         bullets = generate_resume_bullets(project)
-        latex += f"\n\\textbf{{{project['name']}}} \\\\\n"
-        latex += "\\begin{itemize}[leftmargin=*,nosep]\n"
-        for bullet in bullets:
-            latex += f"    \\item {bullet}\n"
-        latex += "\\end{itemize}\n\\vspace{2mm}\n"
-    
-    latex += r"""
-\section*{Interests}
-""" + ', '.join(user_data.get('interests', [])) + r"""
+    parts = [f"\n\\textbf{{{escape_latex(project['name'])}}} \\\\\n", "\\begin{itemize}[leftmargin=*,nosep]\n"]
+    parts.extend(f"    \\item {escape_latex(bullet)}\n" for bullet in bullets)
+    parts.append("\\end{itemize}\n\\vspace{2mm}\n")
+    return "".join(parts)
+
+
+def latex_resume_parts(user_data, project_blocks):
+    """Pieces of the resume document, in order; project_blocks come from project_latex"""
+    return [
+        _LATEX_PREAMBLE,
+        escape_latex(user_data.get('name', 'Your Name')),
+        "}}\\\\\n\\vspace{2mm}\n",
+        escape_latex(user_data.get('targetRole', 'Software Developer')),
+        "\n\\end{center}\n\n\\section*{Skills}\n",
+        _join_escaped(user_data.get('skills', [])),
+        "\n\n\\section*{Projects}\n",
+        *project_blocks,
+        "\n\\section*{Interests}\n",
+        _join_escaped(user_data.get('interests', [])),
+        "\n\n\\end{document}\n",
+    ]
+
+
+def generate_latex_resume(user_data, projects, bullets=None):
+    """Generate LaTeX resume code; user fields are escaped.
 
-\end{document}
-"""
-    return latex
\ No newline at end of file
+    `bullets` (one list per project) skips regenerating them, e.g. with the
+    catalog's precomputed bullets.
+    """
+    bullets = bullets if bullets is not None else [None] * len(projects)
+    blocks = [project_latex(project, b) for project, b in zip(projects, bullets)]
+    return "".join(latex_resume_parts(user_data, blocks))
@@ -0,0 +1,236 @@
+# backend/services/section_tailor.py
+"""Tailor a resume as concurrent per-section Gemini calls.
+
+With GEMINI_SECTION_MODE=true, tailor_resume_with_gemini replaces its one
+large call with several small ones that run at the same time:
+
+  summary       headline and summary
+  skills        skills grouped and ordered for the job
+  project:i     one call per candidate project
+  experience:i  one call per candidate experience entry
+
+Output length drives Gemini latency, so the resume now takes about as
+long as its longest section instead of the sum of all of them. The header
+is copied from the candidate; the prompt forbids changing it anyway.
+
+All calls share one deadline: the request's latency SLO, or
+GEMINI_SECTION_DEADLINE_SECONDS without one. Each call gets what is left
+of it as its router timeout, so a call never outlives the request. A
+section that fails, returns invalid JSON, is shed by ai_admission or
+misses the deadline gets its value from the demo resume, and the other
+sections are still used. If every call fails, the first error is raised
+and the pipeline serves the demo resume as usual.
+
+Every section call takes its own ai_admission slot, and at most
+GEMINI_SECTION_MAX_IN_FLIGHT sections of one request run at a time, so a
+long resume cannot hold every Gemini client permit by itself.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from backend.services.admission import ai_admission
+from backend.services.ai_tailor_gemini import get_router, parse_resume_text, structured_config
+from backend.services.metrics import ai_sections
+from backend.services.prompt_compaction import compact_json
+from backend.services.resume_schema import resume_schema
+from backend.utils import env_float, env_int
+
+_pool = None
+_pool_lock = threading.Lock()
+
+_TASK_INSTRUCTIONS = {
+    "summary": "Write ONLY the headline and summary for this candidate.",
+    "skills": "Write ONLY the skills section: group the candidate's skills and order them by relevance to the job.",
+    "project": "Rewrite ONLY this one project entry; keep its name.",
+    "experience": "Rewrite ONLY this one experience entry; keep its title and company.",
+}
+
+
+def _executor() -> ThreadPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(
+                    max_workers=env_int("GEMINI_SECTION_WORKERS", 16), thread_name_prefix="gemini-section"
+                )
+    return _pool
+
+
+def _task(payload: dict, kind: str, candidate: dict, output_schema: dict) -> dict:
+    return {
+        "instructions": list(payload.get("instructions", [])) + [_TASK_INSTRUCTIONS[kind]],
+        "target_role": payload.get("target_role", ""),
+        "job_description": payload.get("job_description", ""),
+        "candidate": candidate,
+        "output_schema": output_schema,
+    }
+
+
+def section_tasks(payload: dict) -> list:
+    """[(name, section payload, ResumeSchema)] for the sections payload's output_schema asks for."""
+    schema = payload.get("output_schema") or {}
+    candidate = payload.get("candidate") or {}
+    tasks = []
+
+    if "headline" in schema and "summary" in schema:
+        output = {"headline": schema["headline"], "summary": schema["summary"]}
+        tasks.append(("summary", _task(payload, "summary", candidate, output), resume_schema(output)))
+    if "skills" in schema:
+        output = {"skills": schema["skills"]}
+        tasks.append(("skills", _task(payload, "skills", candidate, output), resume_schema(output)))
+
+    # Entries get the candidate's skills as context, not the whole profile
+    context = {"skills": candidate.get("skills", [])}
+    for section, key in (("projects", "project"), ("experience", "experience")):
+        entries = candidate.get(section)
+        if section not in schema or not isinstance(entries, list) or not isinstance(schema[section], list):
+            continue
+        output = {key: schema[section][0] if schema[section] else {}}
+        for i, entry in enumerate(entries):
+            tasks.append((
+                f"{key}:{i}",
+                _task(payload, key, {**context, key: entry}, output),
+                resume_schema(output),
+            ))
+    return tasks
+
+
+def _parse(name: str, text: str, schema) -> dict:
+    valid, invalid = schema.split(parse_resume_text(text))
+    if invalid:
+        raise ValueError(f"{name}: invalid output ({'; '.join(e for errors in invalid.values() for e in errors[:2])})")
+    return valid
+
+
+def _remaining(name: str, deadline: float) -> float:
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise TimeoutError(f"{name}: section deadline exceeded")
+    return remaining
+
+
+def _run(name: str, section_payload: dict, schema, deadline: float, slo: float = None):
+    _remaining(name, deadline)
+    with ai_admission.slot():
+        resp, model = get_router().generate(
+            compact_json(section_payload), slo=slo, config=structured_config(schema.json_schema),
+            timeout=_remaining(name, deadline),
+        )
+    return _parse(name, resp.text, schema), model
+
+
+async def _arun(name: str, section_payload: dict, schema, deadline: float, slo: float = None):
+    _remaining(name, deadline)
+    async with ai_admission.aslot():
+        resp, model = await get_router().agenerate(
+            compact_json(section_payload), slo=slo, config=structured_config(schema.json_schema),
+            timeout=_remaining(name, deadline),
+        )
+    return _parse(name, resp.text, schema), model
+
+
+def _deadline(slo: float = None) -> float:
+    return slo or env_float("GEMINI_SECTION_DEADLINE_SECONDS", 30.0)
+
+
+def _max_in_flight() -> int:
+    return max(1, env_int("GEMINI_SECTION_MAX_IN_FLIGHT", 4))
+
+
+def _merge(payload: dict, tasks: list, outcomes: dict):
+    """(resume_json in output_schema order, model); failed sections come from the demo resume.
+
+    `model` is the one that answered every section, or None if sections
+    came from several models or from the demo resume.
+    """
+    from backend.services.resume_pipeline import build_demo_resume
+
+    errors = []
+    for name, _, _ in tasks:
+        outcome = outcomes.get(name, TimeoutError(f"{name}: section deadline exceeded"))
+        if isinstance(outcome, Exception):
+            errors.append(outcome)
+            kind = "timeout" if isinstance(outcome, TimeoutError) else "error"
+        else:
+            kind = "ok"
+        ai_sections.inc(section=name.split(":")[0], outcome=kind)
+    if tasks and len(errors) == len(tasks):
+        raise errors[0]
+
+    candidate = payload.get("candidate") or {}
+    demo = build_demo_resume(payload.get("target_role", ""), candidate)
+    resume = {"header": demo["header"]}
+
+    def value(name: str, key: str, default):
+        outcome = outcomes.get(name)
+        return default if outcome is None or isinstance(outcome, Exception) else outcome[0][key]
+
+    resume["headline"] = value("summary", "headline", demo["headline"])
+    resume["summary"] = value("summary", "summary", demo["summary"])
+    resume["skills"] = value("skills", "skills", demo["skills"])
+    resume["projects"] = [
+        value(f"project:{i}", "project", entry) for i, entry in enumerate(demo["projects"])
+    ]
+    resume["experience"] = [
+        value(f"experience:{i}", "experience", entry) for i, entry in enumerate(demo["experience"])
+    ]
+
+    models = {outcome[1] for outcome in outcomes.values() if not isinstance(outcome, Exception)}
+    model = models.pop() if not errors and len(models) == 1 else None
+    order = list(payload.get("output_schema") or resume)
+    return {section: resume[section] for section in order if section in resume}, model
+
+
+def tailor_resume_by_section(payload: dict, slo: float = None):
+    tasks = section_tasks(payload)
+    deadline = time.monotonic() + _deadline(slo)
+    queued = iter(tasks)
+    running, outcomes = {}, {}
+
+    def submit():
+        task = next(queued, None)
+        if task is not None:
+            name, section_payload, schema = task
+            running[_executor().submit(_run, name, section_payload, schema, deadline, slo)] = name
+
+    for _ in range(_max_in_flight()):
+        submit()
+    # Sections still queued at the deadline never start; _merge counts them as timeouts
+    while running:
+        done, _ = wait(running, timeout=max(0.0, deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+        if not done:
+            break
+        for future in done:
+            name = running.pop(future)
+            error = future.exception()
+            outcomes[name] = error if error is not None else future.result()
+            submit()
+    return _merge(payload, tasks, outcomes)
+
+
+async def tailor_resume_by_section_async(payload: dict, slo: float = None):
+    """asyncio counterpart of tailor_resume_by_section; calls past the deadline are cancelled."""
+    tasks = section_tasks(payload)
+    deadline = time.monotonic() + _deadline(slo)
+    limit = asyncio.Semaphore(_max_in_flight())
+
+    async def run(name: str, section_payload: dict, schema):
+        async with limit:
+            return await _arun(name, section_payload, schema, deadline, slo)
+
+    running = {
+        asyncio.ensure_future(run(name, section_payload, schema)): name
+        for name, section_payload, schema in tasks
+    }
+    done, pending = await asyncio.wait(running, timeout=_deadline(slo)) if running else (set(), set())
+    for task in pending:
+        task.cancel()
+
+    outcomes = {}
+    for task in done:
+        error = task.exception()
+        outcomes[running[task]] = error if error is not None else task.result()
+    return _merge(payload, tasks, outcomes)
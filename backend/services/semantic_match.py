@@ -0,0 +1,259 @@
+# backend/services/semantic_match.py
+"""Semantic project matching with hashed TF-IDF vectors.
+
+Each template's key, name, description, skills_gained and tags become one
+document (backend.data.catalog.search_text). Words and character
+trigrams are hashed (signed, crc32) into SEMANTIC_DIM buckets, weighted
+by sublinear TF times IDF, and L2-normalised; the vectors are kept as
+posting lists and, for batches, as a dense float32 matrix stored
+bucket-major (one contiguous row of template weights per bucket).
+Trigrams let "trading" meet "trade" and "stocks" meet "stock".
+
+Scoring a batch of users is then one matrix multiply (users x dim @
+dim x templates) for interest similarity and one for language matches,
+followed by np.argpartition for the top k. The dense matrices are only
+built for the first batch. A single query on the request path instead
+sums the posting lists (bucket -> template rows and weights) of the few
+buckets it touches, so its arrays and its cost grow with those postings,
+not with the catalog. Small arrays also matter under load: NumPy
+releases the GIL around large operations and the request thread then
+waits several switch intervals to get it back (p95 went from 0.4 ms to
+15 ms with 8 request threads when a query touched catalog-length rows).
+The index reads each template's search text from catalog.search_rows(),
+so a lazy catalog backend does not decode every template to build it.
+Relevance keeps the calculate_project_relevance scale: base 50, up to
++45 for the interest (an exact category match is the full bonus;
+otherwise it grows with similarity), +10 per known language, capped at
+100.
+"""
+import math
+import threading
+import zlib
+
+import numpy as np
+
+from backend.data.catalog import get_catalog
+from backend.services.project_index import BASE_SCORE, INTEREST_BONUS, LANGUAGE_BONUS, MAX_SCORE, tokenize
+from backend.utils import env_float, env_int
+
+# Cosine similarity at or below SIM_FLOOR earns nothing; at SIM_FULL the full interest bonus
+SIM_FLOOR = env_float("SEMANTIC_SIM_FLOOR", 0.1)
+SIM_FULL = env_float("SEMANTIC_SIM_FULL", 0.25)
+TRIGRAM_WEIGHT = 0.5
+
+
+def _features(text: str, dim: int) -> dict:
+    """Signed hashed counts of words and within-word trigrams."""
+    counts = {}
+    for word in tokenize(text):
+        grams = [(word, 1.0)]
+        padded = f"#{word}#"
+        grams.extend((padded[i:i + 3], TRIGRAM_WEIGHT) for i in range(len(padded) - 2))
+        for gram, weight in grams:
+            h = zlib.crc32(gram.encode("utf-8"))
+            index = h % dim
+            sign = 1.0 if (h >> 31) & 1 else -1.0
+            counts[index] = counts.get(index, 0.0) + sign * weight
+    return counts
+
+
+class SemanticIndex:
+    """Template vectors, language and category incidence for one catalog snapshot."""
+
+    def __init__(self, catalog, dim: int = 1024):
+        self.version = catalog.version
+        self.dim = dim
+        self.ids = []
+        docs = []
+        self.languages = {}
+        self.categories = {}
+        self._language_cells, self._category_cells = [], []
+        for row, (pid, text, languages) in enumerate(catalog.search_rows()):
+            self.ids.append(pid)
+            docs.append(_features(text, dim))
+            for lang in {str(l).lower() for l in languages}:
+                self._language_cells.append((row, self.languages.setdefault(lang, len(self.languages))))
+            for token in set(tokenize(pid)):
+                self._category_cells.append((row, self.categories.setdefault(token, len(self.categories))))
+        n = len(self.ids)
+
+        df = np.zeros(dim, dtype=np.float32)
+        for features in docs:
+            df[list(features)] += 1
+        # Smoothed IDF; buckets no template uses get the maximum weight
+        self.idf = (np.log((1 + n) / (1 + df)) + 1).astype(np.float32)
+
+        self._vectors = [self._weights(features) for features in docs]  # per template {bucket: weight}
+        postings = {}
+        for row, weights in enumerate(self._vectors):
+            for index, weight in weights.items():
+                postings.setdefault(index, []).append((row, weight))
+        # bucket -> (template rows, their weights), for single queries
+        self.postings = {
+            index: (np.array([row for row, _ in cells], dtype=np.int32),
+                    np.array([weight for _, weight in cells], dtype=np.float32))
+            for index, cells in postings.items()
+        }
+
+        self._dense = None
+        self._dense_lock = threading.Lock()
+
+    @staticmethod
+    def _incidence(n: int, width: int, cells) -> np.ndarray:
+        matrix = np.zeros((n, max(1, width)), dtype=np.float32)
+        for row, col in cells:
+            matrix[row, col] = 1.0
+        return matrix
+
+    def _matrices(self):
+        """(dim x templates vectors, language incidence, category incidence), built on first use."""
+        if self._dense is None:
+            with self._dense_lock:
+                if self._dense is None:
+                    n = len(self.ids)
+                    columns = np.zeros((self.dim, n), dtype=np.float32)
+                    for row, weights in enumerate(self._vectors):
+                        for index, weight in weights.items():
+                            columns[index, row] = weight
+                    self._dense = (
+                        columns,
+                        self._incidence(n, len(self.languages), self._language_cells),
+                        self._incidence(n, len(self.categories), self._category_cells),
+                    )
+        return self._dense
+
+    @property
+    def columns(self) -> np.ndarray:
+        return self._matrices()[0]
+
+    @property
+    def language_matrix(self) -> np.ndarray:
+        return self._matrices()[1]
+
+    @property
+    def category_matrix(self) -> np.ndarray:
+        return self._matrices()[2]
+
+    def _weights(self, features: dict) -> dict:
+        """{bucket: L2-normalised sublinear TF-IDF weight} for hashed features."""
+        weights = {}
+        for index, count in features.items():
+            magnitude = abs(count)
+            if magnitude:
+                weights[index] = math.copysign(1 + math.log(magnitude), count) * float(self.idf[index])
+        norm = math.sqrt(sum(w * w for w in weights.values()))
+        return {index: w / norm for index, w in weights.items()} if norm else {}
+
+    def _fill(self, out: np.ndarray, features: dict):
+        for index, weight in self._weights(features).items():
+            out[index] = weight
+
+    def _user_matrices(self, users):
+        """(interest vectors, language indicators, category indicators), one row per user."""
+        b = len(users)
+        queries = np.zeros((b, self.dim), dtype=np.float32)
+        languages = np.zeros((b, self.language_matrix.shape[1]), dtype=np.float32)
+        categories = np.zeros((b, self.category_matrix.shape[1]), dtype=np.float32)
+        for row, user in enumerate(users):
+            interests = [str(i) for i in user.get("interests") or []]
+            self._fill(queries[row], _features(" ".join(interests), self.dim))
+            for token in {t for i in interests for t in tokenize(i)}:
+                col = self.categories.get(token)
+                if col is not None:
+                    categories[row, col] = 1.0
+            for skill in user.get("skills") or []:
+                skill = str(skill).lower().strip()
+                for term in {skill, *tokenize(skill)}:
+                    col = self.languages.get(term)
+                    if col is not None:
+                        languages[row, col] = 1.0
+        return queries, languages, categories
+
+    @staticmethod
+    def _semantic(similarity: np.ndarray) -> np.ndarray:
+        """Fraction of the interest bonus earned by each similarity."""
+        return np.clip((similarity - SIM_FLOOR) / (SIM_FULL - SIM_FLOOR), 0.0, 1.0)
+
+    def scores(self, users):
+        """(relevance, similarity) arrays of shape (users, templates)."""
+        queries, languages, categories = self._user_matrices(users)
+        similarity = queries @ self.columns
+        semantic = self._semantic(similarity)
+        exact = (categories @ self.category_matrix.T) > 0
+        interest = np.where(exact, 1.0, semantic)
+        language_hits = languages @ self.language_matrix.T
+        relevance = np.minimum(BASE_SCORE + INTEREST_BONUS * interest + LANGUAGE_BONUS * language_hits, MAX_SCORE)
+        return relevance, similarity
+
+    def interest_bonuses(self, interests) -> dict:
+        """{template id: semantic interest bonus} for the templates similar enough to score."""
+        weights = self._weights(_features(" ".join(str(i) for i in interests or []), self.dim))
+        hit = [(self.postings[index], weight) for index, weight in weights.items() if index in self.postings]
+        if not hit:
+            return {}
+        # Only the posting lists of the query's buckets (see the module docstring)
+        rows = np.concatenate([postings[0] for postings, _ in hit])
+        products = np.concatenate([postings[1] * np.float32(weight) for postings, weight in hit])
+        if len(rows) * 8 < len(self.ids):
+            # Few postings: sum per distinct row, never touching catalog-length arrays
+            touched, slot = np.unique(rows, return_inverse=True)
+            similarity = np.bincount(slot, weights=products)
+        else:
+            # Postings already cover a good share of the catalog: one buffer indexed by row is cheaper
+            similarity = np.bincount(rows, weights=products)
+            touched = np.arange(len(similarity))
+        semantic = self._semantic(similarity)
+        hits = np.nonzero(semantic > 0)[0]
+        return {self.ids[touched[i]]: float(INTEREST_BONUS * semantic[i]) for i in hits}
+
+    def top_k(self, users, k: int = 5) -> list:
+        """Best k templates per user: [[(id, relevance, similarity), ...], ...].
+
+        Ties keep catalog order, as in ProjectIndex.search.
+        """
+        if not users or not self.ids:
+            return [[] for _ in users]
+        k = max(1, min(k, len(self.ids)))
+        relevance, similarity = self.scores(users)
+        # Fold catalog position into the key so argpartition breaks ties by order
+        key = relevance.astype(np.float64) - np.arange(len(self.ids)) * 1e-9
+        if k < len(self.ids):
+            top = np.argpartition(-key, k - 1, axis=1)[:, :k]
+        else:
+            top = np.tile(np.arange(len(self.ids)), (len(users), 1))
+        order = np.take_along_axis(key, top, axis=1).argsort(axis=1)[:, ::-1]
+        top = np.take_along_axis(top, order, axis=1)
+
+        results = []
+        for row, columns in enumerate(top):
+            results.append([
+                (self.ids[c], round(float(relevance[row, c]), 1), round(float(similarity[row, c]), 4))
+                for c in columns
+            ])
+        return results
+
+
+def score_users(users, k: int = 5, chunk_size: int = 2048) -> list:
+    """Bulk top-k recommendations for nightly jobs, in chunks to bound memory."""
+    index = get_semantic_index()
+    results = []
+    for start in range(0, len(users), chunk_size):
+        results.extend(index.top_k(users[start:start + chunk_size], k))
+    return results
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_semantic_index() -> SemanticIndex:
+    """Index for the current catalog snapshot, rebuilt when its version changes."""
+    global _index
+    catalog = get_catalog()
+    index = _index
+    if index is None or index.version != catalog.version:
+        with _index_lock:
+            if _index is None or _index.version != catalog.version:
+                _index = SemanticIndex(catalog, dim=env_int("SEMANTIC_DIM", 1024))
+            index = _index
+    return index
@@ -0,0 +1,296 @@
+# backend/services/single_flight.py
+import copy
+import json
+import os
+import tempfile
+import threading
+import time
+import weakref
+
+from backend.utils import env_float
+
+try:
+    import fcntl
+except ImportError:  # Windows: threads are still coalesced, processes are not
+    fcntl = None
+
+
+class SharedCallError(RuntimeError):
+    """The call this request was coalesced into failed in another worker process."""
+
+    def __init__(self, message: str, kind: str = ""):
+        super().__init__(message)
+        self.kind = kind
+
+
+def _follower_error(exc: Exception) -> Exception:
+    """A fresh copy of the leader's exception for one follower to raise.
+
+    Raising the leader's instance from every follower would splice all of
+    their frames into one shared traceback.
+    """
+    try:
+        return copy.copy(exc)
+    except Exception:
+        return SharedCallError(str(exc), type(exc).__name__)
+
+
+class _Flight:
+    __slots__ = ("done", "result", "error", "followers")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.followers = 0
+
+
+class SingleFlight:
+    """Collapses concurrent identical calls into one upstream call.
+
+    Within a process, the first thread for a key runs the call and later
+    threads wait on it, then get a copy of its result or its exception.
+
+    Across processes on the host, the leading thread takes an exclusive
+    flock on ``<lock_dir>/<key>.lock`` for the duration of the call.
+    Leaders of other workers block on that lock. Once they hold it, they
+    re-check ``lookup`` (the shared response cache) before calling
+    upstream themselves. A failing leader writes its error into the lock
+    file, so the waiters fail with the same message instead of retrying
+    one after another. The file is unlinked before the lock is released,
+    so lock files don't pile up.
+
+    ado() does the same for coroutines (counted as coalesced_threads).
+    """
+
+    def __init__(self, lock_dir: str, wait_seconds: float = 60.0):
+        self.lock_dir = lock_dir
+        self.wait_seconds = wait_seconds
+        self._flights = {}
+        self._async_flights = weakref.WeakKeyDictionary()  # event loop -> {key: future}
+        self._lock = threading.Lock()
+        self._counters = {
+            "calls": 0,
+            "leaders": 0,
+            "coalesced_threads": 0,
+            "coalesced_processes": 0,
+            "shared_errors": 0,
+            "wait_timeouts": 0,
+        }
+
+    def _count(self, name: str, amount: int = 1):
+        with self._lock:
+            self._counters[name] += amount
+
+    def do(self, key: str, fn, lookup=None):
+        """Return fn(), sharing one execution among concurrent callers of `key`.
+
+        `lookup` returns a result some other process stored for `key`, or
+        None; without it only threads of this process are coalesced.
+        """
+        self._count("calls")
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                flight.followers += 1
+
+        if not leader:
+            if not flight.done.wait(self.wait_seconds):
+                self._count("wait_timeouts")
+                return fn()
+            self._count("coalesced_threads")
+            if flight.error is not None:
+                raise _follower_error(flight.error) from flight.error
+            return copy.deepcopy(flight.result)
+
+        self._count("leaders")
+        try:
+            if lookup is not None and fcntl is not None:
+                flight.result = self._across_processes(key, fn, lookup)
+            else:
+                flight.result = fn()
+            return flight.result
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def _open_lock(self, key: str):
+        os.makedirs(self.lock_dir, exist_ok=True)
+        path = os.path.join(self.lock_dir, f"{key}.lock")
+        return os.open(path, os.O_RDWR | os.O_CREAT, 0o644), path
+
+    def _settled(self, fd: int, waited: bool, lookup):
+        """(True, result) if the lock's previous holder already settled the call."""
+        if waited:
+            shared_error = os.pread(fd, os.fstat(fd).st_size, 0)
+            if shared_error:
+                self._count("shared_errors")
+                info = json.loads(shared_error)
+                raise SharedCallError(info.get("error", ""), info.get("kind", ""))
+
+        # Another process may have finished the call just before we got
+        # the lock, even if we never had to wait for it.
+        result = lookup()
+        if result is not None:
+            self._count("coalesced_processes")
+            return True, result
+        return False, None
+
+    @staticmethod
+    def _publish_error(fd: int, exc: Exception):
+        message = json.dumps({"kind": type(exc).__name__, "error": str(exc)[:2000]})
+        os.pwrite(fd, message.encode("utf-8"), 0)
+
+    @staticmethod
+    def _unlock(fd: int, path: str):
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+    def _across_processes(self, key: str, fn, lookup):
+        fd, path = self._open_lock(key)
+        try:
+            waited = not self._try_lock(fd)
+            if waited and not self._wait_lock(fd):
+                self._count("wait_timeouts")
+                return fn()
+            try:
+                settled, result = self._settled(fd, waited, lookup)
+                if settled:
+                    return result
+                try:
+                    return fn()
+                except Exception as e:
+                    self._publish_error(fd, e)
+                    raise
+            finally:
+                self._unlock(fd, path)
+        finally:
+            os.close(fd)
+
+    async def ado(self, key: str, afn, lookup=None):
+        """asyncio counterpart of do(): `afn` is a coroutine function.
+
+        Coroutines on one event loop share an asyncio future; the lock
+        file is polled without blocking the loop, so async callers also
+        coalesce with threads and other processes holding the same key.
+        """
+        import asyncio
+
+        self._count("calls")
+        loop = asyncio.get_running_loop()
+        flights = self._async_flights.setdefault(loop, {})
+        future = flights.get(key)
+        if future is not None:
+            try:
+                await asyncio.wait_for(asyncio.shield(future), self.wait_seconds)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # The leading request was cancelled (client went away)
+                return await afn()
+            except Exception:
+                pass  # the leader's error or our wait timing out; told apart below
+            if not future.done():
+                self._count("wait_timeouts")
+                return await afn()
+            self._count("coalesced_threads")
+            error = future.exception()
+            if error is not None:
+                raise _follower_error(error) from error
+            return copy.deepcopy(future.result())
+
+        self._count("leaders")
+        future = flights[key] = loop.create_future()
+        try:
+            if lookup is not None and fcntl is not None:
+                result = await self._aacross_processes(key, afn, lookup)
+            else:
+                result = await afn()
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Followers re-raise it; nobody may be waiting, so mark it seen
+            future.exception()
+            raise
+        finally:
+            flights.pop(key, None)
+
+    async def _aacross_processes(self, key: str, afn, lookup):
+        import asyncio
+
+        fd, path = self._open_lock(key)
+        try:
+            waited = not self._try_lock(fd)
+            if waited:
+                deadline = time.monotonic() + self.wait_seconds
+                delay = 0.01
+                while not self._try_lock(fd):
+                    if time.monotonic() >= deadline:
+                        self._count("wait_timeouts")
+                        return await afn()
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, 0.2)
+            try:
+                settled, result = self._settled(fd, waited, lookup)
+                if settled:
+                    return result
+                try:
+                    return await afn()
+                except Exception as e:
+                    self._publish_error(fd, e)
+                    raise
+            finally:
+                self._unlock(fd, path)
+        finally:
+            os.close(fd)
+
+    @staticmethod
+    def _try_lock(fd: int) -> bool:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except BlockingIOError:
+            return False
+
+    def _wait_lock(self, fd: int) -> bool:
+        deadline = time.monotonic() + self.wait_seconds
+        delay = 0.01
+        while time.monotonic() < deadline:
+            time.sleep(delay)
+            if self._try_lock(fd):
+                return True
+            delay = min(delay * 2, 0.2)
+        return False
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+            in_flight = len(self._flights) + sum(len(f) for f in list(self._async_flights.values()))
+        coalesced = counters["coalesced_threads"] + counters["coalesced_processes"]
+        return {
+            **counters,
+            "in_flight": in_flight,
+            "coalesce_rate": round(coalesced / counters["calls"], 4) if counters["calls"] else 0.0,
+            "cross_process": fcntl is not None,
+        }
+
+
+resume_flights = SingleFlight(
+    lock_dir=os.getenv("SINGLE_FLIGHT_DIR")
+    or os.path.join(tempfile.gettempdir(), "intersync_single_flight"),
+    wait_seconds=env_float("SINGLE_FLIGHT_WAIT_SECONDS", 60.0),
+)
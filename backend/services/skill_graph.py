@@ -0,0 +1,153 @@
+# backend/services/skill_graph.py
+import threading
+from collections import defaultdict, deque
+from functools import lru_cache
+
+from backend.data.catalog import get_catalog
+
+
+def _key(skill) -> str:
+    return str(skill).strip().casefold()
+
+
+class SkillGraphIndex:
+    """Skill -> project -> skill adjacency for one catalog version.
+
+    A project is open to anyone who knows at least one of its languages
+    (the same rule the graph edges have always used); finishing it adds its
+    skills_gained and languages to what the user knows. Potential skills are
+    deduplicated and weighted by how many projects teach them, and the
+    per-language edge lists are precomputed, so drawing a graph only touches
+    the user's own skills plus the node/edge limits.
+    """
+
+    def __init__(self, catalog):
+        self.version = catalog.version
+        self.labels = {}                       # skill key -> display label
+        self.projects = {}                     # project id -> (name, language keys, gained keys)
+        self.unlocks = defaultdict(list)       # skill key -> project ids using it as a language
+        self.weight = defaultdict(int)         # skill key -> number of projects teaching it
+        self.edges_from = defaultdict(list)    # language key -> [(skill key, project name)]
+
+        for pid in catalog:
+            project = catalog[pid]
+            langs = [self._label(l) for l in project.get("languages", [])]
+            gained = [self._label(s) for s in project.get("skills_gained", [])]
+            self.projects[pid] = (project.get("name", pid), langs, gained)
+
+            for lang in dict.fromkeys(langs):
+                self.unlocks[lang].append(pid)
+                for skill in gained:
+                    self.edges_from[lang].append((skill, project.get("name", pid)))
+            for skill in dict.fromkeys(gained):
+                self.weight[skill] += 1
+
+        # Heaviest first, catalog order among equals (dicts keep insertion order)
+        self.potential = sorted(self.weight, key=lambda k: -self.weight[k])
+        # Searches are cached per index, so a catalog swap drops them with it
+        self._search_cached = lru_cache(maxsize=1024)(self._search)
+
+    def _label(self, skill) -> str:
+        key = _key(skill)
+        self.labels.setdefault(key, str(skill))
+        return key
+
+    def graph(self, current_skills, max_nodes: int = 10, max_edges: int = 15) -> dict:
+        current = {}
+        for skill in current_skills or []:
+            current.setdefault(_key(skill), skill)
+
+        nodes = [
+            {"id": skill, "label": skill, "level": 70 + (i * 5), "type": "current"}
+            for i, skill in enumerate(current.values())
+        ][:max_nodes]
+
+        for key in self.potential:
+            if len(nodes) >= max_nodes:
+                break
+            if key not in current:
+                label = self.labels[key]
+                nodes.append({"id": label, "label": label, "level": 30,
+                              "type": "potential", "weight": self.weight[key]})
+
+        edges = []
+        for key, skill in current.items():
+            for target, project_name in self.edges_from.get(key, ()):
+                if len(edges) >= max_edges:
+                    break
+                if target not in current:
+                    edges.append({"from": skill, "to": self.labels[target], "project": project_name})
+
+        return {"nodes": nodes, "edges": edges}
+
+    def _search(self, start, max_projects: int = None):
+        """BFS over projects; returns {skill: (hops, parent skill, project id)}."""
+        seen = {key: (0, None, None) for key in start}
+        queue = deque(start)
+        done_projects = set()
+
+        while queue:
+            skill = queue.popleft()
+            hops = seen[skill][0]
+            if max_projects is not None and hops >= max_projects:
+                continue
+            for pid in self.unlocks.get(skill, ()):
+                if pid in done_projects:
+                    continue
+                done_projects.add(pid)
+                _, langs, gained = self.projects[pid]
+                for new in gained + langs:
+                    if new not in seen:
+                        seen[new] = (hops + 1, skill, pid)
+                        queue.append(new)
+        return seen
+
+    def _path(self, seen: dict, target: str) -> list:
+        steps = []
+        while seen[target][2] is not None:
+            hops, via, pid = seen[target]
+            name, _, _ = self.projects[pid]
+            steps.append({"project_id": pid, "project": name,
+                          "via": self.labels.get(via, via), "gains": self.labels[target]})
+            target = via
+        steps.reverse()
+        return steps
+
+    def shortest_path(self, current_skills, target) -> list:
+        """Fewest projects from the user's skills to `target`, or None if unreachable."""
+        start = frozenset(_key(s) for s in current_skills or [])
+        target = _key(target)
+        if target in start:
+            return []
+        seen = self._search_cached(start, None)
+        if target not in seen:
+            return None
+        return self._path(seen, target)
+
+    def reachable(self, current_skills, max_projects: int) -> list:
+        """Skills learnable within `max_projects` projects, nearest first."""
+        start = frozenset(_key(s) for s in current_skills or [])
+        seen = self._search_cached(start, max_projects)
+        found = [(hops, key) for key, (hops, _, _) in seen.items() if hops > 0]
+        found.sort(key=lambda item: item[0])
+        return [
+            {"skill": self.labels[key], "projects_needed": hops, "path": self._path(seen, key)}
+            for hops, key in found
+        ]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_skill_graph_index() -> SkillGraphIndex:
+    """Index for the current catalog snapshot, rebuilt when its version changes."""
+    global _index
+    catalog = get_catalog()
+    index = _index
+    if index is None or index.version != catalog.version:
+        with _index_lock:
+            if _index is None or _index.version != catalog.version:
+                _index = SkillGraphIndex(catalog)
+            index = _index
+    return index
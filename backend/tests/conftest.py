@@ -0,0 +1,14 @@
+# backend/tests/conftest.py
+import os
+import tempfile
+
+# The shared stores are module-level singletons configured from the
+# environment on import, so point them at a scratch directory first.
+_scratch = tempfile.mkdtemp(prefix="intersync_tests_")
+os.environ.update(
+    JOB_WORKERS="0",
+    JOB_QUEUE_PATH=os.path.join(_scratch, "jobs.sqlite3"),
+    RESUME_CACHE_PATH=os.path.join(_scratch, "cache.sqlite3"),
+    PROFILE_STORE_PATH=os.path.join(_scratch, "profiles.sqlite3"),
+    SINGLE_FLIGHT_DIR=os.path.join(_scratch, "single_flight"),
+)
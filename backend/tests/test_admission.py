@@ -0,0 +1,99 @@
+# backend/tests/test_admission.py
+import asyncio
+import threading
+import time
+
+import pytest
+
+from backend.services.admission import AdmissionControl, AdmissionRejected, RateLimiter
+
+
+def test_batch_larger_than_burst_is_charged_in_full():
+    limiter = RateLimiter(rate_per_second=10, burst=10)
+    assert limiter.take("client", 200) == 0.0
+    # 190 tokens in debt, then one more needed: about 19 seconds at 10/s
+    assert limiter.take("client") == pytest.approx(19.1, abs=0.1)
+    assert limiter.take("other") == 0.0
+
+
+def test_batch_needs_a_full_bucket():
+    limiter = RateLimiter(rate_per_second=10, burst=10)
+    assert limiter.take("client", 5) == 0.0
+    assert limiter.take("client", 200) == pytest.approx(0.5, abs=0.05)
+    assert limiter.stats()["rate_limited"] == 1
+
+
+def test_queued_call_is_shed_after_the_timeout():
+    admission = AdmissionControl(max_concurrent=1, max_queue=4, queue_timeout=0.05)
+    admission.acquire()
+    started = time.monotonic()
+    with pytest.raises(AdmissionRejected) as rejected:
+        admission.acquire()
+    assert rejected.value.reason == "timeout"
+    assert time.monotonic() - started >= 0.05
+    stats = admission.stats()
+    assert (stats["shed_timeout"], stats["queue_depth"], stats["in_flight"]) == (1, 0, 1)
+    admission.release()
+    assert admission.stats()["in_flight"] == 0
+
+
+def test_full_queue_is_shed_at_once():
+    admission = AdmissionControl(max_concurrent=1, max_queue=0, queue_timeout=1.0)
+    admission.acquire()
+    with pytest.raises(AdmissionRejected) as rejected:
+        admission.acquire()
+    assert rejected.value.reason == "queue_full"
+
+
+def test_release_hands_the_slot_to_the_waiter():
+    admission = AdmissionControl(max_concurrent=1, max_queue=4, queue_timeout=2.0)
+    admission.acquire()
+    admitted = threading.Event()
+
+    def wait():
+        with admission.slot():
+            admitted.set()
+
+    thread = threading.Thread(target=wait)
+    thread.start()
+    while admission.stats()["queue_depth"] == 0:
+        time.sleep(0.001)
+    admission.release()
+    thread.join(1)
+    assert admitted.is_set()
+    assert admission.stats()["in_flight"] == 0
+
+
+def test_cancelled_async_waiter_leaves_the_queue():
+    admission = AdmissionControl(max_concurrent=1, max_queue=4, queue_timeout=2.0)
+
+    async def main():
+        admission.acquire()
+        waiter = asyncio.ensure_future(admission.aacquire())
+        await asyncio.sleep(0.01)
+        assert admission.stats()["queue_depth"] == 1
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        admission.release()
+
+    asyncio.run(main())
+    stats = admission.stats()
+    assert (stats["queue_depth"], stats["in_flight"]) == (0, 0)
+
+
+def test_async_waiter_granted_before_cancel_gives_the_slot_back():
+    admission = AdmissionControl(max_concurrent=1, max_queue=4, queue_timeout=2.0)
+
+    async def main():
+        admission.acquire()
+        waiter = asyncio.ensure_future(admission.aacquire())
+        await asyncio.sleep(0.01)
+        # The slot is granted, but the waiter is cancelled before it resumes
+        admission.release()
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+    asyncio.run(main())
+    assert admission.stats()["in_flight"] == 0
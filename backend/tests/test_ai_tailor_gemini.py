@@ -0,0 +1,52 @@
+# backend/tests/test_ai_tailor_gemini.py
+import threading
+
+import pytest
+
+from backend.services import ai_tailor_gemini
+from backend.services.model_router import ModelRouter
+from backend.services.response_cache import ResponseCache, payload_fingerprint
+
+PAYLOAD = {"target_role": "Backend", "job_description": "Python", "candidate": {"name": "Ada"}}
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite3"))
+    monkeypatch.setattr(ai_tailor_gemini, "resume_cache", cache)
+    monkeypatch.setenv("GEMINI_MODEL_CHAIN", "models/primary,models/fallback")
+    monkeypatch.setenv("SINGLE_FLIGHT_ENABLED", "false")
+    return cache
+
+
+def _answered_by(monkeypatch, model):
+    monkeypatch.setattr(ai_tailor_gemini, "tailor_resume_with_gemini",
+                        lambda payload, slo=None: ({"headline": f"from {model}"}, model))
+
+
+def test_primary_answer_is_cached(cache, monkeypatch):
+    _answered_by(monkeypatch, "models/primary")
+    assert ai_tailor_gemini.tailor_resume_cached(PAYLOAD) == {"headline": "from models/primary"}
+    assert cache.get(payload_fingerprint(PAYLOAD, "models/primary")) == {"headline": "from models/primary"}
+
+
+@pytest.mark.parametrize("model", ["models/fallback", None])
+def test_fallback_or_mixed_answer_is_not_cached(cache, monkeypatch, model):
+    _answered_by(monkeypatch, model)
+    assert ai_tailor_gemini.tailor_resume_cached(PAYLOAD) == {"headline": f"from {model}"}
+    assert cache.get(payload_fingerprint(PAYLOAD, "models/primary")) is None
+
+
+def test_router_counters_are_exact_under_threads():
+    router = ModelRouter(client=None, chain=["models/primary"])
+
+    def bump():
+        for _ in range(20000):
+            router.count_fallback()
+
+    threads = [threading.Thread(target=bump) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert router.stats()["fallbacks"] == 160000
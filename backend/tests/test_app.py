@@ -0,0 +1,30 @@
+# backend/tests/test_app.py
+import threading
+
+from backend.services import job_queue
+
+
+def _job_threads():
+    return [t for t in threading.enumerate() if t.name.startswith("job-worker-")]
+
+
+def test_importing_the_app_starts_no_workers(monkeypatch):
+    started = []
+    monkeypatch.setattr(job_queue.resume_jobs, "start", lambda *args: started.append(args))
+    from backend.app import app, create_app
+
+    assert not started and not _job_threads()
+    create_app().test_client().get("/api/health/live")
+    assert not started, "apps from create_app() do not run workers"
+
+    app.test_client().get("/api/health/live")
+    assert started == [()], "the serving app starts them with its first request"
+
+
+def test_every_serving_app_gets_the_worker_hook(monkeypatch):
+    from backend.app import create_app
+
+    started = []
+    monkeypatch.setattr(job_queue.resume_jobs, "start", lambda *args: started.append(args))
+    create_app({"START_JOB_WORKERS": True}).test_client().get("/api/health/live")
+    assert started == [()]
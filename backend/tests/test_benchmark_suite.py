@@ -0,0 +1,23 @@
+# backend/tests/test_benchmark_suite.py
+from backend.benchmarks.suite import compare
+
+BASE = {"p95_ms": 200.0, "rps": 40.0, "error_rate": 0.0, "fallback_rate": 0.0}
+
+
+def _compare(current, baseline=BASE):
+    return compare({"ai_resume": current}, {"ai_resume": baseline}, 0.25, 5.0, 8)
+
+
+def test_a_faster_run_that_falls_back_is_a_regression():
+    assert _compare({**BASE, "p95_ms": 20.0, "rps": 400.0, "fallback_rate": 1.0}) == [
+        "ai_resume: fallback rate 0.0 -> 1.0"
+    ]
+
+
+def test_fallback_rate_within_tolerance_passes():
+    assert _compare({**BASE, "fallback_rate": 0.05}) == []
+
+
+def test_baselines_without_a_fallback_rate_count_as_zero():
+    baseline = {k: v for k, v in BASE.items() if k != "fallback_rate"}
+    assert _compare({**BASE, "fallback_rate": 0.5}, baseline) == ["ai_resume: fallback rate 0.0 -> 0.5"]
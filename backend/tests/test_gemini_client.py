@@ -0,0 +1,119 @@
+# backend/tests/test_gemini_client.py
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from backend.services.gemini_client import CircuitBreaker, CircuitOpenError, GeminiClient
+
+
+class _Models:
+    def __init__(self, delay: float = 0.0, error: Exception = None):
+        self.delay = delay
+        self.error = error
+
+    def generate_content(self, **kwargs):
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return SimpleNamespace(text="ok", usage_metadata=None)
+
+    def generate_content_stream(self, **kwargs):
+        for text in ("a", "b", "c"):
+            yield SimpleNamespace(text=text, usage_metadata=None)
+
+
+class _AsyncModels:
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+
+    async def generate_content(self, **kwargs):
+        await asyncio.sleep(self.delay)
+        return SimpleNamespace(text="ok", usage_metadata=None)
+
+
+def _client(delay: float = 0.0, error: Exception = None) -> GeminiClient:
+    client = GeminiClient("test", "models/test", timeout=5.0, max_retries=0,
+                          breaker=CircuitBreaker(failure_threshold=1, reset_timeout=0.05))
+    client._client = SimpleNamespace(models=_Models(delay, error), aio=SimpleNamespace(models=_AsyncModels(delay)))
+    return client
+
+
+def _half_open(breaker: CircuitBreaker):
+    breaker.record_failure()
+    time.sleep(breaker.reset_timeout + 0.01)
+    assert breaker.state == "half_open"
+
+
+def test_breaker_transitions():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+    assert not breaker.allow(), "only one probe at a time"
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow() and breaker.allow()
+
+
+def test_released_probe_lets_the_next_one_through():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    _half_open(breaker)
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+
+
+def test_cancelled_async_probe_is_released():
+    client = _client(delay=1.0)
+    _half_open(client.breaker)
+
+    async def cancel_probe():
+        task = asyncio.ensure_future(client.agenerate("hi"))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_probe())
+    assert client.breaker.allow(), "a cancelled probe must not wedge the breaker in half_open"
+
+
+def test_probe_out_of_time_is_released():
+    client = _client()
+    _half_open(client.breaker)
+    with pytest.raises(TimeoutError):
+        client.generate("hi", timeout=-1)
+    assert client.breaker.allow()
+
+
+def test_closed_stream_releases_probe():
+    client = _client()
+    _half_open(client.breaker)
+    chunks = client.stream("hi")
+    assert next(chunks) == "a"
+    chunks.close()
+    assert client.breaker.allow()
+
+
+def test_failed_probe_reopens_circuit():
+    client = _client(error=ConnectionError("down"))
+    _half_open(client.breaker)
+    with pytest.raises(ConnectionError):
+        client.generate("hi")
+    assert client.breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        client.generate("hi")
@@ -0,0 +1,57 @@
+# backend/tests/test_health.py
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from backend.app import create_app
+from backend.routes import health
+from backend.services.gemini_client import CircuitBreaker
+
+
+@pytest.fixture
+def breakers(monkeypatch):
+    monkeypatch.setenv("AI_ENABLED", "true")
+    monkeypatch.setenv("GEMINI_API_KEY", "test")
+    monkeypatch.setenv("READINESS_REQUIRES_GEMINI", "true")
+    breakers = {m: CircuitBreaker(failure_threshold=1, reset_timeout=0.01) for m in ("models/a", "models/b")}
+    client = SimpleNamespace(timeout=0.05, breaker_for=breakers.__getitem__)
+    monkeypatch.setattr(health, "get_router", lambda: SimpleNamespace(client=client, chain=list(breakers)))
+    return breakers
+
+
+def _gemini(client):
+    response = client.get("/api/health/ready")
+    return response.status_code, response.get_json()["checks"]["gemini"]
+
+
+def _probe(breaker):
+    breaker.record_failure()
+    time.sleep(0.02)
+    assert breaker.allow()
+
+
+def test_fresh_probes_keep_gemini_ok(breakers):
+    client = create_app().test_client()
+    for breaker in breakers.values():
+        _probe(breaker)
+    status, gemini = _gemini(client)
+    assert status == 200
+    assert gemini["status"] == "ok"
+    assert set(gemini["probe_age_seconds"]) == set(breakers)
+
+
+def test_stale_probes_make_gemini_unavailable(breakers):
+    client = create_app().test_client()
+    _probe(breakers["models/a"])
+    time.sleep(0.06)
+    status, gemini = _gemini(client)
+    assert status == 200
+    assert gemini["status"] == "degraded"
+    assert gemini["circuits"]["models/a"] == "half_open"
+
+    _probe(breakers["models/b"])
+    time.sleep(0.06)
+    status, gemini = _gemini(client)
+    assert status == 503
+    assert gemini["status"] == "unavailable"
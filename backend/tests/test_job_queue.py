@@ -0,0 +1,130 @@
+# backend/tests/test_job_queue.py
+import sqlite3
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from backend.services import job_queue
+from backend.services.job_queue import InvalidCallback, JobQueue, check_callback_url
+
+
+def _queue(tmp_path, handler=lambda payload, last_attempt: {"echo": payload}, **kwargs):
+    return JobQueue(str(tmp_path / "jobs.sqlite3"), handler, workers=0, **kwargs)
+
+
+def test_expired_lease_is_recovered_and_the_old_worker_loses_it(tmp_path):
+    queue = _queue(tmp_path, lease_seconds=0.05)
+    job_id, _ = queue.submit({"n": 1})
+
+    first = queue.claim("a")
+    assert first["id"] == job_id and first["attempts"] == 1
+    assert queue.claim("b") is None, "a live lease is not reclaimed"
+
+    time.sleep(0.06)
+    second = queue.claim("b")
+    assert second["id"] == job_id and second["attempts"] == 2
+
+    queue.run_one(first, "a")
+    assert queue.get(job_id)["status"] == "running", "the expired lease cannot store a result"
+    queue.run_one(second, "b")
+    job = queue.get(job_id)
+    assert (job["status"], job["result"]) == ("done", {"echo": {"n": 1}})
+
+
+def test_job_fails_after_max_attempts_of_lost_leases(tmp_path):
+    queue = _queue(tmp_path, lease_seconds=0.01, max_attempts=2)
+    job_id, _ = queue.submit({"n": 1})
+    assert queue.claim("a")["attempts"] == 1
+    time.sleep(0.02)
+    assert queue.claim("b")["attempts"] == 2
+    time.sleep(0.02)
+    assert queue.claim("c") is None
+    job = queue.get(job_id)
+    assert job["status"] == "failed"
+    assert "lost the job" in job["error"]
+
+
+def test_worker_thread_survives_a_storage_error(tmp_path, monkeypatch):
+    queue = _queue(tmp_path, lease_seconds=0.2, poll_seconds=0.01)
+    finish = queue._finish
+    calls = []
+
+    def flaky_finish(*args, **kwargs):
+        calls.append(args)
+        if len(calls) == 1:
+            raise sqlite3.OperationalError("database is locked")
+        return finish(*args, **kwargs)
+
+    monkeypatch.setattr(queue, "_finish", flaky_finish)
+    job_id, _ = queue.submit({"n": 1})
+    queue.start(workers=1)
+    try:
+        deadline = time.monotonic() + 5
+        while queue.get(job_id)["status"] != "done" and time.monotonic() < deadline:
+            time.sleep(0.01)
+        job = queue.get(job_id)
+        assert (job["status"], job["attempts"]) == ("done", 2)
+        assert queue.stats()["workers"] == 1
+    finally:
+        queue.stop(1)
+
+
+@pytest.mark.parametrize("url", [
+    "http://127.0.0.1/hook",
+    "http://localhost:8080/hook",
+    "http://169.254.169.254/latest/meta-data/",
+    "http://10.0.0.5/hook",
+    "http://192.168.1.1/hook",
+    "http://[::1]/hook",
+    "http://0.0.0.0/hook",
+    "ftp://93.184.216.34/hook",
+    "http://93.184.216.34:notaport/hook",
+])
+def test_callbacks_to_non_public_hosts_are_refused(url, monkeypatch):
+    monkeypatch.delenv("JOB_CALLBACK_ALLOWED_HOSTS", raising=False)
+    with pytest.raises(InvalidCallback):
+        check_callback_url(url)
+
+
+def test_public_and_allowlisted_callbacks(monkeypatch):
+    monkeypatch.delenv("JOB_CALLBACK_ALLOWED_HOSTS", raising=False)
+    assert check_callback_url("https://93.184.216.34/hook") == "https://93.184.216.34/hook"
+    monkeypatch.setenv("JOB_CALLBACK_ALLOWED_HOSTS", "127.0.0.1")
+    assert check_callback_url("http://127.0.0.1:9/hook") == "http://127.0.0.1:9/hook"
+    with pytest.raises(InvalidCallback):
+        check_callback_url("https://93.184.216.34/hook")
+
+
+class _Redirecting(BaseHTTPRequestHandler):
+    hits = []
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        _Redirecting.hits.append(self.path)
+        self.send_response(307)
+        self.send_header("Location", "http://169.254.169.254/latest/meta-data/")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def test_callback_redirects_are_not_followed(tmp_path, monkeypatch):
+    server = HTTPServer(("127.0.0.1", 0), _Redirecting)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setenv("JOB_CALLBACK_ALLOWED_HOSTS", "127.0.0.1")
+    monkeypatch.setattr(job_queue.time, "sleep", lambda seconds: None)
+    try:
+        queue = _queue(tmp_path)
+        url = f"http://127.0.0.1:{server.server_port}/hook"
+        job_id, _ = queue.submit({"n": 1}, callback_url=url)
+        queue._deliver(job_id, url, attempts=1)
+    finally:
+        server.shutdown()
+    assert _Redirecting.hits == ["/hook"]
+    row = queue._conn().execute("SELECT status, last_error FROM job_callbacks").fetchone()
+    assert row["status"] == "failed"
+    assert "307" in row["last_error"]
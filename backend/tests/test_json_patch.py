@@ -0,0 +1,53 @@
+# backend/tests/test_json_patch.py
+import pytest
+
+from backend.services.json_patch import InvalidPatch, apply_patch
+
+
+@pytest.mark.parametrize("actual, expected", [
+    (1, True),
+    (0, False),
+    (True, 1),
+    (1.0, True),
+    ({"a": [1, {"b": 0}]}, {"a": [1, {"b": False}]}),
+    ([1, 2], [True, 2]),
+    (None, False),
+    ("1", 1),
+])
+def test_test_op_is_type_strict(actual, expected):
+    with pytest.raises(InvalidPatch):
+        apply_patch({"v": actual}, [{"op": "test", "path": "/v", "value": expected}])
+
+
+@pytest.mark.parametrize("actual, expected", [
+    (1, 1.0),
+    (True, True),
+    ({"a": [1, {"b": False}], "c": None}, {"c": None, "a": [1.0, {"b": False}]}),
+    ("x", "x"),
+])
+def test_test_op_accepts_equal_json_values(actual, expected):
+    assert apply_patch({"v": actual}, [{"op": "test", "path": "/v", "value": expected}]) == {"v": actual}
+
+
+def test_failed_test_applies_nothing():
+    doc = {"skills": ["Python"], "active": 1}
+    with pytest.raises(InvalidPatch):
+        apply_patch(doc, [
+            {"op": "add", "path": "/skills/-", "value": "Go"},
+            {"op": "test", "path": "/active", "value": True},
+        ])
+    assert doc == {"skills": ["Python"], "active": 1}
+
+
+def test_end_of_array_and_escaped_tokens():
+    doc = {"skills": ["Python"], "a/b": {"~k": 1}}
+    patched = apply_patch(doc, [
+        {"op": "add", "path": "/skills/-", "value": "Go"},
+        {"op": "replace", "path": "/a~1b/~0k", "value": 2},
+    ])
+    assert patched == {"skills": ["Python", "Go"], "a/b": {"~k": 2}}
+
+
+def test_move_into_itself_is_rejected():
+    with pytest.raises(InvalidPatch):
+        apply_patch({"a": {"b": {}}}, [{"op": "move", "from": "/a", "path": "/a/b/c"}])
@@ -0,0 +1,28 @@
+# backend/tests/test_json_stream.py
+import pytest
+
+from backend.services.json_stream import iter_sections, salvage_sections
+
+
+def test_salvage_keeps_a_good_member_next_to_a_malformed_one():
+    # Short enough that both members would once have shared one 64-char chunk
+    text = '{"headline": "Dev", "summary": [1,,2], "skills": {"Core": ["Go"]}}'
+    assert salvage_sections(text) == {"headline": "Dev", "skills": {"Core": ["Go"]}}
+
+
+def test_salvage_drops_only_the_truncated_member():
+    text = '{"headline": "Backend Engineer", "summary": ["Built APIs"], "skills": {"Core": ["Pyth'
+    assert salvage_sections(text) == {"headline": "Backend Engineer", "summary": ["Built APIs"]}
+
+
+def test_salvage_of_garbage_is_empty():
+    assert salvage_sections("") == {}
+    assert salvage_sections("not json at all") == {}
+
+
+def test_stream_stays_strict():
+    chunks = ['{"headline": "Dev", ', '"summary": [1,,2]}']
+    sections = iter_sections(chunks)
+    assert next(sections) == ("headline", "Dev")
+    with pytest.raises(ValueError):
+        next(sections)
@@ -0,0 +1,55 @@
+# backend/tests/test_latex_render.py
+from backend.services.latex_render import clear_fragment_cache, fragment_cache_stats, resume_json_to_latex
+
+
+def _resume(dates):
+    return {
+        "header": {"name": "Ada & Co", "email": "ada@example.com", "links": ["https://ada.dev/#cv"]},
+        "headline": "Backend_Engineer",
+        "summary": ["Ships 100% of the time"],
+        "skills": {"Languages": ["Python", "C#"], "Tools": "Docker"},
+        "experience": [{"title": "Intern", "company": "Acme", "dates": dates, "bullets": ["Cut p95 by 40%"]}],
+        "projects": [{"name": "Graph", "bullets": "One {braced} bullet"}],
+    }
+
+
+def test_one_shot_render_skips_the_cache():
+    clear_fragment_cache()
+    resume_json_to_latex(_resume("2024"))
+    assert fragment_cache_stats()["size"] == 0
+
+
+def test_cached_render_matches_one_shot():
+    clear_fragment_cache()
+    resume = _resume("2020 -- 2024")
+    expected = resume_json_to_latex(resume)
+    assert resume_json_to_latex(resume, cached=True) == expected
+    assert resume_json_to_latex(resume, cached=True) == expected
+    assert fragment_cache_stats()["hits"] > 0
+
+
+def test_cache_keeps_equal_but_different_values_apart():
+    clear_fragment_cache()
+    for dates in (1, True, 1.0, "1"):
+        assert resume_json_to_latex(_resume(dates), cached=True) == resume_json_to_latex(_resume(dates))
+
+
+def test_render_endpoint_reuses_unchanged_fragments():
+    from backend.app import create_app
+
+    client = create_app().test_client()
+    clear_fragment_cache()
+    resume = _resume("2020 -- 2024")
+    first = client.post("/api/ai/resume/render", json={"resume_json": resume})
+    assert first.status_code == 200
+    assert first.get_json()["latex"] == resume_json_to_latex(resume)
+    misses = fragment_cache_stats()["misses"]
+
+    resume["experience"][0]["bullets"] = ["Cut p95 by 45%"]
+    edited = client.post("/api/ai/resume/render", json={"resume_json": resume},
+                         headers={"Accept": "application/x-tex"})
+    assert edited.status_code == 200 and edited.mimetype == "application/x-tex"
+    assert edited.get_data(as_text=True) == resume_json_to_latex(resume)
+    assert fragment_cache_stats()["misses"] == misses + 1, "only the edited entry is rendered again"
+
+    assert client.post("/api/ai/resume/render", json={"resume_json": []}).status_code == 400
@@ -0,0 +1,49 @@
+# backend/tests/test_projects.py
+import pytest
+
+from backend.app import create_app
+
+
+@pytest.fixture
+def client():
+    return create_app().test_client()
+
+
+@pytest.mark.parametrize("users, error", [
+    ([1], "users[0] must be an object"),
+    ([{"id": "a"}, "b"], "users[1] must be an object"),
+    ([{"skills": 5}], "users[0].skills must be a list"),
+    ([{"interests": "ai"}], "users[0].interests must be a list"),
+])
+def test_bulk_match_rejects_malformed_users(client, users, error):
+    response = client.post("/api/projects/match/bulk", json={"users": users})
+    assert response.status_code == 400
+    assert response.get_json()["error"] == error
+
+
+def test_bulk_match_rejects_bad_k(client):
+    response = client.post("/api/projects/match/bulk", json={"users": [{}], "k": "x"})
+    assert response.status_code == 400
+
+
+def test_bulk_match(client):
+    users = [{"id": "u1", "interests": ["web"], "skills": ["Python"]}, {"interests": None}]
+    response = client.post("/api/projects/match/bulk", json={"users": users, "k": 2})
+    assert response.status_code == 200
+    results = response.get_json()["results"]
+    assert [r["id"] for r in results] == ["u1", 1]
+    assert all(len(r["projects"]) == 2 for r in results)
+
+
+@pytest.mark.parametrize("body", [{"page": "x"}, {"page_size": "x"}, {"page": None}, {"page_size": [3]}])
+def test_generate_rejects_bad_paging(client, body):
+    response = client.post("/api/projects/generate", json={"interests": ["web"], **body})
+    assert response.status_code == 400
+    assert response.get_json()["error"] == "page and page_size must be integers"
+
+
+def test_generate_pages(client):
+    response = client.post("/api/projects/generate", json={"interests": ["web"], "page": "2", "page_size": 2})
+    body = response.get_json()
+    assert response.status_code == 200
+    assert (body["page"], body["page_size"]) == (2, 2)
@@ -0,0 +1,22 @@
+# backend/tests/test_prompt_compaction.py
+from backend.services.prompt_compaction import _trim_entries, content_words, relevance
+
+# Mentions every key a resume entry has
+JOB = "Job title: Backend Engineer. Company name withheld. Summarize experience in bullets. Python and Kafka required"
+
+
+def test_relevance_ignores_json_keys():
+    jd_words = content_words(JOB)
+    assert relevance({"name": "Knitting club", "bullets": ["Organized meetups"]}, jd_words) == 0
+    assert relevance({"title": "Intern", "company": "Acme", "bullets": ["Python services on Kafka"]}, jd_words) == 2
+
+
+def test_trim_drops_entries_that_only_share_keys():
+    projects = [
+        {"name": "Knitting club", "bullets": ["Organized meetups"]},
+        {"name": "Stream processor", "bullets": ["Kafka consumers in Python"]},
+        {"name": "Garden", "bullets": ["Grew tomatoes"]},
+    ]
+    kept, dropped = _trim_entries(projects, content_words(JOB), keep_at_least=1)
+    assert kept == [projects[1]]
+    assert dropped == 2
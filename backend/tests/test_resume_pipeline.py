@@ -0,0 +1,24 @@
+# backend/tests/test_resume_pipeline.py
+from backend.services import resume_pipeline
+
+JOB = "Backend role: Python, Kubernetes and Terraform required."
+CANDIDATE = {"name": "Ada", "skills": ["Python", "Terraform"], "projects": [{"name": "Infra", "bullets": ["Kubernetes"]}]}
+
+
+def test_ats_keywords_use_the_original_inputs(monkeypatch):
+    monkeypatch.setenv("AI_ENABLED", "true")
+    monkeypatch.setenv("GEMINI_API_KEY", "test")
+    monkeypatch.setenv("RESUME_CACHE_ENABLED", "false")
+
+    # A compacted payload that lost most of the job description and the candidate's projects
+    compacted = {"target_role": "Backend", "job_description": "Backend role: Python",
+                 "candidate": {"name": "Ada", "skills": ["Python"]}}
+    monkeypatch.setattr(resume_pipeline, "build_compact_payload", lambda *inputs: (compacted, None))
+    monkeypatch.setattr(resume_pipeline, "tailor_resume_cached", lambda payload, slo=None: {"headline": "Backend"})
+
+    result = resume_pipeline.run_resume_pipeline("Backend", JOB, CANDIDATE)
+    demo = resume_pipeline.build_demo_resume("Backend", CANDIDATE, JOB)
+    assert result.used_ai
+    assert result.resume_json["ats_keywords_matched"] == demo["ats_keywords_matched"]
+    assert set(result.resume_json["ats_keywords_matched"]) >= {"Python", "Kubernetes", "Terraform"}
+    assert result.resume_json["ats_keywords_missing"] == demo["ats_keywords_missing"]
@@ -0,0 +1,99 @@
+# backend/tests/test_section_tailor.py
+import asyncio
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from backend.services import section_tailor
+from backend.services.admission import AdmissionControl
+
+PROJECTS = 10
+PAYLOAD = {
+    "target_role": "Backend",
+    "job_description": "Python",
+    "candidate": {"name": "Ada", "projects": [{"name": f"P{i}", "bullets": ["b"]} for i in range(PROJECTS)]},
+    "output_schema": {"projects": [{"name": "", "bullets": [""]}]},
+}
+
+
+class FakeRouter:
+    """Records each call's timeout and the most calls seen at once."""
+
+    def __init__(self, delay: float = 0.02):
+        self.delay = delay
+        self.timeouts = []
+        self.active = self.peak = 0
+        self.lock = threading.Lock()
+
+    def _enter(self, timeout):
+        with self.lock:
+            self.timeouts.append(timeout)
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+
+    def _leave(self):
+        with self.lock:
+            self.active -= 1
+        return SimpleNamespace(text=json.dumps({"project": {"name": "P", "bullets": ["tailored"]}})), "models/primary"
+
+    def generate(self, contents, slo=None, config=None, timeout=None):
+        self._enter(timeout)
+        time.sleep(self.delay)
+        return self._leave()
+
+    async def agenerate(self, contents, slo=None, config=None, timeout=None):
+        self._enter(timeout)
+        await asyncio.sleep(self.delay)
+        return self._leave()
+
+
+@pytest.fixture
+def router(monkeypatch):
+    router = FakeRouter()
+    monkeypatch.setattr(section_tailor, "get_router", lambda: router)
+    monkeypatch.setenv("GEMINI_SECTION_DEADLINE_SECONDS", "5")
+    monkeypatch.setenv("GEMINI_SECTION_MAX_IN_FLIGHT", "3")
+    return router
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_section_calls_share_the_deadline_and_the_in_flight_cap(router, use_async):
+    if use_async:
+        resume, model = asyncio.run(section_tailor.tailor_resume_by_section_async(PAYLOAD))
+    else:
+        resume, model = section_tailor.tailor_resume_by_section(PAYLOAD)
+
+    assert model == "models/primary"
+    assert [entry["bullets"] for entry in resume["projects"]] == [["tailored"]] * PROJECTS
+    assert router.peak == 3
+    assert len(router.timeouts) == PROJECTS
+    assert all(0 < timeout <= 5 for timeout in router.timeouts)
+    # Later sections get what is left of the deadline, not a fresh one
+    assert router.timeouts[-1] < router.timeouts[0]
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_each_section_call_takes_an_admission_slot(router, monkeypatch, use_async):
+    admission = AdmissionControl(max_concurrent=2, max_queue=32, queue_timeout=5.0)
+    monkeypatch.setattr(section_tailor, "ai_admission", admission)
+    if use_async:
+        resume, _ = asyncio.run(section_tailor.tailor_resume_by_section_async(PAYLOAD))
+    else:
+        resume, _ = section_tailor.tailor_resume_by_section(PAYLOAD)
+
+    assert router.peak == 2
+    assert len(router.timeouts) == PROJECTS
+    assert admission.stats()["in_flight"] == 0
+
+
+def test_sections_queued_past_the_deadline_never_start(router, monkeypatch):
+    monkeypatch.setenv("GEMINI_SECTION_DEADLINE_SECONDS", "0.05")
+    router.delay = 0.04
+    resume, model = section_tailor.tailor_resume_by_section(PAYLOAD)
+
+    assert model is None
+    assert len(router.timeouts) < PROJECTS
+    assert resume["projects"][-1]["bullets"] != ["tailored"]
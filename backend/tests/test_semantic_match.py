@@ -0,0 +1,71 @@
+# backend/tests/test_semantic_match.py
+import sqlite3
+
+import numpy as np
+import pytest
+
+from backend.data.catalog import InMemoryCatalog, SQLiteCatalog, build_sqlite_catalog
+from backend.services.project_index import INTEREST_BONUS
+from backend.services.semantic_match import SemanticIndex
+
+
+def _templates(n: int) -> dict:
+    templates = {
+        f"topic{i}": {"name": f"Project {i}", "description": f"Build a zq{i}x toolkit",
+                      "skills_gained": [f"skill{i}"], "tags": [f"tag{i}"], "languages": ["Python"],
+                      "steps": ["Plan", "Build"]}
+        for i in range(n)
+    }
+    templates["music"] = {"name": "Guitar tuner", "description": "Tune a guitar from microphone input",
+                          "skills_gained": ["signal processing"], "tags": ["guitar", "audio"],
+                          "languages": ["Python", "C++"], "steps": ["Plan", "Build"]}
+    return templates
+
+
+def _dense_bonuses(index: SemanticIndex, interests) -> dict:
+    relevance, similarity = index.scores([{"interests": interests}])
+    semantic = index._semantic(similarity[0])
+    return {index.ids[i]: float(INTEREST_BONUS * semantic[i]) for i in np.nonzero(semantic > 0)[0]}
+
+
+@pytest.mark.parametrize("templates, interests", [
+    (200, ["guitar"]),            # few postings per bucket
+    (5, ["guitar", "audio"]),     # postings cover most of the catalog
+    (200, ["nothing matches"]),
+])
+def test_posting_lists_match_the_dense_scores(templates, interests):
+    index = SemanticIndex(InMemoryCatalog(_templates(templates)), dim=1 << 16)
+    bonuses = index.interest_bonuses(interests)
+    dense = _dense_bonuses(index, interests)
+    assert bonuses.keys() == dense.keys()
+    assert all(bonuses[pid] == pytest.approx(dense[pid], abs=1e-3) for pid in dense)
+    if interests == ["guitar"]:
+        assert list(bonuses) == ["music"]
+
+
+def test_single_queries_do_not_build_the_dense_matrices():
+    index = SemanticIndex(InMemoryCatalog(_templates(20)))
+    index.interest_bonuses(["guitar"])
+    assert index._dense is None
+
+
+def test_index_reads_search_text_not_templates(tmp_path):
+    templates = _templates(20)
+    path = str(tmp_path / "catalog.sqlite3")
+    build_sqlite_catalog(templates, path)
+    catalog = SQLiteCatalog(path)
+
+    index = SemanticIndex(catalog)
+    assert catalog._load.cache_info().currsize == 0, "no template was decoded"
+    assert index.interest_bonuses(["guitar"]) == SemanticIndex(InMemoryCatalog(templates)).interest_bonuses(["guitar"])
+
+
+def test_snapshots_without_search_text_still_index(tmp_path):
+    templates = _templates(5)
+    path = str(tmp_path / "catalog.sqlite3")
+    build_sqlite_catalog(templates, path)
+    with sqlite3.connect(path) as conn:
+        conn.execute("ALTER TABLE templates DROP COLUMN search_text")
+
+    index = SemanticIndex(SQLiteCatalog(path))
+    assert index.interest_bonuses(["guitar"]) == SemanticIndex(InMemoryCatalog(templates)).interest_bonuses(["guitar"])
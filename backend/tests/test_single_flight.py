@@ -0,0 +1,77 @@
+# backend/tests/test_single_flight.py
+import asyncio
+import os
+import threading
+
+import pytest
+
+from backend.services.single_flight import SharedCallError, SingleFlight
+
+
+class UpstreamError(RuntimeError):
+    pass
+
+
+def test_followers_get_their_own_chained_exception(tmp_path):
+    flights = SingleFlight(str(tmp_path))
+    release = threading.Event()
+    leader_error = UpstreamError("upstream failed")
+
+    def fail():
+        release.wait(5)
+        raise leader_error
+
+    errors = []
+
+    def call():
+        try:
+            flights.do("key", fail)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    while not flights._flights or flights._flights["key"].followers < 3:
+        pass
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(errors) == 4
+    assert all(isinstance(e, UpstreamError) and str(e) == "upstream failed" for e in errors)
+    followers = [e for e in errors if e is not leader_error]
+    assert len(followers) == 3
+    assert all(e.__cause__ is leader_error for e in followers)
+    assert len({id(e) for e in followers}) == 3
+
+
+def test_async_followers_get_their_own_chained_exception(tmp_path):
+    flights = SingleFlight(str(tmp_path))
+    leader_error = UpstreamError("upstream failed")
+
+    async def fail():
+        await asyncio.sleep(0.05)
+        raise leader_error
+
+    async def main():
+        return await asyncio.gather(*(flights.ado("key", fail) for _ in range(3)), return_exceptions=True)
+
+    errors = asyncio.run(main())
+    followers = [e for e in errors if e is not leader_error]
+    assert len(followers) == 2
+    assert all(isinstance(e, UpstreamError) and e.__cause__ is leader_error for e in followers)
+
+
+@pytest.mark.skipif(os.name != "posix", reason="cross-process coalescing needs flock")
+def test_shared_error_with_a_long_multibyte_message(tmp_path):
+    flights = SingleFlight(str(tmp_path))
+    fd, _ = flights._open_lock("key")
+    try:
+        flights._publish_error(fd, UpstreamError("déjà vu — " * 400))
+        with pytest.raises(SharedCallError) as raised:
+            flights._settled(fd, True, lambda: None)
+    finally:
+        os.close(fd)
+    assert raised.value.kind == "UpstreamError"
+    assert raised.value.args[0] == ("déjà vu — " * 400)[:2000]
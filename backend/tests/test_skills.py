@@ -0,0 +1,41 @@
+# backend/tests/test_skills.py
+import gc
+import weakref
+
+import pytest
+
+from backend.app import create_app
+from backend.services.skill_graph import SkillGraphIndex
+
+
+@pytest.fixture
+def client():
+    return create_app().test_client()
+
+
+@pytest.mark.parametrize("max_projects", ["x", [1], {}])
+def test_graph_rejects_bad_max_projects(client, max_projects):
+    response = client.post("/api/skills/graph", json={"skills": ["Python"], "max_projects": max_projects})
+    assert response.status_code == 400
+    assert response.get_json()["error"] == "max_projects must be an integer"
+
+
+def test_graph_reachable(client):
+    response = client.post("/api/skills/graph", json={"skills": ["Python"], "max_projects": "2"})
+    assert response.status_code == 200
+    assert all(item["projects_needed"] <= 2 for item in response.get_json()["reachable"])
+
+
+class _Catalog(dict):
+    version = "test"
+
+
+def test_search_cache_does_not_outlive_its_index():
+    index = SkillGraphIndex(_Catalog(p={"name": "P", "languages": ["Python"], "skills_gained": ["Flask"]}))
+    assert [r["skill"] for r in index.reachable(["python"], 1)] == ["Flask"]
+    assert index._search_cached.cache_info().currsize == 1
+
+    ref = weakref.ref(index)
+    del index
+    gc.collect()
+    assert ref() is None, "a swapped-out index is not kept alive by the search cache"